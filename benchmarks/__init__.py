@@ -0,0 +1 @@
+"""TruthLens Benchmarks"""
@@ -0,0 +1,67 @@
+"""
+TruthLens - Synthetic Benchmark Corpus
+======================================
+Deterministic documents that exercise every analyzer lexicon
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import random
+from typing import List
+
+from src.ml.language import LexiconPacks
+
+NEUTRAL_WORDS = (
+    "the government report said officials met on tuesday to discuss budget "
+    "figures for the region while analysts expect growth in exports and "
+    "local councils announced new plans for schools roads and hospitals"
+).split()
+
+CLICKBAIT_PHRASES = [
+    "you won't believe", "what happens next", "7 reasons why",
+    "the truth about", "doctors hate", "one weird trick"
+]
+
+# Every English lexicon word
+_PACK = LexiconPacks().load("en")
+LEXICON = sorted({
+    word for section in ("terms", "token_sets") for words in _PACK[section].values() for word in words
+})
+
+URLS = [
+    "https://www.reuters.com/world/article", "https://edition.bbc.co.uk/news/1",
+    "https://infowars.com/story", "https://random-news-site.com/post", None
+]
+
+
+def make_document(size_chars: int, rng: random.Random, loaded: float = 0.05) -> str:
+    """Build a document of roughly size_chars with a share of loaded words."""
+    lexicon = LEXICON
+    words: List[str] = []
+    length = 0
+    while length < size_chars:
+        roll = rng.random()
+        if roll < loaded:
+            word = rng.choice(lexicon)
+        elif roll < loaded * 1.2:
+            word = rng.choice(CLICKBAIT_PHRASES)
+        else:
+            word = rng.choice(NEUTRAL_WORDS)
+        if rng.random() < 0.08:
+            word = word.capitalize() + rng.choice([".", "!", ",", "?!"])
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def make_corpus(count: int, size_chars: int, seed: int = 42) -> List[str]:
+    """Build count documents of roughly size_chars each."""
+    rng = random.Random(seed)
+    return [make_document(size_chars, rng) for _ in range(count)]
+
+
+def make_urls(count: int, seed: int = 42) -> List[str]:
+    """Source URLs aligned with make_corpus()."""
+    rng = random.Random(seed + 1)
+    return [rng.choice(URLS) for _ in range(count)]
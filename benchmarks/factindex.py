@@ -0,0 +1,133 @@
+"""
+TruthLens - Fact Index Benchmark
+================================
+Build time, size, query latency and recall of the verified-claims index
+
+Usage:
+    python -m benchmarks.factindex                       # 1M synthetic claims
+    python -m benchmarks.factindex --claims 100000 --nprobe 4 16
+
+Queries are stored claims with one word dropped and one replaced, the
+way a repost rewords a debunked claim; recall@1 is how often the
+original claim comes back first.
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.run import BenchResult, peak_rss_mb
+from src.ml.factindex import FactIndex, build_index
+
+VERDICTS = ("true", "false", "partially_true")
+
+
+def make_claims(count: int, vocabulary: int = 50_000, words: int = 12, seed: int = 3) -> List[str]:
+    """Synthetic claims with a Zipf-like word distribution."""
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(vocabulary)]
+    cumulative = list(itertools.accumulate(1 / (rank + 1) for rank in range(vocabulary)))
+    return [" ".join(rng.choices(vocab, cum_weights=cumulative, k=words)) for _ in range(count)]
+
+
+def reword(claim: str, rng: random.Random) -> str:
+    """Drop one word and replace another."""
+    words = claim.split()
+    del words[rng.randrange(len(words))]
+    words[rng.randrange(len(words))] = f"x{rng.randrange(1_000_000)}"
+    return " ".join(words)
+
+
+def bench_fact_index(claims: int, queries: int = 1_000, nprobes: List[int] = (8,),
+                     batch_size: int = 32, directory: Optional[str] = None) -> Dict[str, dict]:
+    """Build an index of ``claims`` synthetic claims and time lookups against it."""
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        source = os.path.join(tmp, "claims.jsonl")
+        texts = make_claims(claims)
+        with open(source, "w", encoding="utf-8") as f:
+            for text in texts:
+                f.write(json.dumps({"claim": text, "verdict": rng.choice(VERDICTS)}) + "\n")
+        picked = [rng.randrange(claims) for _ in range(queries)]
+        probes = [reword(texts[i], rng) for i in picked]
+        del texts
+
+        start = time.perf_counter()
+        manifest = build_index(source, os.path.join(tmp, "index"))
+        build_s = time.perf_counter() - start
+        index_dir = os.path.join(tmp, "index")
+        size = sum(os.path.getsize(os.path.join(index_dir, name)) for name in os.listdir(index_dir))
+
+        index = FactIndex(index_dir)
+        embedder = index.embedder()
+        vectors = embedder.embed(probes)
+        report: Dict[str, dict] = {"build": {
+            "claims": claims, "nlist": manifest["nlist"], "seconds": round(build_s, 2),
+            "claims_per_sec": round(claims / build_s, 1), "index_mb": round(size / 2 ** 20, 1),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }}
+        for nprobe in nprobes:
+            single = BenchResult(name=f"query.nprobe{nprobe}")
+            hits = 0
+            begin = time.perf_counter()
+            for vector, expected in zip(vectors, picked):
+                t0 = time.perf_counter()
+                found = index.search(vector, k=1, nprobe=nprobe)[0]
+                single.latencies_ms.append((time.perf_counter() - t0) * 1000)
+                hits += bool(found) and found[0][0] == expected
+            single.wall_s = time.perf_counter() - begin
+            single.docs = queries
+            report[single.name] = {**single.summary(), "recall_at_1": round(hits / queries, 4)}
+
+            batched = BenchResult(name=f"query_batch{batch_size}.nprobe{nprobe}")
+            begin = time.perf_counter()
+            for i in range(0, queries, batch_size):
+                t0 = time.perf_counter()
+                index.search(vectors[i:i + batch_size], k=1, nprobe=nprobe)
+                batched.latencies_ms.append((time.perf_counter() - t0) * 1000)
+            batched.wall_s = time.perf_counter() - begin
+            batched.docs = queries
+            report[batched.name] = batched.summary()
+
+        embed = BenchResult(name=f"embed_batch{batch_size}")
+        for i in range(0, queries, batch_size):
+            t0 = time.perf_counter()
+            embedder.embed(probes[i:i + batch_size])
+            embed.latencies_ms.append((time.perf_counter() - t0) * 1000)
+        embed.docs = queries
+        embed.wall_s = sum(embed.latencies_ms) / 1000
+        report[embed.name] = embed.summary()
+        index.close()
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="TruthLens fact index benchmark")
+    parser.add_argument("--claims", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--dir", help="where to build the temporary index (default: system temp)")
+    parser.add_argument("-o", "--output", help="write JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = bench_fact_index(args.claims, args.queries, args.nprobe, directory=args.dir)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""
+TruthLens - Benchmark Suite
+===========================
+Analyzer and API throughput/latency benchmarks
+
+Usage:
+    python -m benchmarks.run                      # full run, JSON to stdout
+    python -m benchmarks.run --quick -o out.json  # smaller workloads
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+
+Exits with status 1 when a benchmark regresses past --tolerance
+against the baseline.
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.corpus import make_corpus, make_urls
+from src.ml.analyzer import TruthLensAnalyzer, create_analyzer
+
+# Documents sizes (chars) for the per-document workloads
+DOC_SIZES = {"1kb": 1_000, "10kb": 10_000, "100kb": 100_000}
+
+# Untimed calls before measuring, so caches and allocators are warm
+WARMUP_CALLS = 3
+
+# Below this p50 timer overhead dominates; don't flag regressions
+MIN_COMPARABLE_MS = 0.01
+
+
+@dataclass
+class BenchResult:
+    """Latency samples for one benchmark"""
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    docs: int = 0
+    wall_s: float = 0.0
+    peak_rss_mb: float = 0.0
+
+    def summary(self) -> Dict[str, float]:
+        samples = sorted(self.latencies_ms)
+        return {
+            "n": len(samples),
+            "p50_ms": round(percentile(samples, 50), 4),
+            "p95_ms": round(percentile(samples, 95), 4),
+            "p99_ms": round(percentile(samples, 99), 4),
+            "mean_ms": round(statistics.fmean(samples), 4) if samples else 0.0,
+            "docs_per_sec": round(self.docs / self.wall_s, 2) if self.wall_s else 0.0,
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+        }
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, math.ceil(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_timed(name: str, fn: Callable, inputs: List, docs_per_call: int = 1) -> BenchResult:
+    """Call fn once per input, recording per-call latency."""
+    result = BenchResult(name=name)
+    for item in inputs[:WARMUP_CALLS]:
+        fn(item)
+    perf_counter = time.perf_counter
+    start = perf_counter()
+    for item in inputs:
+        t0 = perf_counter()
+        fn(item)
+        result.latencies_ms.append((perf_counter() - t0) * 1000)
+    result.wall_s = perf_counter() - start
+    result.docs = len(inputs) * docs_per_call
+    result.peak_rss_mb = peak_rss_mb()
+    return result
+
+
+def bench_stages(analyzer: TruthLensAnalyzer, corpus: List[str], urls: List[Optional[str]]) -> List[BenchResult]:
+    """Micro-benchmarks for each pipeline stage in isolation."""
+    cleaned = [analyzer._preprocess(text) for text in corpus]
+    tokens = [analyzer.tokenizer.tokenize(text) for text in cleaned]
+    scans = [analyzer._scanner.scan(t) for t in tokens]
+    source_urls = [url for url in urls if url] or ["https://www.reuters.com/a"]
+    return [
+        run_timed("stage.preprocess", analyzer._preprocess, corpus),
+        run_timed("stage.tokenize", analyzer.tokenizer.tokenize, cleaned),
+        run_timed("stage.scan", analyzer._scanner.scan, tokens),
+        run_timed("stage.sentiment", analyzer._analyze_sentiment, scans),
+        run_timed("stage.bias", analyzer._detect_bias, scans),
+        run_timed("stage.manipulation", analyzer._detect_manipulation, scans),
+        run_timed("stage.source", analyzer._analyze_source, source_urls),
+    ]
+
+
+def bench_documents(analyzer: TruthLensAnalyzer, count: int, batch_size: int) -> List[BenchResult]:
+    """End-to-end analysis over synthetic corpora of varying document size."""
+    results = []
+    for label, size in DOC_SIZES.items():
+        # Fewer large documents keep the run time flat across sizes
+        n = max(4, count * 1_000 // size)
+        corpus = make_corpus(n, size, seed=size)
+        urls = make_urls(n, seed=size)
+        results.append(run_timed(
+            f"analyze.{label}", lambda pair: analyzer.analyze_sync(*pair), list(zip(corpus, urls))
+        ))
+        batches = [
+            (corpus[i:i + batch_size], urls[i:i + batch_size])
+            for i in range(0, n, batch_size)
+        ]
+        batch = run_timed(
+            f"batch.{label}", lambda pair: analyzer.analyze_batch_sync(*pair), batches
+        )
+        batch.docs = n
+        results.append(batch)
+    return results
+
+
+def serialize_result(result: Any, model_name: str = "TruthLens-v2.0") -> dict:
+    """
+    The API result shape as a plain dict.
+
+    Reference for ResultEncoder: the generic path it replaces, and what
+    its output is checked against.
+    """
+    return {
+        "label": "FAKE" if result.credibility_score < 50 else "REAL",
+        "score": round(result.credibility_score / 100, 2),
+        "risk_level": result.verdict,
+        "sentiment": result.sentiment.value,
+        "bias_level": result.bias_level,
+        "manipulative_techniques": [t.value for t in result.manipulative_techniques],
+        "key_findings": result.key_findings,
+        "recommendations": result.recommendations,
+        "fact_checks": [asdict(check) for check in result.fact_checks],
+        "scoring_backend": result.scoring_backend,
+        "model": model_name,
+    }
+
+
+def bench_serialization(analyzer: TruthLensAnalyzer, count: int) -> List[BenchResult]:
+    """API result encoding: generic dict + JSON path vs the precompiled encoder."""
+    from fastapi.encoders import jsonable_encoder
+
+    from src.ml.compact import ResultEncoder
+
+    results = analyzer.analyze_batch_sync(make_corpus(count, 2_000, seed=11), make_urls(count, seed=11))
+    compacted = [result.compact() for result in results]
+    encoder = ResultEncoder()
+    return [
+        run_timed("serialize.dict_json",
+                  lambda r: json.dumps(jsonable_encoder(serialize_result(r)), ensure_ascii=False),
+                  results),
+        run_timed("serialize.encoder", encoder.encode, results),
+        run_timed("serialize.encoder_compact", encoder.encode, compacted),
+    ]
+
+
+def result_memory(analyzer: TruthLensAnalyzer, count: int) -> Dict[str, float]:
+    """Bytes per retained result, as AnalysisResult and as CompactResult."""
+    corpus = make_corpus(count, 1_000, seed=13)
+    urls = make_urls(count, seed=13)
+
+    def bytes_per_result(build: Callable[[], list]) -> float:
+        tracemalloc.start()
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del kept
+        return size / count
+
+    full = bytes_per_result(lambda: analyzer.analyze_batch_sync(corpus, urls))
+    compacted = bytes_per_result(
+        lambda: [r.compact() for r in analyzer.analyze_batch_sync(corpus, urls)]
+    )
+    return {
+        "analysis_result_bytes": round(full, 1),
+        "compact_result_bytes": round(compacted, 1),
+        "reduction": round(1 - compacted / full, 3) if full else 0.0,
+    }
+
+
+async def _load(client, name: str, path: str, payloads: List[dict],
+                concurrency: int, docs_per_request: int) -> BenchResult:
+    result = BenchResult(name=name)
+    queue: asyncio.Queue = asyncio.Queue()
+    for payload in payloads:
+        queue.put_nowait(payload)
+
+    async def worker():
+        while not queue.empty():
+            payload = queue.get_nowait()
+            t0 = time.perf_counter()
+            response = await client.post(path, json=payload)
+            result.latencies_ms.append((time.perf_counter() - t0) * 1000)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.wall_s = time.perf_counter() - start
+    result.docs = len(payloads) * docs_per_request
+    result.peak_rss_mb = peak_rss_mb()
+    return result
+
+
+async def bench_api(requests: int, concurrency: int, batch_size: int) -> List[BenchResult]:
+    """In-process load test of the HTTP endpoints (no network, no uvicorn)."""
+    import httpx
+
+    from src.api.main import app
+
+    corpus = make_corpus(requests, 2_000, seed=7)
+    single = [{"text": text} for text in corpus]
+    batches = [
+        {"items": [{"text": text} for text in corpus[i:i + batch_size]]}
+        for i in range(0, len(corpus), batch_size)
+    ]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return [
+            await _load(client, "api.analyze", "/api/v1/analyze", single, concurrency, 1),
+            await _load(client, "api.batch", "/api/v1/analyze/batch", batches,
+                        max(1, concurrency // 4), batch_size),
+        ]
+
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Describe benchmarks that got slower than the baseline by more than tolerance."""
+    regressions = []
+    for name, stats in current.items():
+        base = baseline.get(name)
+        if not base or base["p50_ms"] < MIN_COMPARABLE_MS:
+            continue
+        if base["p50_ms"] > 0 and stats["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p50 {stats['p50_ms']:.3f}ms vs baseline {base['p50_ms']:.3f}ms"
+            )
+        if base["docs_per_sec"] > 0 and stats["docs_per_sec"] < base["docs_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {stats['docs_per_sec']:.1f} docs/s vs baseline {base['docs_per_sec']:.1f} docs/s"
+            )
+    return regressions
+
+
+def run_suite(quick: bool = False, include_api: bool = True) -> Dict[str, dict]:
+    """Run every workload and return summaries keyed by benchmark name."""
+    analyzer = create_analyzer()
+    count = 50 if quick else 500
+    corpus = make_corpus(count, 2_000)
+    urls = make_urls(count)
+
+    results = bench_stages(analyzer, corpus, urls)
+    results += bench_documents(analyzer, count=20 if quick else 200, batch_size=32)
+    results += bench_serialization(analyzer, count=50 if quick else 1_000)
+    if include_api:
+        results += asyncio.run(bench_api(
+            requests=50 if quick else 1_000, concurrency=16, batch_size=32
+        ))
+    return {r.name: r.summary() for r in results}
+
+
+def best_of(runs: List[Dict[str, dict]]) -> Dict[str, dict]:
+    """Keep the lowest-p50 run of each benchmark to filter out scheduler noise."""
+    return {name: min((run[name] for run in runs), key=lambda stats: stats["p50_ms"])
+            for name in runs[0]}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="TruthLens benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads")
+    parser.add_argument("--no-api", action="store_true", help="skip HTTP load tests")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="run the suite N times and keep each benchmark's best run")
+    parser.add_argument("-o", "--output", help="write JSON report to this file")
+    parser.add_argument("--baseline", help="baseline JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown vs baseline (default 0.25 = 25%%)")
+    parser.add_argument("--save-baseline", help="write results as a new baseline")
+    args = parser.parse_args(argv)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "repeat": args.repeat,
+        "benchmarks": best_of(
+            [run_suite(quick=args.quick, include_api=not args.no_api) for _ in range(max(1, args.repeat))]
+        ),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "result_memory": result_memory(create_analyzer(), 200 if args.quick else 2_000),
+    }
+
+    regressions: List[str] = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("quick") != args.quick:
+            print("Baseline was recorded with a different --quick setting; "
+                  "skipping comparison", file=sys.stderr)
+        else:
+            regressions = compare(report["benchmarks"], baseline["benchmarks"], args.tolerance)
+            report["regressions"] = regressions
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+TruthLens - Startup Benchmark
+=============================
+Import-time audit and time-to-first-response of a cold API process
+
+Usage:
+    python -m benchmarks.startup                     # audit + first response, JSON to stdout
+    python -m benchmarks.startup --repeat 5 -o startup.json
+    python -m benchmarks.startup --uvicorn           # time a real uvicorn server instead
+    python -m benchmarks.startup --check             # exit 1 if a cold-start path imports
+                                                     # a heavy library
+
+Every measurement runs in a fresh interpreter, so nothing is imported
+or compiled in advance except what the image ships as bytecode.
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries the API and bot must not import before their first request
+HEAVY_MODULES = ("numpy", "pandas", "scipy", "sklearn", "joblib", "mlflow", "spacy",
+                 "streamlit", "pyarrow", "torch", "transformers")
+
+# Entry points audited by default: the two cold-start paths and the training CLI
+AUDIT_MODULES = ("src.api.main", "src.bot.main", "src.models.train")
+
+WARM_UP_TEXT = "Officials confirmed the new budget figures in a statement on Tuesday."
+
+# Runs in the child interpreter; stamps are wall-clock so the parent can add spawn time
+_FIRST_RESPONSE = f"""
+import json, time
+boot = time.time()
+from src.api.main import app
+imported = time.time()
+from fastapi.testclient import TestClient
+client_ready = time.time()
+stamps = {{"boot": boot, "imported": imported, "client_ready": client_ready}}
+with TestClient(app) as client:
+    client.get("/").raise_for_status()
+    stamps["first_response"] = time.time()
+    while client.get("/health").status_code != 200:
+        time.sleep(0.005)
+    stamps["ready"] = time.time()
+    client.post("/api/v1/analyze", json={{"text": {WARM_UP_TEXT!r}}}).raise_for_status()
+    stamps["first_analysis"] = time.time()
+print(json.dumps(stamps))
+"""
+
+
+@dataclass
+class ImportRecord:
+    """One line of ``python -X importtime`` output"""
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.name.split(".", 1)[0]
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Parse ``-X importtime`` stderr into records (header and other lines are skipped)."""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        records.append(ImportRecord(
+            name=name.strip(), self_us=int(parts[0]), cumulative_us=int(parts[1]),
+            depth=(len(name) - len(name.lstrip())) // 2
+        ))
+    return records
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    return env
+
+
+def audit_imports(module: str, top: int = 10) -> Dict[str, object]:
+    """
+    Import ``module`` in a fresh interpreter and attribute the time to packages.
+
+    Each module's own (self) time is charged to its top-level package, so
+    the report shows which libraries a cold start pays for and whether any
+    of HEAVY_MODULES got pulled in.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=_env(), capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed"}
+    records = parse_importtime(proc.stderr)
+    by_package: Dict[str, int] = defaultdict(int)
+    for record in records:
+        by_package[record.package] += record.self_us
+    ranked = sorted(by_package.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "total_ms": round(sum(r.self_us for r in records) / 1000, 1),
+        "modules": len(records),
+        "packages_ms": {name: round(us / 1000, 1) for name, us in ranked[:top]},
+        "heavy": sorted({r.package for r in records} & set(HEAVY_MODULES)),
+    }
+
+
+def first_response(timeout: float = 120.0) -> Dict[str, float]:
+    """
+    Time a cold API process from spawn to its first responses (in-process ASGI, no network).
+
+    Reported as milliseconds since spawn: the app imported, the first
+    response to ``/``, ``/health`` turning ready (models warmed up) and
+    the first analysis. The benchmark's own test client import is
+    subtracted from the later stamps.
+    """
+    spawned = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-c", _FIRST_RESPONSE],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, timeout=timeout
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"API process failed: {proc.stderr.strip()[-500:]}")
+    stamps = json.loads(proc.stdout.strip().splitlines()[-1])
+    client_s = stamps["client_ready"] - stamps["imported"]
+
+    def since_spawn(stamp: str, client: bool = True) -> float:
+        return round((stamps[stamp] - spawned - (client_s if client else 0)) * 1000, 1)
+
+    return {
+        "interpreter_ms": since_spawn("boot", client=False),
+        "imported_ms": since_spawn("imported", client=False),
+        "first_response_ms": since_spawn("first_response"),
+        "ready_ms": since_spawn("ready"),
+        "first_analysis_ms": since_spawn("first_analysis"),
+    }
+
+
+def uvicorn_first_response(timeout: float = 120.0) -> Dict[str, float]:
+    """Time a real ``uvicorn src.api.main:app`` process until it answers and turns ready."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+    spawned = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=_env()
+    )
+    report: Dict[str, float] = {}
+    try:
+        while "ready_ms" not in report:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {proc.returncode}")
+            if time.perf_counter() - spawned > timeout:
+                raise TimeoutError(f"API not ready after {timeout:.0f}s")
+            try:
+                with urllib.request.urlopen(f"{base}/health", timeout=1) as response:
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except OSError:
+                time.sleep(0.005)
+                continue
+            elapsed = round((time.perf_counter() - spawned) * 1000, 1)
+            report.setdefault("first_response_ms", elapsed)
+            if status == 200:
+                report["ready_ms"] = elapsed
+            else:
+                time.sleep(0.005)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return report
+
+
+def median_of(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    """Per-phase median across runs."""
+    return {phase: round(statistics.median(run[phase] for run in runs), 1) for phase in runs[0]}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="TruthLens startup benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="cold starts to time (median is reported)")
+    parser.add_argument("--modules", nargs="+", default=list(AUDIT_MODULES), help="modules to audit")
+    parser.add_argument("--uvicorn", action="store_true", help="time a real uvicorn server")
+    parser.add_argument("--check", action="store_true",
+                        help="exit 1 if an audited module imports a heavy library")
+    parser.add_argument("-o", "--output", help="write JSON report to this file")
+    args = parser.parse_args(argv)
+
+    measure = uvicorn_first_response if args.uvicorn else first_response
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "imports": {module: audit_imports(module) for module in args.modules},
+        "first_response": median_of([measure() for _ in range(max(1, args.repeat))]),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    offenders = [f"{module} imports {', '.join(audit['heavy'])}"
+                 for module, audit in report["imports"].items() if audit.get("heavy")]
+    for line in offenders:
+        print(f"HEAVY IMPORT {line}", file=sys.stderr)
+    return 1 if args.check and offenders else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -82,6 +82,8 @@ CREATE INDEX IF NOT EXISTS idx_analyses_credibility ON analyses(credibility_scor
 CREATE INDEX IF NOT EXISTS idx_sources_domain ON sources(domain);
 CREATE INDEX IF NOT EXISTS idx_trends_date ON trends(date);
 CREATE INDEX IF NOT EXISTS idx_trends_topic ON trends(topic);
+-- One row per day/category/topic: trends are upserted on this key by every API/bot process
+CREATE UNIQUE INDEX IF NOT EXISTS uq_trends_date_category_topic ON trends(date, category, topic);
 
 -- Insert default sources
 INSERT INTO sources (domain, name, credibility_score, category, is_verified) VALUES
@@ -0,0 +1,80 @@
+"""
+TruthLens - Bounded Analysis Executor
+=====================================
+Runs CPU-heavy analysis off the event loop with a concurrency limit
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class ExecutorBusyError(Exception):
+    """Raised when the executor queue is full and work is rejected."""
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a bounded backlog.
+
+    At most ``max_workers`` tasks run at once and at most ``max_pending``
+    more wait for a free worker. Submissions beyond that are rejected
+    immediately with ExecutorBusyError so callers can apply backpressure
+    instead of queueing without limit.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 64):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.max_pending = max(0, max_pending)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="truthlens-analysis"
+        )
+        # Only touched from the event loop thread
+        self._in_flight = 0
+
+    @classmethod
+    def from_env(cls) -> "BoundedExecutor":
+        """Create an executor configured from environment variables."""
+        workers = int(os.getenv("TRUTHLENS_ANALYSIS_WORKERS", str(min(4, os.cpu_count() or 1))))
+        pending = int(os.getenv("TRUTHLENS_ANALYSIS_QUEUE", "64"))
+        return cls(max_workers=workers, max_pending=pending)
+
+    @property
+    def in_flight(self) -> int:
+        """Tasks currently running or waiting for a worker."""
+        return self._in_flight
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run fn in the pool, or raise ExecutorBusyError if the queue is full."""
+        if self._in_flight >= self.max_workers + self.max_pending:
+            raise ExecutorBusyError("Analysis queue is full")
+
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(functools.partial(fn, *args, **kwargs))
+        self._in_flight += 1
+        # The slot is freed when the thread is done with fn, not when the
+        # caller stops waiting: a cancelled request keeps its worker busy.
+        # Registered before wrap_future's callback, so it runs first.
+        future.add_done_callback(functools.partial(self._finished, loop))
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _finished(self, loop: asyncio.AbstractEventLoop, future: Any):
+        # Runs on the worker thread; the counter belongs to the loop thread
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            pass  # Loop already closed
+
+    def _release(self):
+        self._in_flight -= 1
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and release worker threads."""
+        self._executor.shutdown(wait=wait)
@@ -1,43 +1,378 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 import asyncio
-from src.ml.analyzer import TruthLensAnalyzer
+import codecs
+import json
+import logging
+import os
+import time
+from src.api.executor import BoundedExecutor, ExecutorBusyError
+from src.ml.analyzer import AnalysisResult, create_analyzer
+from src.ml.cache import ResultCache
+from src.ml.compact import ResultEncoder
+from src.ml.factcheck import FactChecker
+from src.ml.neardup import NearDuplicateIndex
+from src.ml.pool import AnalyzerPool
+from src.ml.singleflight import SingleFlight
+from src.metrics import MetricsRegistry, cache_collectors, stats_collectors
+from src.storage.writer import AnalysisWriter
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = int(os.getenv("TRUTHLENS_MAX_BATCH_SIZE", "100"))
+BATCH_CHUNK_SIZE = 32
+MIN_TEXT_LENGTH = 10
+# NDJSON lines of /api/v1/analyze/stream waiting for a slow client
+STREAM_QUEUE_SIZE = 4
+
+STAGE_TIMINGS = os.getenv("TRUTHLENS_STAGE_TIMINGS", "0") == "1"
+
+near_duplicates = NearDuplicateIndex.from_env()
+analyzer = create_analyzer(
+    cache=ResultCache.from_env(), instrument=STAGE_TIMINGS, near_duplicates=near_duplicates,
+    fact_checker=FactChecker.from_env()
+)
+engine = AnalyzerPool.from_env(local=analyzer)
+executor = BoundedExecutor.from_env()
+persistence = AnalysisWriter.from_env()
+# Identical requests arriving together share one analysis
+flights = SingleFlight()
+
+metrics = MetricsRegistry()
+http_requests = metrics.counter(
+    "truthlens_http_requests_total", "HTTP requests served", ("method", "path", "status")
+)
+http_latency = metrics.histogram(
+    "truthlens_http_request_duration_seconds", "HTTP request latency", ("method", "path")
+)
+http_in_flight = metrics.gauge(
+    "truthlens_http_requests_in_flight", "HTTP requests currently being served"
+)
+documents_analyzed = metrics.counter(
+    "truthlens_documents_analyzed_total", "Documents analyzed", ("backend",)
+)
+near_duplicate_hits = metrics.counter(
+    "truthlens_near_duplicates_total", "Analyses matching an earlier near-duplicate text"
+)
+fact_check_matches = metrics.counter(
+    "truthlens_fact_checks_total", "Claims matched to a verified claim", ("verdict",)
+)
+stage_latency = metrics.histogram(
+    "truthlens_analysis_stage_duration_seconds",
+    "Analyzer stage latency per document (TRUTHLENS_STAGE_TIMINGS=1)", ("stage",)
+)
+metrics.collector(
+    "truthlens_analysis_in_flight", "gauge", "Analysis jobs running or queued",
+    lambda: [({}, executor.in_flight)]
+)
+metrics.collector(
+    "truthlens_ready", "gauge", "Whether models are warmed up",
+    lambda: [({}, int(engine.ready))]
+)
+metrics.collector(
+    "truthlens_model_load_seconds", "gauge", "Model artifact load time",
+    lambda: [({"model": name}, entry["load_time_ms"] / 1000)
+             for name, entry in engine.model_status().items() if "load_time_ms" in entry]
+)
+cache_collectors(metrics, lambda: analyzer.cache.stats() if analyzer.cache else None, "truthlens")
+stats_collectors(metrics, persistence.stats, "truthlens_persist", {
+    "queued": "gauge", "written": "counter", "dropped": "counter", "failed": "counter"
+}, "Analyses persisted to the database:")
+stats_collectors(metrics, lambda: flights, "truthlens_singleflight", {
+    "executed": "counter", "saved": "counter", "in_flight": "gauge"
+}, "Single-flight analyses:")
+stats_collectors(metrics, lambda: analyzer.config_store, "truthlens_analyzer_config", {
+    "swaps": "counter"
+}, "Analyzer config versions:")
+
+def record_result(result: AnalysisResult):
+    """Count an analyzed document and observe its stage timings."""
+    documents_analyzed.inc(backend=result.scoring_backend)
+    if result.near_duplicate_of:
+        near_duplicate_hits.inc()
+    for check in result.fact_checks:
+        fact_check_matches.inc(verdict=check.verdict)
+    if result.stage_timings_ms:
+        for stage, elapsed_ms in result.stage_timings_ms.items():
+            stage_latency.observe(elapsed_ms / 1000, stage=stage)
+
+def log_warm_up_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Warm-up failed: {task.exception()}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so /health can report readiness meanwhile
+    warm_up = asyncio.create_task(asyncio.to_thread(engine.warm_up))
+    warm_up.add_done_callback(log_warm_up_failure)
+    await persistence.start()
+    yield
+    warm_up.cancel()
+    await persistence.stop()
+    analyzer.sources.close()
+    analyzer.config_store.close()
+    # The only index: with worker processes it sits in front of them in this process
+    if near_duplicates is not None:
+        await asyncio.to_thread(near_duplicates.save)
+    engine.shutdown(wait=False)
 
 app = FastAPI(
     title="TruthLens API",
     version="2.0.0",
-    description="AI-Powered Information Credibility Analysis"
+    description="AI-Powered Information Credibility Analysis",
+    lifespan=lifespan
 )
 
-analyzer = TruthLensAnalyzer()
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    http_in_flight.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        http_in_flight.dec()
+        # Route templates keep label cardinality bounded
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        http_latency.observe(time.perf_counter() - start, method=request.method, path=path)
+        http_requests.inc(method=request.method, path=path, status=str(status))
+
+@app.exception_handler(ExecutorBusyError)
+async def executor_busy_handler(request: Request, exc: ExecutorBusyError):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Server is busy, retry later"},
+        headers={"Retry-After": "1"}
+    )
 
 class AnalyzeRequest(BaseModel):
     text: str
     source: Optional[str] = None
     url: Optional[str] = None
 
+class BatchAnalyzeRequest(BaseModel):
+    items: List[AnalyzeRequest]
+    stream: bool = False
+
+# Precompiled encoder for the API result shape; responses skip the generic JSON encoder
+result_encoder = ResultEncoder(model_name="TruthLens-v2.0")
+
+def json_response(content: str) -> Response:
+    return Response(content, media_type="application/json")
+
 @app.get("/")
 def root():
     return {"status": "active", "service": "TruthLens API"}
 
 @app.get("/health")
-def health():
-    return {"status": "ok"}
+def health(response: Response):
+    ready = engine.ready
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ok" if ready else "starting",
+        "ready": ready,
+        "models": engine.model_status(),
+        "config_version": analyzer.config.version,
+        "fact_check_index": analyzer.fact_checker.version if analyzer.fact_checker else None
+    }
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(metrics.render(), media_type=MetricsRegistry.CONTENT_TYPE)
+
+@app.get("/api/v1/trends")
+def get_trends(days: int = 7):
+    """Per-day, per-verdict and per-source aggregates from the trends rollup."""
+    rollup = persistence.rollup
+    if rollup is None:
+        raise HTTPException(status_code=404, detail="Trends are disabled")
+    if not 1 <= days <= rollup.retention_days:
+        raise HTTPException(status_code=422, detail=f"days must be 1-{rollup.retention_days}")
+    try:
+        # Read from the shared table so every worker returns the same totals
+        return persistence.trends(days)
+    except Exception as e:
+        logger.error(f"Failed to read trends: {e}")
+        raise HTTPException(status_code=503, detail="Trends are unavailable")
+
+@app.get("/api/v1/cache/stats")
+def cache_stats():
+    return analyzer.cache.stats().to_dict()
 
 @app.post("/api/v1/analyze")
-def analyze(request: AnalyzeRequest):
-    if not request.text or len(request.text) < 10:
+async def analyze(request: AnalyzeRequest):
+    if not request.text or len(request.text) < MIN_TEXT_LENGTH:
         raise HTTPException(status_code=422, detail="Text too short")
-    result = asyncio.run(analyzer.analyze(request.text, url=request.url))
-    return {
-        "label": "FAKE" if result.credibility_score < 50 else "REAL",
-        "score": round(result.credibility_score / 100, 2),
-        "risk_level": result.verdict,
-        "sentiment": result.sentiment.value,
-        "bias_level": result.bias_level,
-        "manipulative_techniques": [t.value for t in result.manipulative_techniques],
-        "key_findings": result.key_findings,
-        "recommendations": result.recommendations,
-        "model": "TruthLens-v2.0"
-    }
+    result = await flights.do(
+        analyzer.request_key(request.text, request.url),
+        lambda: executor.run(engine.analyze_sync, request.text, request.url)
+    )
+    record_result(result)
+    persistence.submit(result, request.text, request.url)
+    return json_response(result_encoder.encode(result))
+
+@app.post("/api/v1/analyze/batch")
+async def analyze_batch(request: BatchAnalyzeRequest):
+    if not request.items:
+        raise HTTPException(status_code=422, detail="Batch is empty")
+    if len(request.items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch too large (max {MAX_BATCH_SIZE} items)"
+        )
+
+    results = iter_batch_results(request.items)
+    if request.stream:
+        # Produce the first line before responding so a full queue still maps to 429
+        first = await results.__anext__()
+
+        async def lines():
+            yield first + "\n"
+            async for item in results:
+                yield item + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    return json_response('{"results":[' + ",".join([item async for item in results]) + "]}")
+
+async def iter_batch_results(items: List[AnalyzeRequest]):
+    """Analyze batch items in order, yielding one JSON-encoded result object per item."""
+    for start in range(0, len(items), BATCH_CHUNK_SIZE):
+        chunk = items[start:start + BATCH_CHUNK_SIZE]
+        # Invalid items are reported in place; only valid ones are analyzed
+        valid = [i for i, item in enumerate(chunk)
+                 if item.text and len(item.text) >= MIN_TEXT_LENGTH]
+        try:
+            results = await executor.run(
+                engine.analyze_batch_sync,
+                [chunk[i].text for i in valid],
+                [chunk[i].url for i in valid],
+                return_exceptions=True
+            )
+        except ExecutorBusyError as e:
+            # Rejecting the first chunk rejects the request; later chunks fail per item
+            if start == 0:
+                raise
+            results = [e] * len(valid)
+        by_index = dict(zip(valid, results))
+
+        for offset in range(len(chunk)):
+            index = start + offset
+            result = by_index.get(offset)
+            if result is None:
+                yield batch_error(index, "Text too short")
+            elif isinstance(result, ExecutorBusyError):
+                yield batch_error(index, "Server is busy")
+            elif isinstance(result, Exception):
+                yield batch_error(index, "Analysis failed")
+            else:
+                record_result(result)
+                persistence.submit(result, chunk[offset].text, chunk[offset].url)
+                yield f'{{"index":{index},"status":"ok","result":{result_encoder.encode(result)}}}'
+
+def batch_error(index: int, error: str) -> str:
+    return json.dumps({"index": index, "status": "error", "error": error}, separators=(",", ":"))
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse sent while the request body is still being read.
+
+    The body reader owns ``receive`` and sees client disconnects itself;
+    Starlette's disconnect listener would swallow its body messages.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+@app.post("/api/v1/analyze/stream")
+async def analyze_stream(request: Request, url: Optional[str] = None, partial_every: int = 0):
+    """
+    Analyze a raw text body (chunked or streamed) without buffering it whole.
+
+    With ``partial_every`` an NDJSON line with a partial result is sent
+    every that many body chunks, while the body is still arriving, and
+    the final result is the last line.
+    """
+    stream = analyzer.open_stream(url)
+    if partial_every <= 0:
+        async for _ in read_stream(request, stream):
+            pass
+        final = await finish_stream(stream, url)
+        return json_response(f'{{"chars":{stream.chars},' + final[1:])
+
+    # A bounded queue: the body reader waits for the client to take lines
+    lines: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+
+    async def produce():
+        try:
+            async for line in read_stream(request, stream, partial_every):
+                await lines.put(line)
+            final = await finish_stream(stream, url)
+            await lines.put(f'{{"final":true,"chars":{stream.chars},"result":{final}}}')
+        except Exception as e:
+            await lines.put(e)
+        await lines.put(None)
+
+    reader = asyncio.create_task(produce())
+    # Wait for the first line before responding, so early errors keep their status code
+    first = await lines.get()
+    if isinstance(first, Exception):
+        reader.cancel()
+        raise first
+
+    async def body():
+        try:
+            line = first
+            while line is not None:
+                if isinstance(line, Exception):
+                    yield stream_error(line) + "\n"
+                    break
+                yield line + "\n"
+                line = await lines.get()
+        finally:
+            reader.cancel()
+
+    return BodyStreamingResponse(body(), media_type="application/x-ndjson")
+
+async def read_stream(request: Request, stream, partial_every: int = 0):
+    """Feed the request body to an analysis stream, yielding a partial result line every ``partial_every`` chunks."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    async for body in request.stream():
+        text = decoder.decode(body)
+        if not text:
+            continue
+        await executor.run(stream.feed, text)
+        if partial_every > 0 and stream.chunks % partial_every == 0:
+            partial = await executor.run(stream.snapshot)
+            yield f'{{"final":false,"chars":{stream.chars},"result":{result_encoder.encode(partial)}}}'
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        await executor.run(stream.feed, tail)
+
+async def finish_stream(stream, url: Optional[str]) -> str:
+    """Final result of a fed stream, recorded and persisted like /api/v1/analyze, as JSON."""
+    if stream.chars < MIN_TEXT_LENGTH:
+        raise HTTPException(status_code=422, detail="Text too short")
+    result = await executor.run(stream.finish)
+    record_result(result)
+    # The stream keeps no full copy of the body; its head sample is stored
+    persistence.submit(result, stream.sample, url)
+    return result_encoder.encode(result)
+
+def stream_error(error: Exception) -> str:
+    if isinstance(error, HTTPException):
+        detail = error.detail
+    elif isinstance(error, ExecutorBusyError):
+        detail = "Server is busy"
+    else:
+        logger.error(f"Streamed analysis failed: {error}")
+        detail = "Analysis failed"
+    return json.dumps({"final": True, "error": detail}, separators=(",", ":"))
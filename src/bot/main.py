@@ -8,8 +8,10 @@ Email: 102012dl@gmail.com
 """
 
 import asyncio
+import html
 import os
 import logging
+import time
 from typing import Optional
 
 from aiogram import Bot, Dispatcher, types, F
@@ -17,8 +19,18 @@ from aiogram.filters import Command, CommandStart
 from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 
+from src.api.executor import BoundedExecutor, ExecutorBusyError
+from src.bot.sender import OutboundQueue
+from src.bot.service import BotAnalysisService, RateLimitedError, UserRateLimiter
 from src.ml.analyzer import create_analyzer, TruthLensAnalyzer
+from src.ml.cache import ResultCache
+from src.ml.factcheck import FactChecker
+from src.ml.neardup import NearDuplicateIndex
+from src.metrics import MetricsRegistry, cache_collectors
+from src.storage.writer import AnalysisWriter
 
 # Configure logging
 logging.basicConfig(
@@ -30,16 +42,150 @@ logger = logging.getLogger(__name__)
 # ===== Bot Configuration =====
 
 TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
-
-# Initialize bot and dispatcher
-bot = Bot(
-    token=TOKEN,
-    default=DefaultBotProperties(parse_mode=ParseMode.HTML)
-)
+# Port for the Prometheus /metrics endpoint (0 = disabled)
+METRICS_PORT = int(os.getenv("TRUTHLENS_BOT_METRICS_PORT", "0"))
+STAGE_TIMINGS = os.getenv("TRUTHLENS_STAGE_TIMINGS", "0") == "1"
+# Bot API server (e.g. a self-hosted telegram-bot-api); empty = api.telegram.org
+API_URL = os.getenv("TELEGRAM_API_URL", "")
+# Connections kept in the shared HTTP session
+HTTP_POOL_SIZE = int(os.getenv("TRUTHLENS_BOT_HTTP_POOL", "100"))
+
+# Webhook mode (empty URL = long polling)
+WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL", "").rstrip("/")
+WEBHOOK_PATH = os.getenv("TELEGRAM_WEBHOOK_PATH", "/telegram/webhook")
+WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", "")
+WEBHOOK_HOST = os.getenv("TRUTHLENS_BOT_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("TRUTHLENS_BOT_PORT", "8080"))
+
+# Bot is created in main() so the module imports without a token
+bot: Optional[Bot] = None
 dp = Dispatcher()
 
+# Rate-limited queue for every outbound message
+sender = OutboundQueue.from_env()
+
 # Global analyzer
 analyzer: Optional[TruthLensAnalyzer] = None
+service: Optional[BotAnalysisService] = None
+
+# Background writer for the analyses table
+persistence = AnalysisWriter.from_env()
+
+# ===== Metrics =====
+
+metrics = MetricsRegistry()
+messages_handled = metrics.counter(
+    "truthlens_bot_messages_total", "Text messages handled", ("outcome",)
+)
+analysis_latency = metrics.histogram(
+    "truthlens_bot_analysis_duration_seconds", "Analysis latency per message"
+)
+analyses_in_flight = metrics.gauge(
+    "truthlens_bot_analyses_in_flight", "Analyses currently running"
+)
+stage_latency = metrics.histogram(
+    "truthlens_analysis_stage_duration_seconds",
+    "Analyzer stage latency per document (TRUTHLENS_STAGE_TIMINGS=1)", ("stage",)
+)
+metrics.collector(
+    "truthlens_bot_coalesced_total", "counter", "Messages served by an identical in-flight analysis",
+    lambda: [({}, service.flights.saved)] if service else []
+)
+metrics.collector(
+    "truthlens_model_load_seconds", "gauge", "Model artifact load time",
+    lambda: [({"model": name}, entry["load_time_ms"] / 1000)
+             for name, entry in (analyzer.registry.status() if analyzer else {}).items()
+             if "load_time_ms" in entry]
+)
+cache_collectors(
+    metrics, lambda: analyzer.cache.stats() if analyzer and analyzer.cache else None, "truthlens_bot"
+)
+
+metrics.collector(
+    "truthlens_bot_outbound_pending", "gauge", "Telegram calls waiting in the send queue",
+    lambda: [({}, sender.pending)]
+)
+
+async def handle_metrics(request):
+    from aiohttp import web
+
+    return web.Response(
+        body=metrics.render().encode("utf-8"),
+        headers={"Content-Type": MetricsRegistry.CONTENT_TYPE}
+    )
+
+async def start_metrics_server(port: int):
+    """Serve /metrics on a small aiohttp server next to polling."""
+    from aiohttp import web
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, port=port).start()
+    logger.info(f"Metrics available on :{port}/metrics")
+    return runner
+
+# ===== Bot & Webhook =====
+
+def create_bot(token: str, api_url: str = "") -> Bot:
+    """Create a Bot on one pooled aiohttp session, reused for every API call."""
+    session_kwargs = {"limit": HTTP_POOL_SIZE}
+    if api_url:
+        session_kwargs["api"] = TelegramAPIServer.from_base(api_url)
+    return Bot(
+        token=token,
+        session=AiohttpSession(**session_kwargs),
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML)
+    )
+
+def create_webhook_app(bot: Bot):
+    """aiohttp app receiving updates on WEBHOOK_PATH and serving /metrics."""
+    from aiohttp import web
+    from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp, bot=bot, secret_token=WEBHOOK_SECRET or None
+    ).register(app, path=WEBHOOK_PATH)
+    app.router.add_get("/metrics", handle_metrics)
+    setup_application(app, dp, bot=bot)
+    return app
+
+async def run_webhook(bot: Bot):
+    """Register the webhook with Telegram and serve updates until cancelled."""
+    from aiohttp import web
+
+    await bot.set_webhook(WEBHOOK_URL + WEBHOOK_PATH, secret_token=WEBHOOK_SECRET or None)
+    runner = web.AppRunner(create_webhook_app(bot))
+    await runner.setup()
+    await web.TCPSite(runner, host=WEBHOOK_HOST, port=WEBHOOK_PORT).start()
+    logger.info(f"Webhook listening on {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+def send(chat_id: int, factory) -> asyncio.Future:
+    """
+    Queue a Telegram call for a chat; await the result only if you need it.
+
+    A full outbound queue is logged here and fails the returned future
+    instead of raising, so fire-and-forget sends never break a handler.
+    """
+    try:
+        return sender.send(chat_id, factory)
+    except asyncio.QueueFull as e:
+        logger.warning(f"Outbound queue full, message to chat {chat_id} dropped")
+        future = asyncio.get_running_loop().create_future()
+        future.set_exception(e)
+        # Mark the exception retrieved for callers that don't await it
+        future.add_done_callback(lambda f: f.exception())
+        return future
+
+def reply(message: Message, text: str, **kwargs) -> asyncio.Future:
+    """Queue an answer to a message; await the result only if you need it."""
+    return send(message.chat.id, lambda: message.answer(text, **kwargs))
 
 # ===== Keyboards =====
 
@@ -83,7 +229,7 @@ async def cmd_start(message: Message):
 
 Оберіть дію:
     """
-    await message.answer(welcome_text, reply_markup=get_main_keyboard())
+    await reply(message, welcome_text, reply_markup=get_main_keyboard())
 
 @dp.message(Command("help"))
 async def cmd_help(message: Message):
@@ -104,7 +250,7 @@ async def cmd_help(message: Message):
 🟠 40-59% - Невизначено
 🔴 0-39% - Сумнівно
     """
-    await message.answer(help_text)
+    await reply(message, help_text)
 
 @dp.message(Command("about"))
 async def cmd_about(message: Message):
@@ -125,33 +271,69 @@ AI-платформа для аналізу достовірності інфо
 
 <b>Capstone Project | Neoversity</b>
     """
-    await message.answer(about_text)
+    await reply(message, about_text)
+
+def log_warm_up_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Warm-up failed: {task.exception()}")
+
+def init_service():
+    """Create the analyzer and the bounded, rate-limited analysis service."""
+    global analyzer, service
+    analyzer = create_analyzer(
+        cache=ResultCache.from_env(), instrument=STAGE_TIMINGS,
+        near_duplicates=NearDuplicateIndex.from_env(), fact_checker=FactChecker.from_env()
+    )
+    service = BotAnalysisService(analyzer, BoundedExecutor.from_env(), UserRateLimiter.from_env())
 
 @dp.message(F.text)
 async def handle_text(message: Message):
     """Handle text messages - perform analysis."""
-    global analyzer
-    
-    if analyzer is None:
-        analyzer = create_analyzer()
+    if service is None:
+        init_service()
         await analyzer.load_models()
     
     text = message.text
     
     # Check minimum length
     if len(text) < 20:
-        await message.answer(
+        messages_handled.inc(outcome="too_short")
+        reply(
+            message,
             "⚠️ Текст занадто короткий для аналізу.\n"
             "Надішліть більше тексту (мінімум 20 символів)."
         )
         return
     
-    # Send "analyzing" message
-    status_msg = await message.answer("🔄 Аналізую текст...")
+    try:
+        service.admit(message.from_user.id)
+    except RateLimitedError as e:
+        messages_handled.inc(outcome="rate_limited")
+        reply(
+            message,
+            f"⏳ Забагато запитів. Спробуйте через {max(1, round(e.retry_after))} с."
+        )
+        return
     
+    chat_id = message.chat.id
+    status_msg = None
+    outcome, notice = "error", "❌ Помилка при аналізі. Спробуйте пізніше."
     try:
-        # Perform analysis
-        result = await analyzer.analyze(text)
+        # Send "analyzing" message; the result replaces it in place
+        status_msg = await reply(message, "🔄 Аналізую текст...")
+        
+        analyses_in_flight.inc()
+        start = time.perf_counter()
+        # Perform analysis (off the dispatcher loop, shared with identical texts)
+        try:
+            result = await service.analyze(text)
+        finally:
+            analyses_in_flight.dec()
+            analysis_latency.observe(time.perf_counter() - start)
+        if result.stage_timings_ms:
+            for stage, elapsed_ms in result.stage_timings_ms.items():
+                stage_latency.observe(elapsed_ms / 1000, stage=stage)
+        persistence.submit(result, text)
         
         # Format response
         emoji = get_score_emoji(result.credibility_score)
@@ -176,23 +358,37 @@ async def handle_text(message: Message):
         for rec in result.recommendations[:2]:
             response += f"• {rec}\n"
         
+        if result.fact_checks:
+            # Claims are the user's own text: escape them for HTML parse mode
+            response += "\n🧾 <b>Перевірка фактів:</b>\n"
+            for check in result.fact_checks[:3]:
+                link = (f' (<a href="{html.escape(check.sources[0])}">джерело</a>)'
+                        if check.sources else "")
+                response += f"• {html.escape(check.claim[:200])} — <b>{check.verdict}</b>{link}\n"
+        
         response += f"\n⏱ Час аналізу: {result.processing_time_ms}мс"
         
-        # Delete status message and send result
-        await status_msg.delete()
-        await message.answer(response)
+        outcome, notice = "ok", response
         
+    except ExecutorBusyError:
+        outcome, notice = "busy", "⏳ Сервіс зараз перевантажений. Спробуйте за хвилину."
     except Exception as e:
-        logger.error(f"Analysis error: {e}")
-        await status_msg.edit_text(
-            "❌ Помилка при аналізі. Спробуйте пізніше."
-        )
+        logger.error(f"Text from chat {chat_id} failed: {e}")
+    messages_handled.inc(outcome=outcome)
+    
+    if status_msg is None:
+        # The placeholder never went out (queue full or Telegram error): nothing to edit
+        logger.warning(f"No reply sent to chat {chat_id} ({outcome})")
+        return
+    # Edit the status message into the result (queued, not awaited)
+    send(chat_id, lambda: status_msg.edit_text(notice))
 
 # ===== Callback Handlers =====
 
 @dp.callback_query(F.data == "analyze")
 async def callback_analyze(callback: types.CallbackQuery):
-    await callback.message.answer(
+    reply(
+        callback.message,
         "📝 Надішліть мені текст новини для аналізу."
     )
     await callback.answer()
@@ -204,7 +400,8 @@ async def callback_about(callback: types.CallbackQuery):
 
 @dp.callback_query(F.data == "stats")
 async def callback_stats(callback: types.CallbackQuery):
-    await callback.message.answer(
+    reply(
+        callback.message,
         "📊 <b>Ваша статистика:</b>\n\n"
         "• Запитів сьогодні: 0\n"
         "• Всього аналізів: 0\n"
@@ -214,7 +411,8 @@ async def callback_stats(callback: types.CallbackQuery):
 
 @dp.callback_query(F.data == "settings")
 async def callback_settings(callback: types.CallbackQuery):
-    await callback.message.answer(
+    reply(
+        callback.message,
         "⚙️ <b>Налаштування:</b>\n\n"
         "• Мова: Українська\n"
         "• Детальний аналіз: Увімкнено\n"
@@ -226,20 +424,37 @@ async def callback_settings(callback: types.CallbackQuery):
 
 async def main():
     """Main function to run the bot."""
-    global analyzer
-    
+    global bot
     if not TOKEN:
         logger.error("TELEGRAM_BOT_TOKEN not set!")
         return
     
     logger.info("Starting TruthLens bot...")
+    bot = create_bot(TOKEN, API_URL)
     
-    # Initialize analyzer
-    analyzer = create_analyzer()
-    await analyzer.load_models()
+    # Models load in the background; updates are answered (heuristics only) meanwhile
+    init_service()
+    warm_up = asyncio.create_task(analyzer.load_models())
+    warm_up.add_done_callback(log_warm_up_failure)
     
-    # Start polling
-    await dp.start_polling(bot)
+    await persistence.start()
+    sender.start()
+    
+    try:
+        if WEBHOOK_URL:
+            await run_webhook(bot)
+        else:
+            if METRICS_PORT:
+                await start_metrics_server(METRICS_PORT)
+            await bot.delete_webhook()
+            await dp.start_polling(bot)
+    finally:
+        warm_up.cancel()
+        await sender.stop()
+        await persistence.stop()
+        if analyzer.near_duplicates is not None:
+            await asyncio.to_thread(analyzer.near_duplicates.save)
+        await bot.session.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
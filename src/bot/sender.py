@@ -0,0 +1,206 @@
+"""
+TruthLens - Outbound Send Queue
+===============================
+Rate-limited delivery of Telegram API calls
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+from src.bot.service import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+SendFactory = Callable[[], Awaitable[Any]]
+
+
+class OutboundQueue:
+    """
+    Paces outbound Telegram calls to stay inside the Bot API limits.
+
+    Calls are queued per chat and released by a scheduler that holds
+    two token buckets: a global one (about 30 messages/second per bot)
+    and one per chat (about 1 message/second, with a small burst so a
+    placeholder and its edit go out back to back). A chat waiting on its
+    own budget doesn't hold up other chats. A 429 answer (an error with
+    ``retry_after``, like aiogram's TelegramRetryAfter) pauses all sends
+    for that long and retries the call.
+
+    Handlers call send() and await the returned future only when they
+    need the result (e.g. the placeholder message to edit later).
+
+    Args:
+        per_second: Global sends per second
+        per_chat_per_second: Sustained sends per second to one chat
+        chat_burst: Back-to-back sends allowed to one chat
+        max_pending: Queued calls before send() raises QueueFull
+        max_retries: Retries after a 429 before the call fails
+        max_chats: Per-chat buckets kept in memory (least recent dropped)
+    """
+
+    def __init__(self, per_second: float = 30, per_chat_per_second: float = 1,
+                 chat_burst: int = 3, max_pending: int = 10_000, max_retries: int = 3,
+                 max_chats: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.per_chat_per_second = per_chat_per_second
+        self.chat_burst = chat_burst
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.max_chats = max_chats
+        self._clock = clock
+        self._global = TokenBucket(per_second, max(1, per_second), clock())
+        self._chat_buckets: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+        self._chats: Dict[Hashable, Deque[list]] = {}
+        # (ready_at, seq, chat_id) for chats with queued calls
+        self._ready: List[Tuple[float, int, Hashable]] = []
+        self._seq = itertools.count()
+        self._pending = 0
+        self._paused_until = 0.0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._deliveries: set = set()
+
+    @classmethod
+    def from_env(cls) -> "OutboundQueue":
+        """Create a queue configured from environment variables."""
+        return cls(
+            per_second=float(os.getenv("TRUTHLENS_BOT_SEND_PER_SECOND", "30")),
+            per_chat_per_second=float(os.getenv("TRUTHLENS_BOT_SEND_PER_CHAT", "1"))
+        )
+
+    @property
+    def pending(self) -> int:
+        """Calls queued and not yet started."""
+        return self._pending
+
+    def start(self):
+        """Start the scheduler on the running loop (send() does this on first use)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop scheduling; calls already started are awaited."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._deliveries:
+            await asyncio.gather(*self._deliveries, return_exceptions=True)
+
+    def send(self, chat_id: Hashable, factory: SendFactory) -> asyncio.Future:
+        """Queue an API call for a chat; the future resolves with its result."""
+        if self._pending >= self.max_pending:
+            raise asyncio.QueueFull("Outbound queue is full")
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        # Fire-and-forget sends are fine; failures are logged in _deliver
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        queue = self._chats.get(chat_id)
+        if queue is None:
+            queue = self._chats[chat_id] = deque()
+        queue.append([factory, future, 0])
+        self._pending += 1
+        if len(queue) == 1:
+            self._schedule(chat_id, self._clock())
+        return future
+
+    def _schedule(self, chat_id: Hashable, ready_at: float):
+        heapq.heappush(self._ready, (ready_at, next(self._seq), chat_id))
+        self._wake.set()
+
+    def _chat_bucket(self, chat_id: Hashable, now: float) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = TokenBucket(
+                self.per_chat_per_second, self.chat_burst, now
+            )
+            if len(self._chat_buckets) > self.max_chats:
+                self._chat_buckets.popitem(last=False)
+        else:
+            self._chat_buckets.move_to_end(chat_id)
+        return bucket
+
+    async def _sleep(self, delay: float):
+        """Sleep up to delay, waking early when new work arrives."""
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, delay))
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        while True:
+            if not self._ready:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            now = self._clock()
+            if now < self._paused_until:
+                await self._sleep(self._paused_until - now)
+                continue
+            ready_at, _, chat_id = self._ready[0]
+            if ready_at > now:
+                await self._sleep(ready_at - now)
+                continue
+            heapq.heappop(self._ready)
+
+            chat_bucket = self._chat_bucket(chat_id, now)
+            wait = chat_bucket.consume(now)
+            if wait > 0:
+                self._schedule(chat_id, now + wait)
+                continue
+            wait = self._global.consume(now)
+            if wait > 0:
+                chat_bucket.tokens += 1  # give back the chat token we didn't use
+                self._schedule(chat_id, now + wait)
+                continue
+
+            queue = self._chats[chat_id]
+            item = queue.popleft()
+            self._pending -= 1
+            if queue:
+                self._schedule(chat_id, now)
+            else:
+                del self._chats[chat_id]
+            delivery = asyncio.create_task(self._deliver(chat_id, item))
+            self._deliveries.add(delivery)
+            delivery.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, chat_id: Hashable, item: list):
+        factory, future, attempts = item
+        if future.cancelled():
+            return
+        try:
+            result = await factory()
+        except Exception as e:
+            retry_after = getattr(e, "retry_after", None)
+            if retry_after is not None and attempts < self.max_retries:
+                logger.warning(f"Telegram flood control, pausing sends for {retry_after}s")
+                self._paused_until = max(self._paused_until, self._clock() + retry_after)
+                item[2] = attempts + 1
+                # Retry before anything else queued for this chat
+                queue = self._chats.get(chat_id)
+                if queue is None:
+                    queue = self._chats[chat_id] = deque()
+                    self._schedule(chat_id, self._paused_until)
+                queue.appendleft(item)
+                self._pending += 1
+                self._wake.set()
+                return
+            logger.error(f"Telegram call to chat {chat_id} failed: {e}")
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
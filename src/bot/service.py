@@ -0,0 +1,137 @@
+"""
+TruthLens - Bot Analysis Service
+================================
+Bounded, rate-limited and coalesced analysis for bot messages
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from src.api.executor import BoundedExecutor
+from src.ml.analyzer import AnalysisResult, TruthLensAnalyzer
+from src.ml.singleflight import SingleFlight
+
+
+class RateLimitedError(Exception):
+    """Raised when a user has used up their request budget."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Classic token bucket: ``capacity`` burst, refilled at ``rate`` tokens/second"""
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def consume(self, now: float) -> float:
+        """Take one token; returns 0 on success, else seconds until one is available."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class UserRateLimiter:
+    """
+    Independent token bucket per user.
+
+    Every user gets the same budget regardless of what others send, so
+    one user flooding the bot only throttles themselves. Buckets of the
+    least recently seen users are dropped past ``max_users``; a dropped
+    bucket would have been full again anyway once it had been idle
+    long enough.
+
+    Args:
+        per_minute: Sustained requests per minute per user
+        burst: Requests a user can make back to back
+        max_users: Buckets kept in memory
+    """
+
+    def __init__(self, per_minute: float = 10, burst: int = 3, max_users: int = 100_000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60
+        self.burst = max(1, burst)
+        self.max_users = max_users
+        self._clock = clock
+        self._buckets: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "UserRateLimiter":
+        """Create a limiter configured from environment variables."""
+        return cls(
+            per_minute=float(os.getenv("TRUTHLENS_BOT_RATE_PER_MINUTE", "10")),
+            burst=int(os.getenv("TRUTHLENS_BOT_RATE_BURST", "3"))
+        )
+
+    def check(self, user_id: Hashable) -> float:
+        """Charge one request to a user; returns 0 if allowed, else retry-after seconds."""
+        now = self._clock()
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = TokenBucket(self.rate, self.burst, now)
+            if len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(user_id)
+        return bucket.consume(now)
+
+
+class BotAnalysisService:
+    """
+    Runs bot analyses off the dispatcher loop.
+
+    Each message is charged to its sender's rate limit (admit()), then
+    analyzed on a BoundedExecutor so a forward storm queues (or is
+    rejected with ExecutorBusyError) instead of blocking polling and
+    other handlers.
+    Identical texts already being analyzed share that analysis through
+    a SingleFlight: N users forwarding the same post cost one run.
+    Finished results are reused through the analyzer's result cache.
+
+    Args:
+        analyzer: Analyzer doing the work
+        executor: Bounded pool the analyses run on
+        limiter: Per-user rate limiter (None = unlimited)
+        flights: Single-flight group (shared with other callers if given)
+    """
+
+    def __init__(self, analyzer: TruthLensAnalyzer, executor: BoundedExecutor,
+                 limiter: Optional[UserRateLimiter] = None,
+                 flights: Optional[SingleFlight] = None):
+        self.analyzer = analyzer
+        self.executor = executor
+        self.limiter = limiter
+        self.flights = flights if flights is not None else SingleFlight()
+
+    @property
+    def coalesced(self) -> int:
+        """Analyses saved by joining an identical one in flight."""
+        return self.flights.saved
+
+    def admit(self, user_id: Hashable):
+        """Charge a message to its sender, raising RateLimitedError when over budget."""
+        if self.limiter is not None:
+            retry_after = self.limiter.check(user_id)
+            if retry_after > 0:
+                raise RateLimitedError(retry_after)
+
+    async def analyze(self, text: str) -> AnalysisResult:
+        """Analyze a message text, raising ExecutorBusyError when the pool is full."""
+        return await self.flights.do(
+            self.analyzer.request_key(text),
+            lambda: self.executor.run(self.analyzer.analyze_sync, text)
+        )
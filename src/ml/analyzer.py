@@ -8,11 +8,23 @@ Email: 102012dl@gmail.com
 """
 
 import re
-from dataclasses import dataclass, field
+import time
+from dataclasses import asdict, dataclass, field, replace
 from typing import List, Dict, Optional, Any
 from enum import Enum
 import asyncio
 
+from src.ml.cache import ResultCache, make_cache_key
+from src.ml.config import AnalyzerConfig, ConfigStore, ScoringWeights
+from src.ml.factcheck import FactChecker
+from src.ml.neardup import NearDuplicate, NearDuplicateIndex
+from src.ml.registry import ModelRegistry
+from src.ml.language import LanguageDetector, LexiconPacks
+from src.ml.scanner import LexiconScanner, ScanResult
+from src.ml.scorer import CredibilityScore, CredibilityScorer
+from src.ml.sources import SourceIndex
+from src.ml.tokenizer import DEFAULT_TOKENIZER, Tokenizer
+
 
 class Sentiment(str, Enum):
     """Sentiment classification"""
@@ -90,6 +102,98 @@ class AnalysisResult:
     language: str = "en"
     processing_time_ms: int = 0
     model_version: str = "1.0.0"
+    scoring_backend: str = "heuristic"
+    model_probability: Optional[float] = None  # P(credible) from the trained model
+    stage_timings_ms: Optional[Dict[str, float]] = None  # Only when instrumented
+    
+    # Near-duplicate of an earlier analysis (request key and estimated Jaccard similarity)
+    near_duplicate_of: Optional[str] = None
+    near_duplicate_similarity: Optional[float] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dict."""
+        return asdict(self)
+    
+    def compact(self) -> "CompactResult":
+        """Slotted, memory-lean copy (see src.ml.compact)."""
+        from src.ml.compact import CompactResult
+        return CompactResult.from_result(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AnalysisResult":
+        """Rebuild a result from to_dict() output."""
+        data = dict(data)
+        data['sentiment'] = Sentiment(data['sentiment'])
+        data['bias_types'] = [BiasType(b) for b in data.get('bias_types', [])]
+        data['manipulative_techniques'] = [
+            ManipulativeTechnique(t) for t in data.get('manipulative_techniques', [])
+        ]
+        data['fact_checks'] = [FactCheck(**f) for f in data.get('fact_checks', [])]
+        return cls(**data)
+
+
+def _expand(stored: Any) -> AnalysisResult:
+    """A private AnalysisResult from a cache or near-duplicate entry (stored as CompactResult)."""
+    return stored if isinstance(stored, AnalysisResult) else stored.to_result()
+
+
+class _StageClock:
+    """Per-document stage timer, only created when instrumentation is on"""
+    __slots__ = ('timings', '_last')
+    
+    def __init__(self):
+        self.timings: Dict[str, int] = {}
+        self._last = time.perf_counter_ns()
+    
+    def lap(self, stage: str):
+        """Charge the time since the previous lap to a stage."""
+        now = time.perf_counter_ns()
+        self.timings[stage] = self.timings.get(stage, 0) + now - self._last
+        self._last = now
+    
+    def add(self, stage: str, elapsed_ns: int):
+        """Charge a share of batch-level work to a stage and restart the lap."""
+        self.timings[stage] = self.timings.get(stage, 0) + elapsed_ns
+        self._last = time.perf_counter_ns()
+    
+    def to_ms(self) -> Dict[str, float]:
+        return {stage: round(ns / 1e6, 4) for stage, ns in self.timings.items()}
+
+
+@dataclass
+class Lookup:
+    """Cache and near-duplicate lookup of one document, done before analyzing it"""
+    result: Optional[AnalysisResult] = None  # Earlier result to reuse, if any
+    cache_key: Optional[str] = None
+    domain: Optional[str] = None
+    signature: Any = None  # MinHash signature, when near-duplicates are indexed
+    near_duplicate: Optional[NearDuplicate] = None
+
+
+@dataclass
+class _DocumentSignals:
+    """Per-document detector output awaiting batch scoring"""
+    index: int
+    cleaned_text: str
+    cache_key: Optional[str]
+    sentiment: Sentiment
+    sentiment_score: float
+    bias_level: str
+    bias_score: float
+    bias_types: List[BiasType]
+    techniques: List[ManipulativeTechnique]
+    manipulation_score: float
+    source_credibility: Optional[float]
+    source_name: Optional[str]
+    heuristic_score: int
+    elapsed_ms: float
+    clock: Optional[_StageClock] = None
+    config: Optional[AnalyzerConfig] = None
+    language: str = "en"
+    domain: Optional[str] = None
+    signature: Any = None  # MinHash signature, when near-duplicates are indexed
+    near_duplicate: Optional[NearDuplicate] = None
+    claims: Optional[List[str]] = None  # Checkable sentences, when fact checking is on
 
 
 class TruthLensAnalyzer:
@@ -103,33 +207,14 @@ class TruthLensAnalyzer:
     - Sentiment Analysis (TextBlob/BERT)
     - Bias Detection (Custom classifier)
     - Manipulative Technique Detection
-    - Fact Checking (RAG-based)
+    - Fact Checking (retrieval of verified claims, optional)
     - Source Verification
     """
     
-    # Emotional/sensational words
-    EMOTIONAL_WORDS = {
-        'shocking', 'unbelievable', 'incredible', 'amazing', 'terrifying',
-        'horrifying', 'devastating', 'explosive', 'breaking', 'urgent',
-        'scandal', 'exposed', 'revealed', 'secret', 'hidden', 'banned',
-        'miracle', 'stunning', 'outrageous', 'disgusting', 'horrific'
-    }
+    # Lexicons (emotional/fear terms, clickbait patterns, sentiment words) live
+    # in per-language packs under src/ml/lexicons, see LexiconPacks
     
-    # Clickbait patterns
-    CLICKBAIT_PATTERNS = [
-        r"you won't believe",
-        r"what happens next",
-        r"\d+ reasons why",
-        r"this is why",
-        r"here's what",
-        r"the truth about",
-        r"\?\!+$",
-        r"!!!+",
-        r"doctors hate",
-        r"one weird trick"
-    ]
-    
-    # Known reliable sources
+    # Built-in sources, overridden by the sources table (see SourceIndex)
     RELIABLE_SOURCES = {
         'reuters.com': 0.95,
         'apnews.com': 0.95,
@@ -152,24 +237,112 @@ class TruthLensAnalyzer:
         'beforeitsnews.com': 0.1
     }
     
-    def __init__(self, use_gpu: bool = False):
-        """Initialize the analyzer."""
+    MODEL_VERSION = "1.0.0"
+    
+    def __init__(self, use_gpu: bool = False, cache: Optional[ResultCache] = None,
+                 registry: Optional[ModelRegistry] = None, instrument: bool = False,
+                 sources: Optional[SourceIndex] = None,
+                 near_duplicates: Optional[NearDuplicateIndex] = None,
+                 tokenizer: Optional[Tokenizer] = None,
+                 lexicons: Optional[LexiconPacks] = None,
+                 language_detector: Optional[LanguageDetector] = None,
+                 config: Optional[ConfigStore] = None,
+                 fact_checker: Optional[FactChecker] = None):
+        """
+        Initialize the analyzer.
+        
+        With ``instrument`` every result carries per-stage timings in
+        ``stage_timings_ms``; when off the stages are not timed at all.
+        With ``near_duplicates`` a text close to one analyzed earlier
+        from the same source reuses that verdict instead of a full
+        analysis; matches from other sources are analyzed and reported.
+        ``tokenizer`` normalizes and splits each document once for all
+        detectors (see src.ml.tokenizer). Each document's language is
+        detected and its lexicon pack compiled on first use.
+        Lexicons, extra source scores and scoring weights come from the
+        versioned ``config`` (TRUTHLENS_ANALYZER_CONFIG by default), which
+        is reloaded in the background without a restart.
+        With ``fact_checker`` checkable claims are looked up in a local
+        index of verified claims and matches fill ``fact_checks``.
+        """
         self.use_gpu = use_gpu
+        self.instrument = instrument
+        self.cache = cache
+        self.near_duplicates = near_duplicates
+        self.fact_checker = fact_checker
+        self.registry = registry or ModelRegistry.from_env()
+        self.scorer = CredibilityScorer.from_env(self.registry)
+        if sources is None:
+            sources = SourceIndex.from_env(
+                defaults={**self.RELIABLE_SOURCES, **self.UNRELIABLE_SOURCES}
+            )
+        self._sources = sources
         self._models_loaded = False
         self._llm_client = None
+        self.tokenizer = tokenizer or DEFAULT_TOKENIZER
+        self.config_store = config or ConfigStore.from_env(
+            model_version=self.MODEL_VERSION, sources=sources,
+            tokenizer=self.tokenizer, lexicons=lexicons
+        )
+        self.language_detector = language_detector or LanguageDetector(default=self.lexicons.default)
+    
+    @property
+    def config(self) -> AnalyzerConfig:
+        """Config snapshot new requests are analyzed with."""
+        return self.config_store.current
+    
+    @property
+    def sources(self) -> SourceIndex:
+        """Source index of the current config snapshot."""
+        return self._source_index(self.config_store.current)
+    
+    def _source_index(self, config: AnalyzerConfig) -> SourceIndex:
+        # A store created without an index leaves sources to the analyzer's own
+        index = config.source_index
+        return index if index is not None else self._sources
+    
+    @property
+    def lexicons(self) -> LexiconPacks:
+        return self.config_store.current.lexicons
+    
+    @property
+    def model_version(self) -> str:
+        """Model version including the config version, as reported in results and cache keys."""
+        return self.config_store.current.model_version
+    
+    @property
+    def _scanner(self) -> LexiconScanner:
+        """Scanner of the default language."""
+        return self.lexicons.scanner(self.lexicons.default)
     
     async def load_models(self):
         """Load ML models (lazy loading)."""
+        if self._models_loaded:
+            return
+        await asyncio.to_thread(self.load_models_sync)
+    
+    def load_models_sync(self):
+        """Blocking variant of load_models() for executors and worker processes."""
         if self._models_loaded:
             return
         
-        # In production, load actual models here:
-        # - transformers for BERT
-        # - spacy for NLP
-        # - custom trained models
+        # Trained artifacts come from the registry; transformers/spaCy
+        # models can be registered there as they land
+        self.registry.warm_up()
+        self.load_config_sync()
         
         self._models_loaded = True
     
+    def load_config_sync(self):
+        """Load source scores and start config refresh, without the models."""
+        self.sources.warm_up()
+        self.config_store.start_refresh()
+    
+    @property
+    def models_ready(self) -> bool:
+        """Whether model warm-up has finished."""
+        return self._models_loaded
+    
     async def analyze(self, text: str, url: Optional[str] = None) -> AnalysisResult:
         """
         Perform comprehensive credibility analysis.
@@ -181,80 +354,352 @@ class TruthLensAnalyzer:
         Returns:
             AnalysisResult with all analysis components
         """
-        import time
-        start_time = time.time()
+        return self.analyze_sync(text, url)
+    
+    async def analyze_batch(self, texts: List[str], urls: Optional[List[Optional[str]]] = None,
+                            return_exceptions: bool = False) -> List[Any]:
+        """
+        Analyze many documents in one call.
+        
+        The compiled scanner is shared by every document and source
+        lookups are memoized for the whole batch.
+        
+        Args:
+            texts: Text contents to analyze
+            urls: Optional source URLs, aligned with texts
+            return_exceptions: Return per-item exceptions in place of
+                results instead of raising the first one
+            
+        Returns:
+            List of AnalysisResult (or exceptions) in input order
+        """
+        return self.analyze_batch_sync(texts, urls, return_exceptions)
+    
+    def analyze_sync(self, text: str, url: Optional[str] = None) -> AnalysisResult:
+        """Blocking variant of analyze() for executors and worker threads."""
+        return self.analyze_batch_sync([text], [url])[0]
+    
+    def analyze_batch_sync(self, texts: List[str], urls: Optional[List[Optional[str]]] = None,
+                           return_exceptions: bool = False) -> List[Any]:
+        """Blocking variant of analyze_batch() for executors and worker threads."""
+        if urls is None:
+            urls = [None] * len(texts)
+        elif len(urls) != len(texts):
+            raise ValueError("texts and urls must have the same length")
+        
+        # One config snapshot for the whole batch, even if a new one is swapped in
+        config = self.config_store.current
+        
+        # Stage 1: per-document signals (cache hits short-circuit here)
+        sources: Dict[str, tuple] = {}
+        results: List[Any] = [None] * len(texts)
+        pending: List[_DocumentSignals] = []
+        for index, (text, url) in enumerate(zip(texts, urls)):
+            try:
+                signals = self._extract_signals(index, text, url, sources, config)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results[index] = e
+                continue
+            if isinstance(signals, AnalysisResult):
+                results[index] = signals
+            else:
+                pending.append(signals)
+        
+        # Stage 2: one vectorized scoring call for the whole batch
+        if pending:
+            start = time.perf_counter_ns()
+            scores = self.scorer.score_batch(
+                [s.cleaned_text for s in pending],
+                [s.heuristic_score for s in pending],
+                model_weight=config.weights.model_weight
+            )
+            scoring_ns = (time.perf_counter_ns() - start) // len(pending)
+            
+            # Stage 3: claims of the whole batch embedded and looked up at once
+            fact_checks: List[Optional[List[FactCheck]]] = [None] * len(pending)
+            fact_check_ns = 0
+            if self.fact_checker is not None:
+                start = time.perf_counter_ns()
+                fact_checks = self.fact_checker.check_batch([s.claims or [] for s in pending])
+                fact_check_ns = (time.perf_counter_ns() - start) // len(pending)
+            
+            for signals, score, checks in zip(pending, scores, fact_checks):
+                signals.elapsed_ms += (scoring_ns + fact_check_ns) / 1e6
+                if signals.clock is not None:
+                    signals.clock.add('scoring', scoring_ns)
+                    if self.fact_checker is not None:
+                        signals.clock.add('fact_check', fact_check_ns)
+                result = self._build_result(signals, score, checks)
+                self._store(signals.cache_key, signals.signature, signals.domain, result)
+                results[signals.index] = result
+        return results
+    
+    def _extract_signals(self, index: int, text: str, url: Optional[str],
+                         sources: Dict[str, tuple], config: AnalyzerConfig) -> Any:
+        """Run the per-document stages, or return a cached result."""
+        start = time.perf_counter()
+        clock = _StageClock() if self.instrument else None
         
         # Preprocess text
         cleaned_text = self._preprocess(text)
+        if clock:
+            clock.lap('preprocess')
+        
+        lookup = self._lookup(cleaned_text, url, config, start, clock)
+        if lookup.result is not None:
+            return lookup.result
+        
+        # Normalized once, tokens shared by every detector
+        tokens = self.tokenizer.tokenize(cleaned_text)
+        if clock:
+            clock.lap('tokenize')
+        language = self.language_detector.detect(tokens)
+        if clock:
+            clock.lap('language')
+        scan = config.lexicons.scanner(language).scan(tokens)
+        if clock:
+            clock.lap('scan')
+        
+        signals = self._signals_from_scan(index, cleaned_text, scan, url, sources, lookup.cache_key,
+                                          start, clock, config)
+        signals.language = language
+        signals.domain = lookup.domain
+        signals.signature = lookup.signature
+        signals.near_duplicate = lookup.near_duplicate
+        if self.fact_checker is not None:
+            signals.claims = self.fact_checker.extract(cleaned_text)
+            if clock:
+                clock.lap('claims')
+        return signals
+    
+    def lookup(self, text: str, url: Optional[str] = None) -> Lookup:
+        """
+        Look a document up in the cache and near-duplicate index without analyzing it.
         
+        Used in front of analyzers in other processes (see AnalyzerPool):
+        a miss is analyzed elsewhere and handed back to remember().
+        """
+        start = time.perf_counter()
+        clock = _StageClock() if self.instrument else None
+        cleaned_text = self._preprocess(text)
+        if clock:
+            clock.lap('preprocess')
+        return self._lookup(cleaned_text, url, self.config_store.current, start, clock)
+    
+    def remember(self, lookup: Lookup, result: AnalysisResult) -> AnalysisResult:
+        """Store a result analyzed elsewhere under its lookup; returns it with the near-duplicate report."""
+        near = lookup.near_duplicate
+        if near is not None and result.near_duplicate_of is None:
+            result = replace(result, near_duplicate_of=near.key, near_duplicate_similarity=near.similarity)
+        self._store(lookup.cache_key, lookup.signature, lookup.domain, result)
+        return result
+    
+    def _lookup(self, cleaned_text: str, url: Optional[str], config: AnalyzerConfig,
+                start: float, clock: Optional[_StageClock]) -> Lookup:
+        lookup = Lookup(domain=self._url_domain(url))
+        if self.cache is None and self.near_duplicates is None:
+            return lookup
+        lookup.cache_key = make_cache_key(cleaned_text, lookup.domain, self._key_version(config))
+        if self.cache is not None:
+            cached = self.cache.get(lookup.cache_key)
+            if clock:
+                clock.lap('cache')
+            if cached is not None:
+                result = _expand(cached)
+                lookup.result = replace(result, stage_timings_ms=clock.to_ms()) if clock else result
+                return lookup
+        
+        # Reposts with small edits miss the cache but match here
+        if self.near_duplicates is not None:
+            lookup.signature = self.near_duplicates.signature(cleaned_text)
+            near = lookup.near_duplicate = self.near_duplicates.query(lookup.signature)
+            if clock:
+                clock.lap('near_duplicate')
+            # Only results of the same config version are reused
+            if (near is not None and near.domain == lookup.domain
+                    and near.result.model_version == config.model_version):
+                lookup.result = replace(
+                    _expand(near.result),
+                    near_duplicate_of=near.key,
+                    near_duplicate_similarity=near.similarity,
+                    processing_time_ms=int((time.perf_counter() - start) * 1000),
+                    stage_timings_ms=clock.to_ms() if clock else None
+                )
+                if self.cache is not None:
+                    self.cache.set(lookup.cache_key, lookup.result.compact())
+        return lookup
+    
+    def _store(self, cache_key: Optional[str], signature: Any, domain: Optional[str],
+               result: AnalysisResult):
+        # Both stores keep one shared CompactResult; lookups expand it again
+        stored = result.compact()
+        if self.cache is not None and cache_key is not None:
+            self.cache.set(cache_key, stored)
+        if signature is not None:
+            self.near_duplicates.add(cache_key, signature, stored, domain)
+    
+    def _signals_from_scan(self, index: int, cleaned_text: str, scan: ScanResult,
+                           url: Optional[str], sources: Dict[str, tuple],
+                           cache_key: Optional[str], start: float,
+                           clock: Optional[_StageClock] = None,
+                           config: Optional[AnalyzerConfig] = None) -> "_DocumentSignals":
+        """Run the detectors over a finished scan."""
+        config = config or self.config_store.current
         # Run all analysis components
-        sentiment, sentiment_score = self._analyze_sentiment(cleaned_text)
-        bias_level, bias_score, bias_types = self._detect_bias(cleaned_text)
-        techniques, manipulation_score = self._detect_manipulation(cleaned_text)
-        
-        # Source analysis
+        sentiment, sentiment_score = self._analyze_sentiment(scan)
+        if clock:
+            clock.lap('sentiment')
+        bias_level, bias_score, bias_types = self._detect_bias(scan)
+        if clock:
+            clock.lap('bias')
+        techniques, manipulation_score = self._detect_manipulation(scan)
+        if clock:
+            clock.lap('manipulation')
+        
+        # Source analysis (memoized per batch)
         source_cred = None
         source_name = None
         if url:
-            source_cred, source_name = self._analyze_source(url)
+            if url not in sources:
+                sources[url] = self._analyze_source(url, config)
+            source_cred, source_name = sources[url]
+        if clock:
+            clock.lap('source')
+        
+        # Heuristic credibility, blended with the model in stage 2
+        heuristic_score = self._calculate_credibility(
+            sentiment_score=sentiment_score,
+            bias_score=bias_score,
+            manipulation_score=manipulation_score,
+            source_credibility=source_cred,
+            weights=config.weights
+        )
+        if clock:
+            clock.lap('heuristic')
         
-        # Calculate credibility score
-        credibility_score = self._calculate_credibility(
+        return _DocumentSignals(
+            index=index,
+            cleaned_text=cleaned_text,
+            cache_key=cache_key,
+            sentiment=sentiment,
             sentiment_score=sentiment_score,
+            bias_level=bias_level,
             bias_score=bias_score,
+            bias_types=bias_types,
+            techniques=techniques,
             manipulation_score=manipulation_score,
-            source_credibility=source_cred
+            source_credibility=source_cred,
+            source_name=source_name,
+            heuristic_score=heuristic_score,
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+            clock=clock,
+            config=config
         )
+    
+    def open_stream(self, url: Optional[str] = None) -> "AnalysisStream":
+        """
+        Start a streaming analysis for a document arriving in chunks.
+        
+        See src.ml.streaming.AnalysisStream.
+        """
+        from src.ml.streaming import AnalysisStream
+        return AnalysisStream(self, url=url)
+    
+    def analyze_stream_sync(self, source: Any, url: Optional[str] = None) -> AnalysisResult:
+        """
+        Analyze a long document from an iterable of chunks or a file-like object.
+        
+        Memory stays bounded regardless of document size; see
+        src.ml.streaming.iter_stream_results for partial results.
+        """
+        from src.ml.streaming import iter_stream_results
+        
+        result = None
+        for result in iter_stream_results(self, source, url=url):
+            pass
+        return result
+    
+    def _build_result(self, signals: "_DocumentSignals", score: CredibilityScore,
+                      fact_checks: Optional[List[FactCheck]] = None) -> AnalysisResult:
+        """Turn document signals, a credibility score and fact checks into a result."""
+        credibility_score = score.score
         
         # Determine verdict
         verdict = self._get_verdict(credibility_score)
         
         # Generate findings and recommendations
+        fact_checks = fact_checks or []
         key_findings = self._generate_findings(
-            credibility_score, sentiment, bias_level, techniques
+            credibility_score, signals.sentiment, signals.bias_level, signals.techniques, fact_checks
         )
         recommendations = self._generate_recommendations(
-            credibility_score, bias_level, techniques
+            credibility_score, signals.bias_level, signals.techniques, fact_checks
         )
         
-        processing_time = int((time.time() - start_time) * 1000)
+        stage_timings = None
+        if signals.clock is not None:
+            signals.clock.lap('report')
+            stage_timings = signals.clock.to_ms()
         
         return AnalysisResult(
             credibility_score=credibility_score,
             verdict=verdict,
-            sentiment=sentiment,
-            sentiment_score=sentiment_score,
-            bias_level=bias_level,
-            bias_score=bias_score,
-            bias_types=bias_types,
-            manipulative_techniques=techniques,
-            manipulation_score=manipulation_score,
-            source_credibility=source_cred,
-            source_name=source_name,
+            sentiment=signals.sentiment,
+            sentiment_score=signals.sentiment_score,
+            bias_level=signals.bias_level,
+            bias_score=signals.bias_score,
+            bias_types=signals.bias_types,
+            manipulative_techniques=signals.techniques,
+            manipulation_score=signals.manipulation_score,
+            fact_checks=fact_checks,
+            source_credibility=signals.source_credibility,
+            source_name=signals.source_name,
             key_findings=key_findings,
             recommendations=recommendations,
-            processing_time_ms=processing_time
+            language=signals.language,
+            processing_time_ms=int(signals.elapsed_ms),
+            model_version=signals.config.model_version if signals.config else self.model_version,
+            scoring_backend=score.backend,
+            model_probability=score.model_probability,
+            stage_timings_ms=stage_timings,
+            near_duplicate_of=signals.near_duplicate.key if signals.near_duplicate else None,
+            near_duplicate_similarity=(
+                signals.near_duplicate.similarity if signals.near_duplicate else None
+            )
         )
     
+    def request_key(self, text: str, url: Optional[str] = None) -> str:
+        """Key identifying a request's result: normalized text, source domain and model version."""
+        return self._request_key(self._preprocess(text), url)
+    
+    def _request_key(self, cleaned_text: str, url: Optional[str]) -> str:
+        return make_cache_key(cleaned_text, self._url_domain(url), self._key_version(self.config))
+    
+    def _key_version(self, config: AnalyzerConfig) -> str:
+        """Model version for cache keys, including the fact-check index build."""
+        if self.fact_checker is None:
+            return config.model_version
+        return f"{config.model_version}/facts:{self.fact_checker.version}"
+    
+    def _url_domain(self, url: Optional[str]) -> Optional[str]:
+        try:
+            return self._source_domain(url) if url else None
+        except ValueError:
+            return None
+    
     def _preprocess(self, text: str) -> str:
         """Preprocess text for analysis."""
         # Remove extra whitespace
         text = re.sub(r'\s+', ' ', text).strip()
         return text
     
-    def _analyze_sentiment(self, text: str) -> tuple[Sentiment, float]:
+    def _analyze_sentiment(self, scan: ScanResult) -> tuple[Sentiment, float]:
         """Analyze sentiment of text."""
-        text_lower = text.lower()
-        
         # Simple keyword-based sentiment (replace with BERT in production)
-        positive_words = {'good', 'great', 'excellent', 'positive', 'success', 
-                         'achievement', 'progress', 'improve', 'benefit'}
-        negative_words = {'bad', 'terrible', 'fail', 'crisis', 'disaster',
-                         'problem', 'danger', 'threat', 'fear', 'death'}
-        
-        words = set(text_lower.split())
-        pos_count = len(words & positive_words)
-        neg_count = len(words & negative_words)
+        pos_count = scan.count('positive')
+        neg_count = scan.count('negative')
         
         total = pos_count + neg_count or 1
         score = (pos_count - neg_count) / total
@@ -268,21 +713,18 @@ class TruthLensAnalyzer:
         else:
             return Sentiment.NEUTRAL, score
     
-    def _detect_bias(self, text: str) -> tuple[str, float, List[BiasType]]:
+    def _detect_bias(self, scan: ScanResult) -> tuple[str, float, List[BiasType]]:
         """Detect bias in text."""
-        text_lower = text.lower()
         bias_types = []
         bias_score = 0.0
         
         # Check for emotional language
-        emotional_count = sum(1 for word in self.EMOTIONAL_WORDS 
-                             if word in text_lower)
-        if emotional_count > 3:
+        if scan.count('emotional') > 3:
             bias_types.append(BiasType.EMOTIONAL)
             bias_score += 0.3
         
         # Check for sensationalism
-        if any(re.search(pattern, text_lower) for pattern in self.CLICKBAIT_PATTERNS):
+        if scan.matched('clickbait'):
             bias_types.append(BiasType.SENSATIONALIST)
             bias_score += 0.3
         
@@ -301,68 +743,74 @@ class TruthLensAnalyzer:
         
         return level, bias_score, bias_types
     
-    def _detect_manipulation(self, text: str) -> tuple[List[ManipulativeTechnique], float]:
+    def _detect_manipulation(self, scan: ScanResult) -> tuple[List[ManipulativeTechnique], float]:
         """Detect manipulative techniques in text."""
         techniques = []
-        text_lower = text.lower()
         
         # Clickbait detection
-        if any(re.search(p, text_lower) for p in self.CLICKBAIT_PATTERNS):
+        if scan.matched('clickbait'):
             techniques.append(ManipulativeTechnique.CLICKBAIT)
         
         # Emotional appeal
-        emotional_count = sum(1 for w in self.EMOTIONAL_WORDS if w in text_lower)
-        if emotional_count >= 2:
+        if scan.count('emotional') >= 2:
             techniques.append(ManipulativeTechnique.EMOTIONAL_APPEAL)
         
         # Appeal to fear
-        fear_words = {'danger', 'threat', 'risk', 'warning', 'alert', 'emergency'}
-        if sum(1 for w in fear_words if w in text_lower) >= 2:
+        if scan.count('fear') >= 2:
             techniques.append(ManipulativeTechnique.APPEAL_TO_FEAR)
         
         # Calculate manipulation score
         score = len(techniques) * 0.2
         return techniques, min(score, 1.0)
     
-    def _analyze_source(self, url: str) -> tuple[Optional[float], Optional[str]]:
-        """Analyze source credibility."""
+    @staticmethod
+    def _source_domain(url: str) -> str:
+        """Extract the normalized domain (host without port or leading www.) from a URL."""
         from urllib.parse import urlparse
         
+        host = urlparse(url).hostname or ''
+        return host[4:] if host.startswith('www.') else host
+    
+    def _analyze_source(self, url: str,
+                        config: Optional[AnalyzerConfig] = None) -> tuple[Optional[float], Optional[str]]:
+        """Analyze source credibility."""
         try:
-            domain = urlparse(url).netloc.lower()
-            domain = domain.replace('www.', '')
+            domain = self._source_domain(url)
             
-            # Check known sources
-            if domain in self.RELIABLE_SOURCES:
-                return self.RELIABLE_SOURCES[domain], domain
-            elif domain in self.UNRELIABLE_SOURCES:
-                return self.UNRELIABLE_SOURCES[domain], domain
-            else:
-                return 0.5, domain  # Unknown source
-        except:
+            # Longest registered suffix: edition.bbc.co.uk -> bbc.co.uk
+            index = self._source_index(config or self.config_store.current)
+            match = index.lookup(domain)
+            if match is not None:
+                registered, score = match
+                return score, registered
+            return 0.5, domain  # Unknown source
+        except Exception:
             return None, None
     
     def _calculate_credibility(self, sentiment_score: float, bias_score: float,
                                manipulation_score: float, 
-                               source_credibility: Optional[float]) -> int:
+                               source_credibility: Optional[float],
+                               weights: Optional[ScoringWeights] = None) -> int:
         """Calculate overall credibility score."""
+        weights = weights or self.config_store.current.weights
+        
         # Base score
-        base_score = 70
+        base_score = weights.base
         
         # Adjust for bias (high bias reduces credibility)
-        base_score -= int(bias_score * 20)
+        base_score -= int(bias_score * weights.bias)
         
         # Adjust for manipulation
-        base_score -= int(manipulation_score * 25)
+        base_score -= int(manipulation_score * weights.manipulation)
         
         # Adjust for source credibility
         if source_credibility is not None:
             if source_credibility > 0.8:
-                base_score += 15
+                base_score += weights.source_high
             elif source_credibility > 0.5:
-                base_score += 5
+                base_score += weights.source_medium
             elif source_credibility < 0.3:
-                base_score -= 20
+                base_score += weights.source_low
         
         # Clamp to 0-100
         return max(0, min(100, base_score))
@@ -381,7 +829,8 @@ class TruthLensAnalyzer:
             return "false"
     
     def _generate_findings(self, score: int, sentiment: Sentiment,
-                          bias_level: str, techniques: List) -> List[str]:
+                          bias_level: str, techniques: List,
+                          fact_checks: Optional[List[FactCheck]] = None) -> List[str]:
         """Generate key findings."""
         findings = []
         
@@ -402,13 +851,24 @@ class TruthLensAnalyzer:
         if sentiment == Sentiment.NEGATIVE:
             findings.append("Content has predominantly negative tone")
         
+        if fact_checks:
+            debunked = sum(1 for check in fact_checks if check.verdict in ('false', 'partially_true'))
+            if debunked:
+                findings.append(f"{debunked} claim(s) match fact-checked false or misleading claims")
+            else:
+                findings.append(f"{len(fact_checks)} claim(s) match verified claims")
+        
         return findings
     
     def _generate_recommendations(self, score: int, bias_level: str,
-                                  techniques: List) -> List[str]:
+                                  techniques: List,
+                                  fact_checks: Optional[List[FactCheck]] = None) -> List[str]:
         """Generate recommendations for user."""
         recs = []
         
+        if fact_checks and any(check.verdict in ('false', 'partially_true') for check in fact_checks):
+            recs.append("Read the fact-check sources listed for the matched claims")
+        
         if score < 60:
             recs.append("Verify information from multiple reliable sources")
             recs.append("Check official sources for confirmation")
@@ -428,6 +888,17 @@ class TruthLensAnalyzer:
 
 
 # Factory function
-def create_analyzer(use_gpu: bool = False) -> TruthLensAnalyzer:
+def create_analyzer(use_gpu: bool = False, cache: Optional[ResultCache] = None,
+                    registry: Optional[ModelRegistry] = None,
+                    instrument: bool = False,
+                    sources: Optional[SourceIndex] = None,
+                    near_duplicates: Optional[NearDuplicateIndex] = None,
+                    tokenizer: Optional[Tokenizer] = None,
+                    lexicons: Optional[LexiconPacks] = None,
+                    config: Optional[ConfigStore] = None,
+                    fact_checker: Optional[FactChecker] = None) -> TruthLensAnalyzer:
     """Create and return a TruthLens analyzer instance."""
-    return TruthLensAnalyzer(use_gpu=use_gpu)
+    return TruthLensAnalyzer(use_gpu=use_gpu, cache=cache, registry=registry,
+                             instrument=instrument, sources=sources,
+                             near_duplicates=near_duplicates, tokenizer=tokenizer,
+                             lexicons=lexicons, config=config, fact_checker=fact_checker)
@@ -0,0 +1,354 @@
+"""
+TruthLens - Bulk Scoring
+========================
+Offline re-scoring of corpora on disk, without the API
+
+Usage:
+    python -m src.ml.bulk articles.jsonl.gz scores.jsonl
+    python -m src.ml.bulk archive.csv scores.jsonl --workers 16 --text-field body
+    python -m src.ml.bulk archive.parquet scores.parquet --resume
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from src.ml.analyzer import AnalysisResult
+from src.ml.pool import AnalyzerPool
+
+INPUT_FORMATS = ("jsonl", "csv", "parquet")
+OUTPUT_FORMATS = ("jsonl", "parquet")
+
+# (offset, id, text, url)
+Record = Tuple[int, Any, str, Optional[str]]
+
+
+def detect_format(path: str) -> str:
+    """File format from the extension, ignoring a trailing .gz."""
+    name = path[:-3] if path.endswith(".gz") else path
+    ext = os.path.splitext(name)[1].lstrip(".").lower()
+    if ext in ("jsonl", "ndjson", "json"):
+        return "jsonl"
+    if ext in ("csv", "parquet"):
+        return ext
+    if os.path.isdir(path):
+        return "parquet"
+    raise ValueError(f"Can't tell the format of {path}; pass --input-format/--output-format")
+
+
+def _open_text(path: str, mode: str = "rt") -> TextIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def iter_records(path: str, fmt: Optional[str] = None, text_field: str = "text",
+                 url_field: str = "url", id_field: str = "id") -> Iterator[Record]:
+    """Stream (offset, id, text, url) records from JSONL, CSV or Parquet."""
+    fmt = fmt or detect_format(path)
+    if fmt == "jsonl":
+        with _open_text(path) as f:
+            offset = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                yield offset, row.get(id_field, offset), row.get(text_field) or "", row.get(url_field)
+                offset += 1
+    elif fmt == "csv":
+        csv.field_size_limit(sys.maxsize)
+        with _open_text(path) as f:
+            for offset, row in enumerate(csv.DictReader(f)):
+                yield offset, row.get(id_field) or offset, row.get(text_field) or "", row.get(url_field) or None
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        columns = [c for c in (id_field, text_field, url_field) if c in parquet.schema_arrow.names]
+        offset = 0
+        for batch in parquet.iter_batches(columns=columns, batch_size=10_000):
+            data = batch.to_pydict()
+            texts = data.get(text_field, [])
+            ids = data.get(id_field) or range(offset, offset + len(texts))
+            urls = data.get(url_field) or [None] * len(texts)
+            for row_id, text, url in zip(ids, texts, urls):
+                yield offset, row_id, text or "", url
+                offset += 1
+    else:
+        raise ValueError(f"Unknown input format {fmt!r}")
+
+
+def output_row(offset: int, row_id: Any, result: Any) -> Dict[str, Any]:
+    """Flat output record for one input document."""
+    if isinstance(result, Exception):
+        return {"offset": offset, "id": row_id, "error": f"{type(result).__name__}: {result}"}
+    return {
+        "offset": offset,
+        "id": row_id,
+        "credibility_score": result.credibility_score,
+        "verdict": result.verdict,
+        "sentiment": result.sentiment.value,
+        "sentiment_score": result.sentiment_score,
+        "bias_level": result.bias_level,
+        "bias_score": result.bias_score,
+        "manipulation_score": result.manipulation_score,
+        "manipulative_techniques": [t.value for t in result.manipulative_techniques],
+        "source_name": result.source_name,
+        "source_credibility": result.source_credibility,
+        "model_probability": result.model_probability,
+        "scoring_backend": result.scoring_backend,
+        "model_version": result.model_version,
+        "error": None,
+    }
+
+
+class JsonlWriter:
+    """
+    Appends output rows to a (optionally gzipped) JSONL file.
+
+    checkpoint() makes everything written so far durable and returns the
+    file size, which resume() truncates back to: rows written after the
+    last checkpoint are dropped and scored again. Gzip output is closed
+    into a complete member at every checkpoint so the file stays valid.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file: Optional[TextIO] = None
+
+    def resume(self, size: int):
+        if os.path.exists(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(size)
+
+    def write(self, rows: List[Dict[str, Any]]):
+        if self._file is None:
+            self._file = _open_text(self.path, "at")
+        self._file.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+
+    def checkpoint(self) -> int:
+        if self._file is not None:
+            self._file.flush()
+            if self.path.endswith(".gz"):
+                self._file.close()
+                self._file = None
+            else:
+                os.fsync(self._file.fileno())
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetWriter:
+    """
+    Writes output rows as a directory of Parquet part files.
+
+    Rows are buffered and each checkpoint() writes one part named after
+    its first offset, so a resumed run only has to delete parts past the
+    checkpoint.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._rows: List[Dict[str, Any]] = []
+        os.makedirs(path, exist_ok=True)
+
+    def resume(self, size: int):
+        # size is the number of parts kept
+        parts = sorted(p for p in os.listdir(self.path) if p.endswith(".parquet"))
+        for name in parts[size:]:
+            os.remove(os.path.join(self.path, name))
+
+    def write(self, rows: List[Dict[str, Any]]):
+        self._rows.extend(rows)
+
+    def checkpoint(self) -> int:
+        if self._rows:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            name = f"part-{self._rows[0]['offset']:012d}.parquet"
+            pq.write_table(pa.Table.from_pylist(self._rows), os.path.join(self.path, name))
+            self._rows = []
+        return len([p for p in os.listdir(self.path) if p.endswith(".parquet")])
+
+    def close(self):
+        self.checkpoint()
+
+
+@dataclass
+class Checkpoint:
+    """Progress of a bulk run: input offset reached and the output size at that point"""
+    input: str
+    output: str
+    offset: int = 0
+    output_size: int = 0
+    errors: int = 0
+
+    @classmethod
+    def load(cls, path: str) -> Optional["Checkpoint"]:
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+    def save(self, path: str):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp, path)
+
+
+@dataclass
+class BulkStats:
+    """Outcome of a bulk run"""
+    documents: int = 0
+    errors: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.documents / self.seconds if self.seconds else 0.0
+
+
+def _batches(records: Iterator[Record], size: int) -> Iterator[List[Record]]:
+    batch: List[Record] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_bulk(input_path: str, output_path: str, pool: AnalyzerPool,
+             input_format: Optional[str] = None, output_format: Optional[str] = None,
+             text_field: str = "text", url_field: str = "url", id_field: str = "id",
+             batch_size: int = 64, checkpoint_every: int = 10_000, resume: bool = False,
+             limit: Optional[int] = None, progress: Optional[TextIO] = None) -> BulkStats:
+    """
+    Score every record of input_path and write one row per record to output_path.
+
+    Batches of ``batch_size`` documents are spread over the pool's
+    workers with several in flight (AnalyzerPool.iter_batches). Every
+    ``checkpoint_every`` documents the output is flushed and the input
+    offset saved to ``<output>.checkpoint.json``; with ``resume`` a run
+    picks up from there. ``limit`` stops after that many new documents.
+    """
+    output_format = output_format or detect_format(output_path)
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Output format must be one of {OUTPUT_FORMATS}")
+    writer = JsonlWriter(output_path) if output_format == "jsonl" else ParquetWriter(output_path)
+    checkpoint_path = f"{output_path.rstrip('/')}.checkpoint.json"
+
+    state = Checkpoint.load(checkpoint_path) if resume else None
+    if state is not None:
+        writer.resume(state.output_size)
+    else:
+        state = Checkpoint(input=input_path, output=output_path)
+        writer.resume(0)
+
+    stats = BulkStats(skipped=state.offset)
+    records = iter_records(input_path, input_format, text_field, url_field, id_field)
+    # Skip what a previous run already wrote
+    records = (r for r in records if r[0] >= state.offset)
+    if limit is not None:
+        records = (r for _, r in zip(range(limit), records))
+    batches = _batches(records, batch_size)
+
+    def submissions():
+        for batch in batches:
+            pending.append(batch)
+            yield [r[2] for r in batch], [r[3] for r in batch]
+
+    pending: deque = deque()
+    start = last_report = time.perf_counter()
+    since_checkpoint = 0
+    try:
+        for results in pool.iter_batches(submissions()):
+            batch = pending.popleft()
+            rows = [output_row(offset, row_id, result)
+                    for (offset, row_id, _, _), result in zip(batch, results)]
+            writer.write(rows)
+            errors = sum(1 for r in results if not isinstance(r, AnalysisResult))
+            stats.documents += len(batch)
+            stats.errors += errors
+            state.errors += errors
+            state.offset = batch[-1][0] + 1
+            since_checkpoint += len(batch)
+            if since_checkpoint >= checkpoint_every:
+                state.output_size = writer.checkpoint()
+                state.save(checkpoint_path)
+                since_checkpoint = 0
+
+            now = time.perf_counter()
+            if progress is not None and now - last_report >= 1.0:
+                last_report = now
+                rate = stats.documents / (now - start)
+                progress.write(f"\r{state.offset} docs  {rate:,.0f} docs/s  {state.errors} errors")
+                progress.flush()
+    finally:
+        state.output_size = writer.checkpoint()
+        state.save(checkpoint_path)
+        writer.close()
+    stats.seconds = time.perf_counter() - start
+    if progress is not None:
+        progress.write(f"\r{state.offset} docs  {stats.docs_per_second:,.0f} docs/s  "
+                       f"{state.errors} errors\n")
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Score a corpus on disk with TruthLens")
+    parser.add_argument("input", help="JSONL, CSV or Parquet file (.gz allowed for JSONL/CSV)")
+    parser.add_argument("output", help="JSONL file (.gz allowed) or Parquet directory")
+    parser.add_argument("--input-format", choices=INPUT_FORMATS)
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS)
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--url-field", default="url")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="analyzer processes (0 = in this process)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--checkpoint-every", type=int, default=10_000)
+    parser.add_argument("--resume", action="store_true", help="continue from the last checkpoint")
+    parser.add_argument("--limit", type=int, help="stop after this many documents")
+    parser.add_argument("--quiet", action="store_true", help="no progress readout")
+    args = parser.parse_args(argv)
+
+    pool = AnalyzerPool(workers=args.workers, chunk_size=args.batch_size, max_tasks_per_child=None)
+    try:
+        pool.warm_up()
+        stats = run_bulk(
+            args.input, args.output, pool,
+            input_format=args.input_format, output_format=args.output_format,
+            text_field=args.text_field, url_field=args.url_field, id_field=args.id_field,
+            batch_size=args.batch_size, checkpoint_every=args.checkpoint_every,
+            resume=args.resume, limit=args.limit,
+            progress=None if args.quiet else sys.stderr
+        )
+    finally:
+        pool.shutdown()
+    print(json.dumps({"documents": stats.documents, "errors": stats.errors,
+                      "skipped": stats.skipped, "seconds": round(stats.seconds, 2),
+                      "docs_per_second": round(stats.docs_per_second, 1)}))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
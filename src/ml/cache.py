@@ -0,0 +1,209 @@
+"""
+TruthLens - Result Cache
+========================
+Content-addressed cache for analysis results
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+
+def make_cache_key(normalized_text: str, domain: Optional[str], model_version: str) -> str:
+    """Build a cache key from preprocessed text, source domain and model version."""
+    digest = hashlib.sha256()
+    for part in (model_version, domain or "", normalized_text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Cache counters"""
+    hits: int = 0
+    misses: int = 0
+    shared_hits: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+    max_size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_rate"] = round(self.hit_rate, 4)
+        return data
+
+
+class CacheBackend(ABC):
+    """Shared cache tier interface (values are JSON-serializable dicts)."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    SQLite-backed shared tier.
+
+    A single database file can be shared by several uvicorn workers on
+    the same host; WAL mode lets readers proceed while one process writes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS result_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM result_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] < time.time():
+            self._connect().execute("DELETE FROM result_cache WHERE key = ?", (key,))
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO result_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), time.time() + ttl_seconds)
+        )
+
+    def purge_expired(self) -> int:
+        """Delete expired rows and return how many were removed."""
+        cursor = self._connect().execute(
+            "DELETE FROM result_cache WHERE expires_at < ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+    def clear(self):
+        self._connect().execute("DELETE FROM result_cache")
+
+
+class ResultCache:
+    """
+    Two-tier result cache.
+
+    The in-process tier is an LRU bounded by ``max_size`` with a per-entry
+    TTL. An optional shared tier is consulted on local misses and filled on
+    every store, so hits computed by one worker are visible to the others.
+    The analyzer stores CompactResults (results from the shared tier are
+    compacted too); cached values are shared and must not be mutated.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 3600.0,
+                 shared: Optional[CacheBackend] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats(max_size=max_size)
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        """Create a cache configured from environment variables."""
+        path = os.getenv("TRUTHLENS_CACHE_PATH")
+        return cls(
+            max_size=int(os.getenv("TRUTHLENS_CACHE_SIZE", "10000")),
+            ttl_seconds=float(os.getenv("TRUTHLENS_CACHE_TTL", "3600")),
+            shared=SQLiteCacheBackend(path) if path else None
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for key, or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    return value
+                del self._entries[key]
+                self._stats.expirations += 1
+
+        if self.shared is not None:
+            data = self.shared.get(key)
+            if data is not None:
+                from src.ml.analyzer import AnalysisResult
+                value = AnalysisResult.from_dict(data).compact()
+                with self._lock:
+                    self._stats.hits += 1
+                    self._stats.shared_hits += 1
+                    self._store_local(key, value, now)
+                return value
+
+        with self._lock:
+            self._stats.misses += 1
+        return None
+
+    def set(self, key: str, value: Any):
+        """Store a result in both tiers."""
+        with self._lock:
+            self._store_local(key, value, time.monotonic())
+        if self.shared is not None:
+            self.shared.set(key, value.to_dict(), self.ttl_seconds)
+
+    def _store_local(self, key: str, value: Any, now: float):
+        self._entries[key] = (value, now + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+
+    def clear(self):
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> CacheStats:
+        """Snapshot of the cache counters."""
+        with self._lock:
+            self._stats.size = len(self._entries)
+            return CacheStats(**asdict(self._stats))
+
+    def __len__(self) -> int:
+        return len(self._entries)
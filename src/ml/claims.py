@@ -0,0 +1,91 @@
+"""
+TruthLens - Claim Extraction
+============================
+Split a document into sentences and keep the checkable ones
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import re
+from typing import FrozenSet, Iterable, List, Tuple
+
+from src.ml.tokenizer import DEFAULT_TOKENIZER, Tokenizer
+
+# Sentence end followed by whitespace and an upper-case letter, digit or opening quote
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?…])["”»)\']*\s+(?=["“«(]?[A-ZА-ЯЁЇІЄҐ0-9])')
+# Capitalized word (names, places, organizations)
+_CAPITALIZED = re.compile(r"\b[A-ZА-ЯЁЇІЄҐ][\w'’-]+")
+_DIGIT = re.compile(r'\d')
+
+# Verbs and units typical of factual statements (casefolded, en + uk)
+CLAIM_CUES = frozenset("""
+is are was were has have had will causes cause caused cures cure cured kills kill killed
+contains contain found shows show showed proves proved confirmed according percent million
+billion died increased decreased banned approved
+є був була були було має мають спричиняє спричинив виліковує вбиває вбив містить показало
+показали доводить підтвердили підтвердив підтвердило відсотків мільйонів мільярдів помер померли зросла
+зріс знизилась заборонили схвалили
+""".split())
+
+# Opinions and hedges are not checkable
+OPINION_MARKERS = ("i think", "i believe", "i feel", "in my opinion", "we believe", "imho",
+                   "я думаю", "я вважаю", "на мою думку", "мені здається")
+
+
+class ClaimExtractor:
+    """
+    Picks sentences that state something a fact-checker could verify.
+
+    A sentence qualifies when it has the right length, is not a question
+    or an opinion, and scores at least ``min_score``: numbers and dates
+    count two, named entities (capitalized words after the first) and
+    claim verbs (CLAIM_CUES) one each. At most ``max_claims`` sentences
+    are kept, the best-scoring ones, in document order. Only the first
+    ``max_chars`` characters are looked at; claims sit in the lead.
+    """
+
+    def __init__(self, min_words: int = 5, max_words: int = 60, min_score: int = 2,
+                 max_claims: int = 5, max_chars: int = 20_000,
+                 cues: FrozenSet[str] = CLAIM_CUES, tokenizer: Tokenizer = DEFAULT_TOKENIZER):
+        self.min_words = min_words
+        self.max_words = max_words
+        self.min_score = min_score
+        self.max_claims = max_claims
+        self.max_chars = max_chars
+        self.cues = cues
+        self.tokenizer = tokenizer
+
+    def sentences(self, text: str) -> List[str]:
+        """Sentences of a text (whitespace already collapsed, as after preprocessing)."""
+        return [s.strip() for s in _SENTENCE_BREAK.split(text[:self.max_chars]) if s.strip()]
+
+    def score(self, sentence: str) -> int:
+        """Checkability score of one sentence (0 = not checkable)."""
+        if sentence.endswith("?"):
+            return 0
+        words = self.tokenizer.words(self.tokenizer.normalize(sentence))
+        if not self.min_words <= len(words) <= self.max_words:
+            return 0
+        lowered = " ".join(words)
+        if any(marker in lowered for marker in OPINION_MARKERS):
+            return 0
+        score = 2 if _DIGIT.search(sentence) else 0
+        # The first word is capitalized anyway
+        score += min(2, len(_CAPITALIZED.findall(sentence)) - bool(_CAPITALIZED.match(sentence)))
+        if not self.cues.isdisjoint(words):
+            score += 1
+        return score
+
+    def extract(self, text: str) -> List[str]:
+        """Checkable sentences of a text, best ``max_claims`` in document order."""
+        scored: List[Tuple[int, int, str]] = []
+        for position, sentence in enumerate(self.sentences(text)):
+            score = self.score(sentence)
+            if score >= self.min_score:
+                scored.append((score, position, sentence))
+        best = sorted(scored, key=lambda item: (-item[0], item[1]))[:self.max_claims]
+        return [sentence for _, _, sentence in sorted(best, key=lambda item: item[1])]
+
+    def extract_many(self, texts: Iterable[str]) -> List[List[str]]:
+        return [self.extract(text) for text in texts]
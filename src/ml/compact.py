@@ -0,0 +1,282 @@
+"""
+TruthLens - Compact Results
+===========================
+Slotted result representation and a precompiled JSON encoder
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import json
+import sys
+import threading
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from src.ml.analyzer import AnalysisResult, BiasType, ManipulativeTechnique, Sentiment
+
+# Code tables: a result stores the index into these
+VERDICTS = ("credible", "likely_true", "uncertain", "likely_false", "false")
+BIAS_LEVELS = ("none", "low", "medium", "high")
+SENTIMENTS = tuple(Sentiment)
+BIAS_TYPES = tuple(BiasType)
+TECHNIQUES = tuple(ManipulativeTechnique)
+
+_VERDICT_CODES = {name: code for code, name in enumerate(VERDICTS)}
+_BIAS_LEVEL_CODES = {name: code for code, name in enumerate(BIAS_LEVELS)}
+_SENTIMENT_CODES = {member: code for code, member in enumerate(SENTIMENTS)}
+_BIAS_TYPE_CODES = {member: code for code, member in enumerate(BIAS_TYPES)}
+_TECHNIQUE_CODES = {member: code for code, member in enumerate(TECHNIQUES)}
+
+
+class TextCatalogue:
+    """
+    Process-wide table of finding/recommendation texts.
+
+    Each distinct text gets a small integer ID on first sight, and each
+    distinct sequence of IDs is stored once: results with the same
+    findings share a single tuple. The analyzer only produces a few
+    hundred distinct texts, so the table stays small.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._texts: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._sequences: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def text(self, text_id: int) -> str:
+        return self._texts[text_id]
+
+    def encode(self, texts: Sequence[str]) -> Tuple[int, ...]:
+        """Shared tuple of IDs for a sequence of texts."""
+        ids = self._ids
+        try:
+            key = tuple(ids[text] for text in texts)
+        except KeyError:
+            with self._lock:
+                for text in texts:
+                    if text not in ids:
+                        ids[text] = len(self._texts)
+                        self._texts.append(sys.intern(text))
+            key = tuple(ids[text] for text in texts)
+        shared = self._sequences.get(key)
+        if shared is None:
+            with self._lock:
+                shared = self._sequences.setdefault(key, key)
+        return shared
+
+    def decode(self, ids: Sequence[int]) -> List[str]:
+        texts = self._texts
+        return [texts[i] for i in ids]
+
+
+TEXTS = TextCatalogue()
+_CODE_SEQUENCES: Dict[bytes, bytes] = {}
+
+
+def _codes(values: Sequence[Any], table: Dict[Any, int]) -> bytes:
+    """Enum members as a shared bytes object of their codes."""
+    packed = bytes(table[v] for v in values)
+    return _CODE_SEQUENCES.setdefault(packed, packed)
+
+
+class CompactResult:
+    """
+    Memory-lean, read-only counterpart of AnalysisResult.
+
+    Uses ``__slots__`` instead of a per-instance dict. Verdict, bias
+    level, sentiment, bias types and techniques are small integer codes
+    into the tables above. Findings and recommendations are ID tuples
+    shared through TEXTS, and repeated strings (model version, backend,
+    language) are interned. The public attributes decode to the same
+    values AnalysisResult has, so code reading a result accepts either.
+    """
+    __slots__ = (
+        'credibility_score', '_verdict', '_sentiment', 'sentiment_score',
+        '_bias_level', 'bias_score', '_bias_types', '_techniques', 'manipulation_score',
+        'fact_checks', 'source_credibility', 'source_name', '_findings', '_recommendations',
+        'language', 'processing_time_ms', 'model_version', 'scoring_backend',
+        'model_probability', 'stage_timings_ms', 'near_duplicate_of', 'near_duplicate_similarity',
+    )
+
+    @classmethod
+    def from_result(cls, result: AnalysisResult) -> "CompactResult":
+        """Compact an AnalysisResult."""
+        self = cls.__new__(cls)
+        self.credibility_score = result.credibility_score
+        self._verdict = _VERDICT_CODES[result.verdict]
+        self._sentiment = _SENTIMENT_CODES[result.sentiment]
+        self.sentiment_score = result.sentiment_score
+        self._bias_level = _BIAS_LEVEL_CODES[result.bias_level]
+        self.bias_score = result.bias_score
+        self._bias_types = _codes(result.bias_types, _BIAS_TYPE_CODES)
+        self._techniques = _codes(result.manipulative_techniques, _TECHNIQUE_CODES)
+        self.manipulation_score = result.manipulation_score
+        self.fact_checks = tuple(result.fact_checks)
+        self.source_credibility = result.source_credibility
+        self.source_name = sys.intern(result.source_name) if result.source_name else None
+        self._findings = TEXTS.encode(result.key_findings)
+        self._recommendations = TEXTS.encode(result.recommendations)
+        self.language = sys.intern(result.language)
+        self.processing_time_ms = result.processing_time_ms
+        self.model_version = sys.intern(result.model_version)
+        self.scoring_backend = sys.intern(result.scoring_backend)
+        self.model_probability = result.model_probability
+        self.stage_timings_ms = result.stage_timings_ms
+        self.near_duplicate_of = result.near_duplicate_of
+        self.near_duplicate_similarity = result.near_duplicate_similarity
+        return self
+
+    @property
+    def verdict(self) -> str:
+        return VERDICTS[self._verdict]
+
+    @property
+    def sentiment(self) -> Sentiment:
+        return SENTIMENTS[self._sentiment]
+
+    @property
+    def bias_level(self) -> str:
+        return BIAS_LEVELS[self._bias_level]
+
+    @property
+    def bias_types(self) -> List[BiasType]:
+        return [BIAS_TYPES[code] for code in self._bias_types]
+
+    @property
+    def manipulative_techniques(self) -> List[ManipulativeTechnique]:
+        return [TECHNIQUES[code] for code in self._techniques]
+
+    @property
+    def key_findings(self) -> List[str]:
+        return TEXTS.decode(self._findings)
+
+    @property
+    def recommendations(self) -> List[str]:
+        return TEXTS.decode(self._recommendations)
+
+    def to_result(self) -> AnalysisResult:
+        """Expand back into an AnalysisResult."""
+        return AnalysisResult(
+            credibility_score=self.credibility_score,
+            verdict=self.verdict,
+            sentiment=self.sentiment,
+            sentiment_score=self.sentiment_score,
+            bias_level=self.bias_level,
+            bias_score=self.bias_score,
+            bias_types=self.bias_types,
+            manipulative_techniques=self.manipulative_techniques,
+            manipulation_score=self.manipulation_score,
+            fact_checks=list(self.fact_checks),
+            source_credibility=self.source_credibility,
+            source_name=self.source_name,
+            key_findings=self.key_findings,
+            recommendations=self.recommendations,
+            language=self.language,
+            processing_time_ms=self.processing_time_ms,
+            model_version=self.model_version,
+            scoring_backend=self.scoring_backend,
+            model_probability=self.model_probability,
+            stage_timings_ms=self.stage_timings_ms,
+            near_duplicate_of=self.near_duplicate_of,
+            near_duplicate_similarity=self.near_duplicate_similarity,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.to_result().to_dict()
+
+
+def compact(result: AnalysisResult) -> CompactResult:
+    """Shorthand for CompactResult.from_result()."""
+    return CompactResult.from_result(result)
+
+
+class ResultEncoder:
+    """
+    JSON encoder for the public API result shape.
+
+    Every fragment that depends only on a small set of values (label and
+    score per credibility score, verdicts, techniques lists, findings
+    lists, backends) is encoded once and memoized. Encoding a result is
+    then a handful of dict lookups and one str.join, with no
+    intermediate dict and no generic encoder walking it.
+
+    Produces the same document as serialize_result() in
+    benchmarks/run.py, with compact separators.
+    """
+
+    # Memoized fragments kept per kind before the memo is reset
+    MAX_MEMO = 4096
+
+    def __init__(self, model_name: str = "TruthLens-v2.0"):
+        self.model_name = model_name
+        self._head = [
+            '{"label":%s,"score":%s,"risk_level":' % (
+                '"FAKE"' if score < 50 else '"REAL"', json.dumps(round(score / 100, 2))
+            )
+            for score in range(101)
+        ]
+        self._tail = ',"model":%s}' % json.dumps(model_name, ensure_ascii=False)
+        self._strings: Dict[str, str] = {}
+        # List fragments keyed by technique codes, catalogue IDs or values
+        self._by_code: Dict[bytes, str] = {}
+        self._by_id: Dict[Tuple[int, ...], str] = {}
+        self._by_value: Dict[tuple, str] = {}
+
+    def encode(self, result: Any) -> str:
+        """API JSON for an AnalysisResult or CompactResult."""
+        string, memo = self._string, self._memo
+        if type(result) is CompactResult:
+            techniques = memo(self._by_code, result._techniques,
+                              lambda codes: [TECHNIQUES[c].value for c in codes])
+            findings = memo(self._by_id, result._findings, TEXTS.decode)
+            recommendations = memo(self._by_id, result._recommendations, TEXTS.decode)
+        else:
+            techniques = memo(self._by_value, tuple(result.manipulative_techniques),
+                              lambda members: [m.value for m in members])
+            findings = memo(self._by_value, tuple(result.key_findings), list)
+            recommendations = memo(self._by_value, tuple(result.recommendations), list)
+        return ''.join((
+            self._head[result.credibility_score],
+            string(result.verdict),
+            ',"sentiment":', string(result.sentiment.value),
+            ',"bias_level":', string(result.bias_level),
+            ',"manipulative_techniques":', techniques,
+            ',"key_findings":', findings,
+            ',"recommendations":', recommendations,
+            ',"fact_checks":', self._fact_checks(result.fact_checks),
+            ',"scoring_backend":', string(result.scoring_backend),
+            self._tail,
+        ))
+
+    def encode_bytes(self, result: Any) -> bytes:
+        return self.encode(result).encode('utf-8')
+
+    @staticmethod
+    def _fact_checks(checks: Sequence[Any]) -> str:
+        # Per-document claims; nothing worth memoizing
+        if not checks:
+            return '[]'
+        return json.dumps([asdict(check) for check in checks], ensure_ascii=False,
+                          separators=(',', ':'))
+
+    def _string(self, value: str) -> str:
+        fragment = self._strings.get(value)
+        if fragment is None:
+            if len(self._strings) >= self.MAX_MEMO:
+                self._strings.clear()
+            fragment = self._strings[value] = json.dumps(value, ensure_ascii=False)
+        return fragment
+
+    def _memo(self, table: Dict[Any, str], key: Any, values: Callable[[Any], List[str]]) -> str:
+        fragment = table.get(key)
+        if fragment is None:
+            if len(table) >= self.MAX_MEMO:
+                table.clear()
+            fragment = table[key] = json.dumps(values(key), ensure_ascii=False,
+                                               separators=(',', ':'))
+        return fragment
@@ -0,0 +1,247 @@
+"""
+TruthLens - Analyzer Config
+===========================
+Versioned, hot-reloadable lexicons, source scores and scoring weights
+
+Config file (JSON, see ml/analyzer_config.example.json):
+
+    {"version": "2026-10-18.1",
+     "lexicons": {"uk": {"terms": {...}, "patterns": {...}, "token_sets": {...}}},
+     "sources": {"example-news.com": 0.3},
+     "weights": {"bias": 20, "manipulation": 25, "model_weight": 0.5}}
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, Optional, Tuple
+
+from src.ml.language import LEXICON_DIR, LexiconPacks
+from src.ml.sources import SourceIndex
+from src.ml.tokenizer import Tokenizer
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigError(ValueError):
+    """Invalid analyzer config file"""
+
+
+@dataclass(frozen=True)
+class ScoringWeights:
+    """Weights of the heuristic credibility score (see TruthLensAnalyzer._calculate_credibility)"""
+    base: int = 70
+    bias: int = 20  # points removed at bias score 1.0
+    manipulation: int = 25  # points removed at manipulation score 1.0
+    source_high: int = 15  # source credibility > 0.8
+    source_medium: int = 5  # > 0.5
+    source_low: int = -20  # < 0.3
+    model_weight: Optional[float] = None  # None = TRUTHLENS_MODEL_WEIGHT
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScoringWeights":
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ConfigError(f"Unknown weights: {', '.join(sorted(unknown))}")
+        return cls(**data)
+
+
+@dataclass(frozen=True)
+class AnalyzerConfig:
+    """
+    One immutable config version.
+
+    The analyzer reads the current snapshot once per batch, so every
+    document of a request is analyzed with the same lexicons, weights,
+    source scores and model_version even when a new version is swapped
+    in meanwhile.
+    """
+    version: Optional[str]
+    model_version: str
+    lexicons: LexiconPacks
+    weights: ScoringWeights = ScoringWeights()
+    sources: Optional[Dict[str, float]] = None
+    source_index: Optional[SourceIndex] = None  # Built-in sources extended by ``sources``
+
+
+class ConfigStore:
+    """
+    Holds the current AnalyzerConfig and swaps in new versions.
+
+    A background thread polls the config file. When it changed and
+    carries a new ``version``, the new snapshot is built and every
+    lexicon pack compiled by the current one is compiled again before
+    the snapshot is published with a single assignment, so requests
+    never compile on the swap or wait for it. A version with source
+    scores gets a source index of its own, loaded before the swap too,
+    so scores never change apart from the config version. A file that
+    fails to parse or compile is logged and the running version stays;
+    so does one whose source index fails to load, which is retried on
+    the next refresh. A changed file with the same version is ignored:
+    the version is part of model_version and of every cache key, so
+    reusing it would serve results of the old lexicons.
+
+    Args:
+        path: Config file (None = built-in lexicon packs and weights only)
+        model_version: Analyzer model version the config version is appended to
+        refresh_seconds: Poll interval of the background thread (0 = no reload)
+        sources: Source index whose built-in entries the config extends
+            (the index in use is ``sources`` of the current snapshot)
+        lexicon_dir: Directory of the built-in lexicon packs
+        lexicons: Packs used when the config has none for a language
+    """
+
+    def __init__(self, path: Optional[str] = None, model_version: str = "1.0.0",
+                 refresh_seconds: float = 30.0, sources: Optional[SourceIndex] = None,
+                 lexicon_dir: str = LEXICON_DIR, tokenizer: Optional[Tokenizer] = None,
+                 lexicons: Optional[LexiconPacks] = None):
+        self.path = path
+        self.base_version = model_version
+        self.refresh_seconds = refresh_seconds
+        self.lexicon_dir = lexicons.directory if lexicons is not None else lexicon_dir
+        self.tokenizer = tokenizer
+        self.swaps = 0
+        self._default_lexicons = lexicons
+        self._builtin_sources = dict(sources.defaults) if sources is not None else {}
+        self._stamp: Optional[Tuple[float, int]] = None
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._current = AnalyzerConfig(
+            version=None, model_version=model_version,
+            lexicons=lexicons or LexiconPacks(lexicon_dir, tokenizer=tokenizer),
+            source_index=sources
+        )
+        if path:
+            try:
+                self.load()
+            except Exception as e:
+                logger.error(f"Analyzer config {path} not loaded, using built-in lexicons: {e}")
+
+    @classmethod
+    def from_env(cls, model_version: str = "1.0.0", sources: Optional[SourceIndex] = None,
+                 tokenizer: Optional[Tokenizer] = None,
+                 lexicons: Optional[LexiconPacks] = None) -> "ConfigStore":
+        """Create a store configured from environment variables."""
+        return cls(
+            path=os.getenv("TRUTHLENS_ANALYZER_CONFIG") or None,
+            model_version=model_version,
+            refresh_seconds=float(os.getenv("TRUTHLENS_ANALYZER_CONFIG_REFRESH", "30")),
+            sources=sources,
+            tokenizer=tokenizer,
+            lexicons=lexicons
+        )
+
+    @property
+    def current(self) -> AnalyzerConfig:
+        return self._current
+
+    @property
+    def sources(self) -> Optional[SourceIndex]:
+        """Source index of the current snapshot."""
+        return self._current.source_index
+
+    def load(self) -> bool:
+        """Read the config file and publish it if its version is new; returns whether it swapped."""
+        stamp = self._file_stamp()
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        self._stamp = stamp
+        config = self._build(data)
+        current = self._current
+        if config.version == current.version:
+            logger.warning(f"Analyzer config {self.path} changed without a new version "
+                           f"({config.version}); keeping the running config")
+            return False
+
+        # Loaded outside the lock, so a slow source table doesn't hold up other loads
+        source_index = current.source_index
+        if source_index is not None and (config.sources or current.sources):
+            try:
+                source_index = source_index.with_defaults(
+                    {**self._builtin_sources, **(config.sources or {})}
+                )
+            except Exception as e:
+                # The version would report source scores it doesn't use; retry on the next refresh
+                self._stamp = None
+                logger.error(f"Analyzer config version {config.version} not activated, "
+                             f"its source scores failed to load: {e}")
+                return False
+
+        with self._load_lock:
+            if self._current is not current:
+                # Another load swapped meanwhile; this one is built against a stale snapshot
+                self._stamp = None
+                return False
+            # Compile ahead of the swap whatever the running version has compiled
+            for language in current.lexicons.loaded:
+                config.lexicons.scanner(language)
+            previous = current.source_index
+            self._current = replace(config, source_index=source_index)
+            if source_index is not previous and previous.refreshing:
+                # The new index takes over background refresh; old snapshots keep their rows
+                previous.close()
+                source_index.start_refresh()
+            self.swaps += 1
+            logger.info(f"Analyzer config version {config.version} active "
+                        f"(model_version {config.model_version})")
+            return True
+
+    def refresh(self) -> bool:
+        """Reload if the file changed since the last load."""
+        if not self.path or self._file_stamp() == self._stamp:
+            return False
+        return self.load()
+
+    def start_refresh(self):
+        """Start the background reload thread (once; no-op without a file)."""
+        if not self.path or self.refresh_seconds <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._refresh_loop, name="analyzer-config", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop background reloads."""
+        self._stop.set()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Analyzer config reload failed, keeping version "
+                             f"{self._current.version}: {e}")
+
+    def _file_stamp(self) -> Tuple[float, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime, stat.st_size
+
+    def _build(self, data: Dict[str, Any]) -> AnalyzerConfig:
+        """Validate a parsed config file and compile it into a snapshot."""
+        version = data.get("version")
+        if not isinstance(version, str) or not version:
+            raise ConfigError("Config needs a non-empty string 'version'")
+        packs = data.get("lexicons") or {}
+        default = self._current.lexicons.default
+        lexicons = LexiconPacks(self.lexicon_dir, default=default, tokenizer=self.tokenizer,
+                                packs={**(self._default_lexicons.packs if self._default_lexicons else {}),
+                                       **packs})
+        # Fail here, in the background, rather than on the first request in that language
+        for language in packs:
+            lexicons.scanner(language)
+        sources = data.get("sources")
+        if sources is not None:
+            sources = {domain: float(score) for domain, score in sources.items()}
+        return AnalyzerConfig(
+            version=version,
+            model_version=f"{self.base_version}+{version}",
+            lexicons=lexicons,
+            weights=ScoringWeights.from_dict(data.get("weights") or {}),
+            sources=sources
+        )
@@ -0,0 +1,96 @@
+"""
+TruthLens - Claim Embeddings
+============================
+Batched feature-hashing sentence embeddings
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import zlib
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.ml.tokenizer import DEFAULT_TOKENIZER, Tokenizer
+
+
+class HashingEmbedder:
+    """
+    Fixed-size sentence vectors from hashed words, word pairs and character trigrams.
+
+    Every feature is hashed (crc32, so vectors are identical across
+    processes and runs) to one of ``dim`` signed buckets; the vector is
+    L2-normalized, so a dot product is the cosine similarity. Character
+    trigrams let inflected forms (claim/claims, вакцина/вакцини) still
+    overlap. Nothing is trained: an index built offline and the analyzer
+    agree as long as they use the same parameters, which the index keeps
+    in its manifest (see params()).
+
+    A whole batch of sentences is embedded with one scatter-add into a
+    single matrix. Bucket/sign pairs of each word are memoized, and
+    natural text repeats words heavily, so most hashing is a dict lookup.
+
+    Args:
+        dim: Vector size
+        word_weight: Weight of each word and word pair
+        char_weight: Weight of each character trigram of a word
+        cache_size: Words whose features are memoized
+    """
+
+    def __init__(self, dim: int = 256, word_weight: float = 1.0, char_weight: float = 0.25,
+                 cache_size: int = 200_000, tokenizer: Tokenizer = DEFAULT_TOKENIZER):
+        self.dim = dim
+        self.word_weight = word_weight
+        self.char_weight = char_weight
+        self.cache_size = cache_size
+        self.tokenizer = tokenizer
+        self._words: Dict[str, Tuple[List[int], List[float]]] = {}
+
+    def params(self) -> Dict[str, Any]:
+        """Parameters an index must be queried with."""
+        return {"dim": self.dim, "word_weight": self.word_weight, "char_weight": self.char_weight}
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), dim) float32 matrix of unit vectors (all-zero rows for texts without words)."""
+        rows: List[int] = []
+        columns: List[int] = []
+        values: List[float] = []
+        for row, text in enumerate(texts):
+            words = self.tokenizer.words(self.tokenizer.normalize(text))
+            for word in words:
+                word_columns, word_values = self._word_features(word)
+                rows.extend([row] * len(word_columns))
+                columns.extend(word_columns)
+                values.extend(word_values)
+            for pair in zip(words, words[1:]):
+                column, sign = self._bucket(f"{pair[0]} {pair[1]}")
+                rows.append(row)
+                columns.append(column)
+                values.append(sign * self.word_weight)
+
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(vectors, (np.asarray(rows, dtype=np.intp), np.asarray(columns, dtype=np.intp)),
+                  np.asarray(values, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+    def _word_features(self, word: str) -> Tuple[List[int], List[float]]:
+        features = self._words.get(word)
+        if features is None:
+            column, sign = self._bucket(word)
+            columns, values = [column], [sign * self.word_weight]
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                column, sign = self._bucket(padded[i:i + 3], salt=b"c")
+                columns.append(column)
+                values.append(sign * self.char_weight)
+            if len(self._words) >= self.cache_size:
+                self._words.clear()
+            features = self._words[word] = (columns, values)
+        return features
+
+    def _bucket(self, feature: str, salt: bytes = b"w") -> Tuple[int, float]:
+        h = zlib.crc32(salt + feature.encode("utf-8"))
+        return h % self.dim, 1.0 if h & 0x80000000 else -1.0
@@ -0,0 +1,121 @@
+"""
+TruthLens - Fact Checking
+=========================
+Claim extraction and retrieval of matching verified claims
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import logging
+import os
+from typing import TYPE_CHECKING, List, Optional
+
+from src.ml.claims import ClaimExtractor
+
+# numpy and the index are imported by from_env()/open(), only when an index is configured
+if TYPE_CHECKING:
+    from src.ml.analyzer import FactCheck
+    from src.ml.embeddings import HashingEmbedder
+    from src.ml.factindex import FactIndex
+
+logger = logging.getLogger(__name__)
+
+
+class FactChecker:
+    """
+    Fact-check stage: checkable sentences looked up in an index of verified claims.
+
+    extract() runs per document; check_batch() embeds the claims of a
+    whole batch in one call and queries the index once for all of them.
+    A claim whose closest verified claim is at least ``threshold``
+    similar becomes a FactCheck carrying that claim's verdict, sources
+    and explanation; confidence is the similarity scaled by the verified
+    claim's own confidence. Claims without a close match are left out.
+
+    Args:
+        index: Opened FactIndex (see src.ml.factindex)
+        threshold: Minimum cosine similarity of a match
+        nprobe: Inverted lists scanned per claim
+        extractor: Claim extractor (defaults: 5 claims per document)
+        embedder: Must match the index; defaults to the index's own parameters
+    """
+
+    def __init__(self, index: "FactIndex", threshold: float = 0.8, nprobe: int = 8,
+                 extractor: Optional[ClaimExtractor] = None,
+                 embedder: Optional["HashingEmbedder"] = None):
+        self.index = index
+        self.threshold = threshold
+        self.nprobe = nprobe
+        self.extractor = extractor or ClaimExtractor()
+        self.embedder = embedder or index.embedder()
+
+    @classmethod
+    def open(cls, directory: str, **kwargs) -> "FactChecker":
+        from src.ml.factindex import FactIndex
+
+        return cls(FactIndex(directory), **kwargs)
+
+    @classmethod
+    def from_env(cls) -> Optional["FactChecker"]:
+        """Create a checker from environment variables (None unless TRUTHLENS_FACTCHECK_INDEX is set)."""
+        directory = os.getenv("TRUTHLENS_FACTCHECK_INDEX", "")
+        if not directory:
+            return None
+        try:
+            checker = cls.open(
+                directory,
+                threshold=float(os.getenv("TRUTHLENS_FACTCHECK_THRESHOLD", "0.8")),
+                nprobe=int(os.getenv("TRUTHLENS_FACTCHECK_NPROBE", "8")),
+                extractor=ClaimExtractor(max_claims=int(os.getenv("TRUTHLENS_FACTCHECK_MAX_CLAIMS", "5")))
+            )
+        except Exception as e:
+            logger.error(f"Fact-check index {directory} not loaded, fact checking is off: {e}")
+            return None
+        logger.info(f"Fact-check index {checker.version} loaded ({len(checker.index)} verified claims)")
+        return checker
+
+    @property
+    def version(self) -> str:
+        """Index build, part of cache keys so a new index doesn't serve old fact checks."""
+        return self.index.version
+
+    def extract(self, text: str) -> List[str]:
+        """Checkable claims of one (preprocessed) document."""
+        return self.extractor.extract(text)
+
+    def check_batch(self, claims: List[List[str]]) -> List[List["FactCheck"]]:
+        """Fact checks per document for per-document claim lists, in input order."""
+        from src.ml.analyzer import FactCheck
+
+        results: List[List[FactCheck]] = [[] for _ in claims]
+        flat = [(doc, claim) for doc, doc_claims in enumerate(claims) for claim in doc_claims]
+        if not flat:
+            return results
+        try:
+            vectors = self.embedder.embed([claim for _, claim in flat])
+            matches = self.index.search(vectors, k=1, nprobe=self.nprobe)
+            for (doc, claim), hits in zip(flat, matches):
+                if not hits or hits[0][1] < self.threshold:
+                    continue
+                number, similarity = hits[0]
+                record = self.index.record(number)
+                similarity = min(similarity, 1.0)  # quantized vectors can round past 1
+                explanation = f'Matches verified claim "{record["claim"]}" ({similarity:.0%} similar)'
+                if record.get("explanation"):
+                    explanation += f". {record['explanation']}"
+                results[doc].append(FactCheck(
+                    claim=claim,
+                    verdict=record["verdict"],
+                    confidence=round(similarity * record.get("confidence", 1.0), 3),
+                    sources=list(record.get("sources", [])),
+                    explanation=explanation
+                ))
+        except Exception as e:
+            # A broken index must not fail the analysis itself
+            logger.error(f"Fact-check lookup failed: {e}")
+            return [[] for _ in claims]
+        return results
+
+    def close(self):
+        self.index.close()
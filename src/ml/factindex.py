@@ -0,0 +1,339 @@
+"""
+TruthLens - Fact Index
+======================
+Memory-mapped IVF index of verified claims, built offline
+
+Usage:
+    python -m src.ml.factindex claims.jsonl data/factindex
+    python -m src.ml.factindex claims.csv.gz data/factindex --nlist 4096
+
+Input rows (JSONL or CSV, .gz allowed; CSV sources are "|"-separated):
+
+    {"claim": "5G towers spread COVID-19", "verdict": "false", "confidence": 0.95,
+     "sources": ["https://..."], "explanation": "..."}
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import math
+import mmap
+import os
+import shutil
+import sys
+import time
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import numpy as np
+
+from src.ml.embeddings import HashingEmbedder
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+VERDICTS = ("true", "false", "partially_true", "unverified")
+
+# Sample size per list used to train the coarse centroids
+TRAIN_POINTS_PER_LIST = 32
+# Rows multiplied against the centroids at once while assigning lists
+ASSIGN_CHUNK = 65_536
+
+
+def default_nlist(count: int) -> int:
+    """Inverted lists for ``count`` claims (~4 * sqrt(n): a few hundred claims per list at 1M)."""
+    return max(1, min(count, 65_536, int(4 * math.sqrt(count))))
+
+
+def _open_text(path: str) -> TextIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def _normalize(row: Dict[str, Any], where: str) -> Dict[str, Any]:
+    claim = (row.get("claim") or "").strip()
+    if not claim:
+        raise ValueError(f"{where}: empty claim")
+    verdict = (row.get("verdict") or "").strip().lower().replace(" ", "_").replace("-", "_")
+    if verdict not in VERDICTS:
+        raise ValueError(f"{where}: verdict must be one of {', '.join(VERDICTS)}, got {verdict!r}")
+    sources = row.get("sources") or []
+    if isinstance(sources, str):
+        sources = [s.strip() for s in sources.split("|") if s.strip()]
+    confidence = row.get("confidence")
+    confidence = 1.0 if confidence in (None, "") else float(confidence)
+    if not 0.0 <= confidence <= 1.0:
+        raise ValueError(f"{where}: confidence must be between 0 and 1")
+    return {"claim": claim, "verdict": verdict, "confidence": confidence,
+            "sources": list(sources), "explanation": (row.get("explanation") or "").strip()}
+
+
+def iter_claims(path: str, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Validated verified-claim records from a JSONL or CSV file."""
+    name = path[:-3] if path.endswith(".gz") else path
+    fmt = fmt or ("csv" if name.lower().endswith(".csv") else "jsonl")
+    with _open_text(path) as f:
+        if fmt == "csv":
+            csv.field_size_limit(sys.maxsize)
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                yield _normalize(row, f"{path}:{line}")
+        elif fmt == "jsonl":
+            for line, text in enumerate(f, start=1):
+                if text.strip():
+                    yield _normalize(json.loads(text), f"{path}:{line}")
+        else:
+            raise ValueError(f"Unknown input format {fmt!r}")
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the most similar centroid for each row, in chunks."""
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_CHUNK):
+        block = np.asarray(vectors[start:start + ASSIGN_CHUNK], dtype=np.float32)
+        assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assign
+
+
+def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """int8 rows and per-row float32 scales (row ~= int8 row * scale)."""
+    peak = np.abs(vectors).max(axis=1)
+    scales = np.where(peak > 0, peak / 127, 1.0).astype(np.float32)
+    return np.rint(vectors / scales[:, None]).astype(np.int8), scales
+
+
+def kmeans(sample: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means: unit-length centroids maximizing cosine similarity to the sample."""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(sample, centroids)
+        counts = np.bincount(assign, minlength=nlist)
+        filled = counts > 0
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        # Lists are contiguous after sorting, so each centroid is one reduceat segment
+        ordered = sample[np.argsort(assign, kind="stable")]
+        centroids[filled] = np.add.reduceat(ordered, starts[filled], axis=0)
+        # Empty lists restart from random sample points
+        centroids[~filled] = sample[rng.choice(len(sample), int((~filled).sum()))]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        np.divide(centroids, norms, out=centroids, where=norms > 0)
+    return centroids
+
+
+def build_index(input_path: str, directory: str, embedder: Optional[HashingEmbedder] = None,
+                nlist: Optional[int] = None, input_format: Optional[str] = None,
+                batch_size: int = 4096, iterations: int = 10, seed: int = 0,
+                progress: Optional[TextIO] = None) -> Dict[str, Any]:
+    """
+    Build an index directory from a file of verified claims; returns its manifest.
+
+    Claims are streamed: records and float16 vectors go to disk batch by
+    batch, so memory depends on the batch and the centroid sample, not
+    the corpus. Coarse centroids are trained on a sample with spherical
+    k-means, every vector is assigned to its nearest centroid, and the
+    vectors are rewritten as int8 (with a scale per vector) grouped by
+    list, so each inverted list is one contiguous slice of the
+    memory-mapped matrix. The directory is built
+    next to ``directory`` and swapped in when complete; processes that
+    still have the old index mapped keep reading it.
+    """
+    embedder = embedder or HashingEmbedder()
+    tmp = f"{directory.rstrip(os.sep)}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    raw_path = os.path.join(tmp, "raw.f16")
+    digest = hashlib.blake2b(json.dumps(embedder.params(), sort_keys=True).encode(), digest_size=6)
+    record_offsets = array("q", [0])
+    start = time.perf_counter()
+
+    def flush(batch: List[str], out):
+        out.write(embedder.embed(batch).astype(np.float16).tobytes())
+        if progress is not None:
+            done = len(record_offsets) - 1
+            progress.write(f"\r{done} claims, {done / (time.perf_counter() - start):.0f} claims/s")
+            progress.flush()
+
+    with open(raw_path, "wb") as out, open(os.path.join(tmp, "records.jsonl"), "wb") as records:
+        batch: List[str] = []
+        for record in iter_claims(input_path, input_format):
+            line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+            records.write(line)
+            digest.update(line)
+            record_offsets.append(record_offsets[-1] + len(line))
+            batch.append(record["claim"])
+            if len(batch) >= batch_size:
+                flush(batch, out)
+                batch = []
+        if batch:
+            flush(batch, out)
+    if progress is not None:
+        progress.write("\n")
+    count = len(record_offsets) - 1
+    if not count:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise ValueError(f"No claims in {input_path}")
+
+    dim = embedder.dim
+    nlist = min(nlist or default_nlist(count), count)
+    raw = np.memmap(raw_path, dtype=np.float16, mode="r", shape=(count, dim))
+    rng = np.random.default_rng(seed)
+    sample_rows = np.sort(rng.choice(count, min(count, nlist * TRAIN_POINTS_PER_LIST), replace=False))
+    centroids = kmeans(np.asarray(raw[sample_rows], dtype=np.float32), nlist, iterations, seed)
+
+    assign = _nearest(raw, centroids)
+    order = np.argsort(assign, kind="stable")
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(assign, minlength=nlist)))).astype(np.int64)
+    vectors = np.lib.format.open_memmap(os.path.join(tmp, "vectors.npy"), mode="w+",
+                                        dtype=np.int8, shape=(count, dim))
+    scales = np.empty(count, dtype=np.float32)
+    for begin in range(0, count, ASSIGN_CHUNK):
+        block = np.asarray(raw[order[begin:begin + ASSIGN_CHUNK]], dtype=np.float32)
+        vectors[begin:begin + len(block)], scales[begin:begin + len(block)] = quantize(block)
+    vectors.flush()
+    del vectors, raw
+    os.remove(raw_path)
+
+    np.save(os.path.join(tmp, "centroids.npy"), centroids.astype(np.float32))
+    np.save(os.path.join(tmp, "scales.npy"), scales)
+    np.save(os.path.join(tmp, "list_offsets.npy"), offsets)
+    np.save(os.path.join(tmp, "ids.npy"), order.astype(np.int64))
+    np.save(os.path.join(tmp, "record_offsets.npy"), np.frombuffer(record_offsets, dtype=np.int64))
+    manifest = {
+        "format": FORMAT_VERSION,
+        "version": digest.hexdigest(),
+        "count": count,
+        "dim": dim,
+        "nlist": nlist,
+        "embedder": embedder.params(),
+        "source": os.path.basename(input_path),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "build_seconds": round(time.perf_counter() - start, 2),
+    }
+    with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    old = f"{directory.rstrip(os.sep)}.old"
+    if os.path.exists(directory):
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(directory, old)
+    os.replace(tmp, directory)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+class FactIndex:
+    """
+    Read-only inverted-file (IVF) index over memory-mapped NumPy arrays.
+
+    A query is compared with the ``nlist`` coarse centroids (kept in
+    RAM) and only the vectors of its ``nprobe`` closest lists are
+    scored, each list being one contiguous slice of vectors.npy. Vectors,
+    list ids and claim records stay memory-mapped: opening the index
+    reads only the small arrays, the page cache is shared by every
+    worker process, and a query touches a few hundred KB at most.
+
+    Files (written by build_index()): manifest.json, centroids.npy,
+    list_offsets.npy, vectors.npy (int8, grouped by list), scales.npy
+    (one float32 per vector), ids.npy, records.jsonl and
+    record_offsets.npy.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"{directory}: unsupported index format {self.manifest.get('format')!r}")
+        path = lambda name: os.path.join(directory, name)
+        self.centroids = np.load(path("centroids.npy"))
+        self.offsets = np.load(path("list_offsets.npy"))
+        self.scales = np.load(path("scales.npy"))
+        self.vectors = np.load(path("vectors.npy"), mmap_mode="r")
+        self.ids = np.load(path("ids.npy"), mmap_mode="r")
+        self._record_offsets = np.load(path("record_offsets.npy"), mmap_mode="r")
+        with open(path("records.jsonl"), "rb") as f:
+            self._records = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return int(self.manifest["count"])
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def embedder(self) -> HashingEmbedder:
+        """An embedder with the parameters the index was built with."""
+        return HashingEmbedder(**self.manifest["embedder"])
+
+    def search(self, queries: np.ndarray, k: int = 1, nprobe: int = 8) -> List[List[Tuple[int, float]]]:
+        """Top ``k`` (record number, cosine similarity) per query row, best first."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = min(max(1, nprobe), self.nlist)
+        coarse = queries @ self.centroids.T
+        if nprobe < self.nlist:
+            probes = np.argpartition(coarse, -nprobe, axis=1)[:, -nprobe:]
+        else:
+            probes = np.broadcast_to(np.arange(self.nlist), coarse.shape)
+        offsets, vectors, scales, ids = self.offsets, self.vectors, self.scales, self.ids
+
+        results = []
+        for query, lists in zip(queries, probes):
+            scores, positions = [], []
+            for lst in lists:
+                begin, end = offsets[lst], offsets[lst + 1]
+                if begin < end:
+                    scores.append((np.asarray(vectors[begin:end], dtype=np.float32) @ query) * scales[begin:end])
+                    positions.append(np.arange(begin, end))
+            if not scores:
+                results.append([])
+                continue
+            scores = np.concatenate(scores)
+            positions = np.concatenate(positions)
+            top = np.argpartition(scores, -k)[-k:] if k < len(scores) else np.arange(len(scores))
+            top = top[np.argsort(scores[top])[::-1]]
+            results.append([(int(ids[positions[i]]), float(scores[i])) for i in top])
+        return results
+
+    def record(self, number: int) -> Dict[str, Any]:
+        """Claim record (claim, verdict, confidence, sources, explanation) by record number."""
+        begin, end = self._record_offsets[number], self._record_offsets[number + 1]
+        return json.loads(self._records[begin:end])
+
+    def close(self):
+        self._records.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the TruthLens verified-claims index")
+    parser.add_argument("input", help="JSONL or CSV file of verified claims (.gz allowed)")
+    parser.add_argument("output", help="index directory (replaced when the build completes)")
+    parser.add_argument("--input-format", choices=("jsonl", "csv"))
+    parser.add_argument("--dim", type=int, default=256, help="embedding size")
+    parser.add_argument("--nlist", type=int, help="inverted lists (default ~4*sqrt(claims))")
+    parser.add_argument("--iterations", type=int, default=10, help="k-means iterations")
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quiet", action="store_true", help="no progress readout")
+    args = parser.parse_args(argv)
+
+    manifest = build_index(
+        args.input, args.output, embedder=HashingEmbedder(dim=args.dim), nlist=args.nlist,
+        input_format=args.input_format, batch_size=args.batch_size,
+        iterations=args.iterations, seed=args.seed,
+        progress=None if args.quiet else sys.stderr
+    )
+    print(json.dumps(manifest))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
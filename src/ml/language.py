@@ -0,0 +1,194 @@
+"""
+TruthLens - Language Packs
+==========================
+Character n-gram language identification and per-language lexicon packs
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from src.ml.scanner import LexiconScanner
+from src.ml.tokenizer import DEFAULT_TOKENIZER, Tokenizer, Tokens
+
+logger = logging.getLogger(__name__)
+
+LEXICON_DIR = os.path.join(os.path.dirname(__file__), "lexicons")
+PROFILES_FILE = "profiles.json"
+
+# Trigrams kept per language profile and per document
+PROFILE_SIZE = 300
+DOCUMENT_NGRAMS = 100
+
+
+def ngram_counts(words: Iterable[str]) -> Counter:
+    """Character trigrams of space-joined, space-padded words (" the cat " -> " th", "the", ...)."""
+    text = f" {' '.join(words)} "
+    return Counter(map(''.join, zip(text, text[1:], text[2:])))
+
+
+def build_profile(texts: Iterable[str], size: int = PROFILE_SIZE,
+                  tokenizer: Tokenizer = DEFAULT_TOKENIZER) -> List[str]:
+    """Most frequent trigrams of a corpus, most frequent first (for profiles.json)."""
+    counts: Counter = Counter()
+    for text in texts:
+        counts.update(ngram_counts(tokenizer.tokenize(text).words))
+    return [gram for gram, _ in counts.most_common(size)]
+
+
+class LanguageDetector:
+    """
+    Rank-order character trigram language identification (Cavnar & Trenkle).
+
+    A document's most frequent trigrams are compared with each language
+    profile by how far their ranks are apart; the closest profile wins.
+    Languages whose profile alphabet doesn't cover most of the sample's
+    letters are ruled out first, which settles different scripts (en vs
+    uk) without counting n-grams at all. Only the first ``sample_words``
+    tokens are looked at, so detection cost does not depend on document
+    length. Profiles are read from profiles.json on first use.
+
+    Args:
+        directory: Directory holding profiles.json
+        default: Language for texts without enough letters to decide
+        sample_words: Tokens of a document used for detection
+    """
+
+    def __init__(self, directory: str = LEXICON_DIR, default: str = "en",
+                 sample_words: int = 60, min_ngrams: int = 12):
+        self.directory = directory
+        self.default = default
+        self.sample_words = sample_words
+        self.min_ngrams = min_ngrams
+        self._profiles: Optional[Dict[str, Dict[str, int]]] = None
+        self._alphabets: Dict[str, FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def languages(self) -> List[str]:
+        return sorted(self._load())
+
+    def detect(self, text) -> str:
+        """Language code of a text or Tokens."""
+        words = text.words if isinstance(text, Tokens) else DEFAULT_TOKENIZER.tokenize(text).words
+        words = words[:self.sample_words]
+        profiles = self._load()
+        letters = {c for c in set(''.join(words)) if c.isalpha()}
+        if not letters:
+            return self.default
+        candidates = [language for language, alphabet in self._alphabets.items()
+                      if 2 * len(letters & alphabet) > len(letters)] or list(profiles)
+        if len(candidates) == 1:
+            return candidates[0]
+
+        counts = ngram_counts(words)
+        if len(counts) < self.min_ngrams:
+            return self.default
+        ranked = [gram for gram, _ in counts.most_common(DOCUMENT_NGRAMS)]
+        best, best_distance = self.default, None
+        for language in candidates:
+            profile = profiles[language]
+            missing = len(profile)
+            distance = 0
+            for rank, gram in enumerate(ranked):
+                known = profile.get(gram)
+                distance += missing if known is None else abs(known - rank)
+            if best_distance is None or distance < best_distance:
+                best, best_distance = language, distance
+        return best
+
+    def _load(self) -> Dict[str, Dict[str, int]]:
+        if self._profiles is None:
+            with self._lock:
+                if self._profiles is None:
+                    with open(os.path.join(self.directory, PROFILES_FILE), encoding="utf-8") as f:
+                        data = json.load(f)
+                    self._alphabets = {
+                        language: frozenset(c for c in ''.join(grams) if c.isalpha())
+                        for language, grams in data.items()
+                    }
+                    self._profiles = {
+                        language: {gram: rank for rank, gram in enumerate(grams)}
+                        for language, grams in data.items()
+                    }
+        return self._profiles
+
+
+class LexiconPacks:
+    """
+    Per-language lexicons stored as JSON data files (``<language>.json``).
+
+    A pack is read and compiled into a LexiconScanner the first time its
+    language is requested and cached afterwards, so startup does not
+    depend on how many packs exist. Languages without a pack use the
+    default language's scanner. Packs given inline (``packs``, e.g. from
+    the analyzer config file) take precedence over files.
+
+    Pack format::
+
+        {"language": "uk",
+         "terms": {"emotional": [...], "fear": [...]},
+         "patterns": {"clickbait": [...]},
+         "token_sets": {"positive": [...], "negative": [...]}}
+    """
+
+    def __init__(self, directory: str = LEXICON_DIR, default: str = "en",
+                 tokenizer: Optional[Tokenizer] = None,
+                 packs: Optional[Dict[str, Dict[str, Dict[str, List[str]]]]] = None):
+        self.directory = directory
+        self.default = default
+        self.tokenizer = tokenizer or DEFAULT_TOKENIZER
+        self.packs = dict(packs or {})
+        self._scanners: Dict[str, LexiconScanner] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> List[str]:
+        """Languages compiled so far."""
+        return sorted(self._scanners)
+
+    def available(self) -> List[str]:
+        """Languages with a pack, inline or on disk."""
+        return sorted(set(self.packs) | {
+            name[:-5] for name in os.listdir(self.directory)
+            if name.endswith(".json") and name != PROFILES_FILE
+        })
+
+    def load(self, language: str) -> Optional[Dict[str, Dict[str, List[str]]]]:
+        """Raw pack data, or None when the language has no pack."""
+        if language in self.packs:
+            return self.packs[language]
+        path = os.path.join(self.directory, f"{language}.json")
+        if language == PROFILES_FILE[:-5] or not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def scanner(self, language: str) -> LexiconScanner:
+        """Compiled scanner for a language (the default language's when it has no pack)."""
+        scanner = self._scanners.get(language)
+        if scanner is None:
+            with self._lock:
+                scanner = self._scanners.get(language) or self._compile(language)
+        return scanner
+
+    def _compile(self, language: str) -> LexiconScanner:
+        pack = self.load(language)
+        if pack is None:
+            if language == self.default:
+                raise FileNotFoundError(f"No lexicon pack for default language {language!r}")
+            scanner = self._scanners.get(self.default) or self._compile(self.default)
+        else:
+            scanner = LexiconScanner(
+                terms=pack.get("terms"), patterns=pack.get("patterns"),
+                token_sets=pack.get("token_sets"), tokenizer=self.tokenizer
+            )
+            logger.info(f"Compiled {language} lexicon pack")
+        self._scanners[language] = scanner
+        return scanner
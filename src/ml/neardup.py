@@ -0,0 +1,264 @@
+"""
+TruthLens - Near-Duplicate Index
+================================
+MinHash + LSH lookup of previously analyzed, lightly edited texts
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# Mersenne prime for the (a * x + b) mod p permutations; a * x fits in uint64
+_PRIME = (1 << 31) - 1
+# Shingles permuted at once by signature(); bounds its scratch memory to
+# _SIGN_BLOCK x num_perm x 8 bytes (4 MB at 128 permutations)
+_SIGN_BLOCK = 4096
+_URL = re.compile(r'(https?://[^\s?#]+)[^\s]*')
+_WORD = re.compile(r'\w+')
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Word ``size``-grams of a text, ignoring case, punctuation, emojis and URL query strings."""
+    words = _WORD.findall(_URL.sub(r'\1', text).casefold())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+@dataclass
+class NearDuplicate:
+    """A previously analyzed text similar to the query"""
+    key: str
+    similarity: float
+    domain: Optional[str]
+    result: Any  # CompactResult, as stored by the analyzer
+
+
+class _Entry:
+    __slots__ = ('signature', 'domain', 'result', 'added_at')
+
+    def __init__(self, signature: "np.ndarray", domain: Optional[str], result: Any, added_at: float):
+        self.signature = signature
+        self.domain = domain
+        self.result = result
+        self.added_at = added_at
+
+
+class NearDuplicateIndex:
+    """
+    MinHash signatures of analyzed texts, bucketed by LSH bands.
+
+    A text's word shingles are reduced to ``num_perm`` MinHash values;
+    the fraction of equal values between two signatures estimates their
+    Jaccard similarity. Signatures are split into ``bands`` bands and
+    texts sharing any band land in the same bucket, so a query only
+    compares against a handful of candidates. Candidates at or above
+    ``threshold`` estimated similarity are near-duplicates.
+
+    At most ``max_entries`` texts are kept (oldest evicted first) and
+    entries older than ``max_age_seconds`` are dropped. snapshot() and
+    restore() persist the index as JSON so a restart keeps it.
+
+    Args:
+        threshold: Minimum estimated Jaccard similarity for a match
+        num_perm: MinHash permutations (signature length)
+        bands: LSH bands; num_perm must divide evenly
+        shingle_size: Words per shingle
+        max_entries: Texts kept in the index
+        max_age_seconds: Age after which entries are dropped
+        path: Snapshot file used by from_env() and save()
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 32,
+                 shingle_size: int = 3, max_entries: int = 50_000,
+                 max_age_seconds: float = 86_400, path: Optional[str] = None,
+                 seed: int = 1, clock: Callable[[], float] = time.time):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max(1, max_entries)
+        self.max_age_seconds = max_age_seconds
+        self.path = path
+        self.seed = seed
+        self._clock = clock
+        # numpy is only needed once an index exists (TRUTHLENS_NEARDUP=1)
+        import numpy as np
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm).astype(np.uint64)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+
+    @classmethod
+    def from_env(cls) -> Optional["NearDuplicateIndex"]:
+        """Create an index from environment variables (None unless TRUTHLENS_NEARDUP=1)."""
+        if os.getenv("TRUTHLENS_NEARDUP", "0") != "1":
+            return None
+        index = cls(
+            threshold=float(os.getenv("TRUTHLENS_NEARDUP_THRESHOLD", "0.8")),
+            max_entries=int(os.getenv("TRUTHLENS_NEARDUP_SIZE", "50000")),
+            max_age_seconds=float(os.getenv("TRUTHLENS_NEARDUP_MAX_AGE", "86400")),
+            path=os.getenv("TRUTHLENS_NEARDUP_PATH") or None
+        )
+        if index.path and os.path.exists(index.path):
+            try:
+                index.restore(index.path)
+            except Exception as e:
+                logger.warning(f"Could not restore near-duplicate index from {index.path}: {e}")
+        return index
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, text: str) -> Optional["np.ndarray"]:
+        """MinHash signature of a text, or None if it has no words."""
+        import numpy as np
+
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return None
+        hashes = np.fromiter(
+            (zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams)
+        ) % np.uint64(_PRIME)
+        # Permute a block of shingles at a time, so a long page never
+        # needs a len(shingles) x num_perm matrix
+        prime = np.uint64(_PRIME)
+        signature = np.full(self.num_perm, prime, dtype=np.uint64)
+        permuted = np.empty((_SIGN_BLOCK, self.num_perm), dtype=np.uint64)
+        for start in range(0, len(hashes), _SIGN_BLOCK):
+            block = hashes[start:start + _SIGN_BLOCK]
+            out = permuted[:len(block)]
+            np.multiply.outer(block, self._a, out=out)
+            out += self._b
+            out %= prime
+            np.minimum(signature, out.min(axis=0), out=signature)
+        return signature.astype(np.uint32)
+
+    def query(self, signature: Optional["np.ndarray"]) -> Optional[NearDuplicate]:
+        """Most similar indexed text at or above the threshold, if any."""
+        if signature is None:
+            return None
+        import numpy as np
+
+        with self._lock:
+            self._expire(self._clock())
+            candidates: Set[str] = set()
+            for band_key in self._band_keys(signature):
+                candidates.update(self._buckets.get(band_key, ()))
+            best, best_similarity = None, 0.0
+            for key in candidates:
+                entry = self._entries[key]
+                similarity = float(np.count_nonzero(entry.signature == signature)) / self.num_perm
+                if similarity > best_similarity:
+                    best, best_similarity = key, similarity
+            if best is None or best_similarity < self.threshold:
+                return None
+            entry = self._entries[best]
+            return NearDuplicate(best, round(best_similarity, 4), entry.domain, entry.result)
+
+    def add(self, key: str, signature: Optional["np.ndarray"], result: Any,
+            domain: Optional[str] = None, added_at: Optional[float] = None):
+        """Index an analyzed text under its request key."""
+        if signature is None:
+            return
+        added_at = self._clock() if added_at is None else added_at
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _Entry(signature, domain, result, added_at)
+            for band_key in self._band_keys(signature):
+                self._buckets.setdefault(band_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable copy of the index."""
+        with self._lock:
+            entries = [
+                {"key": key, "added_at": entry.added_at, "domain": entry.domain,
+                 "signature": entry.signature.tolist(), "result": entry.result.to_dict()}
+                for key, entry in self._entries.items()
+            ]
+        return {"version": SNAPSHOT_VERSION, "num_perm": self.num_perm, "bands": self.bands,
+                "shingle_size": self.shingle_size, "seed": self.seed, "entries": entries}
+
+    def save(self, path: Optional[str] = None):
+        """Write a snapshot atomically (to ``path`` or the configured one)."""
+        path = path or self.path
+        if not path:
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def restore(self, path: str) -> int:
+        """Load a snapshot written by save(); returns the entries kept."""
+        import numpy as np
+
+        from src.ml.analyzer import AnalysisResult
+
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        params = (data.get("version"), data.get("num_perm"), data.get("bands"),
+                  data.get("shingle_size"), data.get("seed"))
+        if params != (SNAPSHOT_VERSION, self.num_perm, self.bands, self.shingle_size, self.seed):
+            raise ValueError("snapshot was built with different parameters")
+        cutoff = self._clock() - self.max_age_seconds
+        for item in data["entries"]:
+            if item["added_at"] < cutoff:
+                continue
+            self.add(item["key"], np.asarray(item["signature"], dtype=np.uint32),
+                     AnalysisResult.from_dict(item["result"]).compact(), item["domain"], item["added_at"])
+        return len(self)
+
+    def _band_keys(self, signature: "np.ndarray") -> List[Tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                for band in range(self.bands)]
+
+    def _expire(self, now: float):
+        cutoff = now - self.max_age_seconds
+        # Entries are in insertion order, so the oldest come first
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.added_at >= cutoff:
+                break
+            self._remove(key)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band_key in self._band_keys(entry.signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
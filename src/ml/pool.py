@@ -0,0 +1,288 @@
+"""
+TruthLens - Process Pool Engine
+===============================
+Optional multi-process execution of the analyzer pipeline
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.ml.analyzer import AnalysisResult, Lookup, TruthLensAnalyzer, create_analyzer
+from src.ml.cache import ResultCache
+from src.ml.factcheck import FactChecker
+
+logger = logging.getLogger(__name__)
+
+# Per-process analyzer, created once by the pool initializer
+_worker_analyzer: Optional[TruthLensAnalyzer] = None
+
+
+def _init_worker(use_gpu: bool, instrument: bool = False, cache: bool = True):
+    """Build the worker's analyzer and load its models once."""
+    global _worker_analyzer
+    _worker_analyzer = create_analyzer(
+        use_gpu=use_gpu, cache=ResultCache.from_env() if cache else None, instrument=instrument,
+        fact_checker=FactChecker.from_env()
+    )
+    _worker_analyzer.load_models_sync()
+
+
+def _warm_up() -> tuple:
+    """Run a throwaway analysis so the first real request is not cold."""
+    _worker_analyzer.analyze_sync("TruthLens warm-up text for the analysis pipeline.")
+    return os.getpid(), _worker_analyzer.registry.status()
+
+
+def _analyze_chunk(texts: List[str], urls: List[Optional[str]]) -> List[Any]:
+    return _worker_analyzer.analyze_batch_sync(texts, urls, return_exceptions=True)
+
+
+class AnalyzerPool:
+    """
+    Analyzer engine backed by a pool of worker processes.
+
+    Each worker builds its own analyzer and loads models once when it
+    starts. Batches are split into chunks so one pickled message carries
+    many documents, and workers are replaced after ``max_tasks_per_child``
+    chunks to cap memory growth (Python 3.11+). With ``workers=0``
+    everything runs in-process on ``local``, which is what tests and
+    small deployments use.
+
+    With workers, ``local`` (when given) stays in the parent: its config
+    and source scores are loaded on warm-up so request keys follow the
+    config version, and its result cache and near-duplicate index sit in
+    front of the workers. Cache hits and reused near-duplicates never
+    leave the parent; misses are analyzed by a worker and stored there,
+    so one cache and one index (the one the owner saves) serve every
+    worker. Workers never build a near-duplicate index of their own.
+
+    Args:
+        workers: Number of worker processes (0 = in-process)
+        max_tasks_per_child: Chunks a worker handles before it is recycled
+        chunk_size: Documents per message sent to a worker
+        local: Analyzer used in in-process mode
+        use_gpu: Passed to worker analyzers
+        instrument: Record per-stage timings in worker analyzers
+    """
+
+    def __init__(self, workers: int = 0, max_tasks_per_child: Optional[int] = 1000,
+                 chunk_size: int = 32, local: Optional[TruthLensAnalyzer] = None,
+                 use_gpu: bool = False, instrument: bool = False):
+        self.workers = max(0, workers)
+        self.max_tasks_per_child = max_tasks_per_child
+        self.chunk_size = max(1, chunk_size)
+        self.use_gpu = use_gpu
+        self.instrument = instrument
+        self.local = local
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._ready = False
+        self._model_status: Dict[str, Dict[str, Any]] = {}
+        if self.workers == 0 and self.local is None:
+            self.local = create_analyzer(use_gpu=use_gpu, instrument=instrument)
+
+    @classmethod
+    def from_env(cls, local: Optional[TruthLensAnalyzer] = None) -> "AnalyzerPool":
+        """Create a pool configured from environment variables."""
+        max_tasks = int(os.getenv("TRUTHLENS_WORKER_MAX_TASKS", "1000"))
+        return cls(
+            workers=int(os.getenv("TRUTHLENS_ANALYSIS_PROCESSES", "0")),
+            max_tasks_per_child=max_tasks or None,
+            local=local,
+            instrument=local.instrument if local is not None else False
+        )
+
+    @property
+    def in_process(self) -> bool:
+        return self.workers == 0
+
+    @property
+    def ready(self) -> bool:
+        """Whether warm-up has finished and models are loaded."""
+        if self.in_process:
+            return self.local.models_ready
+        return self._ready
+
+    def model_status(self) -> Dict[str, Dict[str, Any]]:
+        """Model registry status (as reported by a worker in process mode)."""
+        if self.in_process:
+            return self.local.registry.status()
+        return self._model_status
+
+    def start(self):
+        """Start worker processes (no-op in in-process mode)."""
+        if self.in_process:
+            return
+        with self._lock:
+            if self._executor is not None:
+                return
+            # Worker recycling needs a non-fork start method
+            context = multiprocessing.get_context("spawn")
+            options: Dict[str, Any] = {}
+            if self.max_tasks_per_child is not None:
+                if sys.version_info >= (3, 11):
+                    options["max_tasks_per_child"] = self.max_tasks_per_child
+                else:
+                    logger.warning("Worker recycling needs Python 3.11+, workers are not recycled")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                # The parent's cache replaces the workers' own
+                initargs=(self.use_gpu, self.instrument, self.local is None or self.local.cache is None),
+                **options
+            )
+        logger.info(f"Started analyzer pool with {self.workers} processes")
+
+    def warm_up(self) -> List[int]:
+        """Start workers, load models and run one warm-up analysis per worker."""
+        if self.in_process:
+            self.local.load_models_sync()
+            self.local.analyze_sync("TruthLens warm-up text for the analysis pipeline.")
+            return [os.getpid()]
+        if self.local is not None:
+            self.local.load_config_sync()
+        self.start()
+        futures = [self._executor.submit(_warm_up) for _ in range(self.workers)]
+        reports = [f.result() for f in futures]
+        self._model_status = reports[0][1]
+        self._ready = True
+        return sorted({pid for pid, _ in reports})
+
+    def analyze_sync(self, text: str, url: Optional[str] = None) -> AnalysisResult:
+        """Analyze one document, blocking until the result is ready."""
+        if self.in_process:
+            return self.local.analyze_sync(text, url)
+        result = self.analyze_batch_sync([text], [url], return_exceptions=True)[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def analyze_batch_sync(self, texts: List[str], urls: Optional[List[Optional[str]]] = None,
+                           return_exceptions: bool = False) -> List[Any]:
+        """Analyze documents across workers, preserving input order."""
+        if self.in_process:
+            return self.local.analyze_batch_sync(texts, urls, return_exceptions)
+        if urls is None:
+            urls = [None] * len(texts)
+        elif len(urls) != len(texts):
+            raise ValueError("texts and urls must have the same length")
+
+        self.start()
+        lookups = self._lookup(texts, urls)
+        todo = self._misses(lookups)
+        futures = [
+            self._executor.submit(
+                _analyze_chunk,
+                [texts[i] for i in todo[start:start + self.chunk_size]],
+                [urls[i] for i in todo[start:start + self.chunk_size]]
+            )
+            for start in range(0, len(todo), self.chunk_size)
+        ]
+        analyzed: List[Any] = []
+        for future in futures:
+            analyzed.extend(future.result())
+        results = self._merge(lookups, todo, analyzed)
+
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
+
+    def iter_batches(self, batches: Iterable[Tuple[List[str], List[Optional[str]]]],
+                     window: Optional[int] = None) -> Iterator[List[Any]]:
+        """
+        Analyze a stream of (texts, urls) batches, yielding each batch's results in order.
+
+        Up to ``window`` batches (two per worker by default) are in
+        flight, so workers stay busy while the caller reads input and
+        writes output. Failed documents come back as exceptions in place.
+        """
+        if self.in_process:
+            for texts, urls in batches:
+                yield self.local.analyze_batch_sync(texts, urls, return_exceptions=True)
+            return
+
+        self.start()
+        window = window or 2 * self.workers
+        pending: deque = deque()
+
+        def collect() -> List[Any]:
+            lookups, todo, future = pending.popleft()
+            return self._merge(lookups, todo, future.result())
+
+        for texts, urls in batches:
+            lookups = self._lookup(texts, urls)
+            todo = self._misses(lookups)
+            future = self._executor.submit(_analyze_chunk, [texts[i] for i in todo], [urls[i] for i in todo])
+            pending.append((lookups, todo, future))
+            if len(pending) >= window:
+                yield collect()
+        while pending:
+            yield collect()
+
+    def _front(self) -> Optional[TruthLensAnalyzer]:
+        """Parent analyzer whose cache or near-duplicate index sits in front of the workers, if any."""
+        local = self.local
+        if local is not None and (local.cache is not None or local.near_duplicates is not None):
+            return local
+        return None
+
+    def _lookup(self, texts: List[str], urls: List[Optional[str]]) -> List[Optional[Lookup]]:
+        """Parent-side lookups (None where there is no front or the text can't be looked up)."""
+        front = self._front()
+        lookups: List[Optional[Lookup]] = [None] * len(texts)
+        if front is not None:
+            for i, (text, url) in enumerate(zip(texts, urls)):
+                try:
+                    lookups[i] = front.lookup(text, url)
+                except Exception:
+                    # Analyzed by a worker, which reports the error in place
+                    pass
+        return lookups
+
+    @staticmethod
+    def _misses(lookups: List[Optional[Lookup]]) -> List[int]:
+        return [i for i, lookup in enumerate(lookups) if lookup is None or lookup.result is None]
+
+    def _merge(self, lookups: List[Optional[Lookup]], todo: List[int], analyzed: List[Any]) -> List[Any]:
+        """Reused and worker results in input order; new results are remembered by the front."""
+        results = [lookup.result if lookup is not None else None for lookup in lookups]
+        front = self._front()
+        for i, result in zip(todo, analyzed):
+            if lookups[i] is not None and isinstance(result, AnalysisResult):
+                result = front.remember(lookups[i], result)
+            results[i] = result
+        return results
+
+    async def analyze(self, text: str, url: Optional[str] = None) -> AnalysisResult:
+        """Async wrapper around analyze_sync()."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.analyze_sync, text, url)
+
+    async def analyze_batch(self, texts: List[str], urls: Optional[List[Optional[str]]] = None,
+                            return_exceptions: bool = False) -> List[Any]:
+        """Async wrapper around analyze_batch_sync()."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.analyze_batch_sync, texts, urls, return_exceptions
+        )
+
+    def shutdown(self, wait: bool = True):
+        """Stop worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._ready = False
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,123 @@
+"""
+TruthLens - Model Registry
+==========================
+Lazy, memory-mapped loading of trained model artifacts
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadedModel:
+    """A trained classifier with its feature extractor"""
+    name: str
+    model: Any
+    vectorizer: Any
+    load_time_ms: float
+
+
+class ModelRegistry:
+    """
+    Registry of trained models written by ``src/models/train.py``.
+
+    Artifacts are loaded on first use, or ahead of time with warm_up().
+    Arrays are memory-mapped read-only (``mmap_mode='r'``) so worker
+    processes on one host share the same page-cache pages instead of
+    each holding a private copy. Missing artifacts are not an error: the
+    model is marked ``unavailable`` and the analyzer keeps its heuristics.
+
+    States: idle -> loading -> ready | unavailable | failed
+    """
+
+    # name -> (model file, vectorizer file)
+    MODELS = {
+        'baseline': ('baseline_model.pkl', 'vectorizer.pkl'),
+    }
+
+    def __init__(self, model_dir: str = "models", mmap: bool = True):
+        self.model_dir = model_dir
+        self.mmap = mmap
+        self._lock = threading.Lock()
+        self._models: Dict[str, LoadedModel] = {}
+        self._states: Dict[str, str] = {name: "idle" for name in self.MODELS}
+        self._errors: Dict[str, str] = {}
+
+    @classmethod
+    def from_env(cls) -> "ModelRegistry":
+        """Create a registry configured from environment variables."""
+        return cls(model_dir=os.getenv("TRUTHLENS_MODEL_DIR", "models"))
+
+    @property
+    def ready(self) -> bool:
+        """True once every model has finished loading (or is known missing)."""
+        return all(state not in ("idle", "loading") for state in self._states.values())
+
+    def get(self, name: str = "baseline") -> Optional[LoadedModel]:
+        """Return a loaded model, loading it on first use."""
+        model = self._models.get(name)
+        if model is not None or self._states.get(name) != "idle":
+            return model
+        return self._load(name)
+
+    def warm_up(self, names: Optional[List[str]] = None):
+        """Load the given models (all by default) before traffic arrives."""
+        for name in names or list(self.MODELS):
+            self.get(name)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model state and load time for health reporting."""
+        report = {}
+        for name, state in self._states.items():
+            entry: Dict[str, Any] = {"state": state}
+            if name in self._models:
+                entry["load_time_ms"] = round(self._models[name].load_time_ms, 1)
+            if name in self._errors:
+                entry["error"] = self._errors[name]
+            report[name] = entry
+        return report
+
+    def _load(self, name: str) -> Optional[LoadedModel]:
+        with self._lock:
+            if self._states[name] != "idle":
+                return self._models.get(name)
+
+            model_file, vectorizer_file = self.MODELS[name]
+            model_path = os.path.join(self.model_dir, model_file)
+            vectorizer_path = os.path.join(self.model_dir, vectorizer_file)
+            if not (os.path.exists(model_path) and os.path.exists(vectorizer_path)):
+                logger.info(f"Model '{name}' not found in {self.model_dir}, using heuristics")
+                self._states[name] = "unavailable"
+                return None
+
+            self._states[name] = "loading"
+            start = time.perf_counter()
+            try:
+                import joblib
+
+                mmap_mode = 'r' if self.mmap else None
+                loaded = LoadedModel(
+                    name=name,
+                    model=joblib.load(model_path, mmap_mode=mmap_mode),
+                    vectorizer=joblib.load(vectorizer_path, mmap_mode=mmap_mode),
+                    load_time_ms=(time.perf_counter() - start) * 1000
+                )
+            except Exception as e:
+                logger.error(f"Failed to load model '{name}': {e}")
+                self._states[name] = "failed"
+                self._errors[name] = str(e)
+                return None
+
+            self._models[name] = loaded
+            self._states[name] = "ready"
+            logger.info(f"Loaded model '{name}' in {loaded.load_time_ms:.1f}ms")
+            return loaded
@@ -0,0 +1,160 @@
+"""
+TruthLens - Lexicon Scanner
+===========================
+Precompiled single-pass scanner shared by all analyzer detectors
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, Optional, Pattern, Set, Union
+
+from src.ml.tokenizer import DEFAULT_TOKENIZER, Tokenizer, Tokens
+
+
+@dataclass
+class ScanResult:
+    """Lexicon hits and pattern matches for one document"""
+    tokens: Optional[Tokens] = None
+    hits: Dict[str, Set[str]] = field(default_factory=dict)
+
+    def count(self, category: str) -> int:
+        """Number of distinct hits in a category."""
+        return len(self.hits.get(category, ()))
+
+    def matched(self, category: str) -> bool:
+        """Whether a category has at least one hit."""
+        return bool(self.hits.get(category))
+
+
+class LexiconScanner:
+    """
+    Compiled scanner for all analyzer lexicons.
+
+    Documents are normalized and tokenized once by the tokenizer. Lexicon
+    words are matched against whole tokens with set intersections, so
+    "breaking" no longer fires inside "heartbreaking" and "good," counts
+    as "good". Multi-word terms and regex patterns are compiled into one
+    alternation regex per category, run over the normalized text. Keeping
+    categories apart means a phrase is never swallowed by an overlapping
+    match from another category.
+
+    Args:
+        terms: category -> words or phrases, matched as whole words
+        patterns: category -> regular expressions
+        token_sets: category -> words matched against whole tokens
+        tokenizer: Normalization and tokenization scheme
+    """
+
+    def __init__(self, terms: Optional[Dict[str, Iterable[str]]] = None,
+                 patterns: Optional[Dict[str, Iterable[str]]] = None,
+                 token_sets: Optional[Dict[str, Iterable[str]]] = None,
+                 tokenizer: Optional[Tokenizer] = None):
+        self.tokenizer = tokenizer or DEFAULT_TOKENIZER
+        self.categories = []
+        self._words: Dict[str, FrozenSet[str]] = {}
+        self._regexes: Dict[str, Pattern[str]] = {}
+
+        for category, words in {**(terms or {}), **(token_sets or {})}.items():
+            single, phrases = set(), set()
+            for word in words:
+                normalized = self.tokenizer.normalize(word)
+                if self.tokenizer.words(normalized) == [normalized]:
+                    single.add(normalized)
+                else:
+                    phrases.add(normalized)
+            self._words[category] = frozenset(single)
+            if phrases:
+                # Longest first so overlapping phrases prefer the fuller match
+                escaped = [re.escape(p) for p in sorted(phrases, key=len, reverse=True)]
+                self._regexes[category] = re.compile(f"(?<!\\w)(?:{'|'.join(escaped)})(?!\\w)")
+            self.categories.append(category)
+
+        for category, regexes in (patterns or {}).items():
+            regexes = list(regexes)
+            if regexes:
+                self._regexes[category] = re.compile('|'.join(f'(?:{p})' for p in regexes))
+                self.categories.append(category)
+
+    def scan(self, text: Union[str, Tokens]) -> ScanResult:
+        """Scan a document (text, or Tokens from the same tokenizer) once for every category."""
+        tokens = text if isinstance(text, Tokens) else self.tokenizer.tokenize(text)
+        hits: Dict[str, Set[str]] = {category: set() for category in self.categories}
+
+        if self._words:
+            present = tokens.set
+            for category, words in self._words.items():
+                hits[category] = set(present & words)
+
+        for category, regex in self._regexes.items():
+            hits[category].update(match.group() for match in regex.finditer(tokens.text))
+
+        return ScanResult(tokens=tokens, hits=hits)
+
+    def stream(self, overlap: int = 256) -> "StreamingScan":
+        """Start an incremental scan over text arriving in pieces."""
+        return StreamingScan(self, overlap)
+
+
+class StreamingScan:
+    """
+    Incremental scan with bounded memory.
+
+    Text is fed in pieces; only the last ``overlap`` characters are kept
+    between pieces so matches crossing a boundary are still found. Matches
+    touching the end of the buffer are deferred until more text arrives,
+    which also keeps ``$``-anchored patterns from firing at piece ends.
+    Hits are sets, so anything seen twice in the overlap counts once.
+    """
+
+    # Tokens longer than this are never lexicon words; don't carry them
+    MAX_TOKEN_LENGTH = 1024
+
+    def __init__(self, scanner: LexiconScanner, overlap: int = 256):
+        self._scanner = scanner
+        self._overlap = overlap
+        self._carry = ""
+        self._hits: Dict[str, Set[str]] = {category: set() for category in scanner.categories}
+        self.chars_seen = 0
+
+    def feed(self, text: str):
+        """Scan the next piece of (preprocessed) text."""
+        if not text:
+            return
+        self.chars_seen += len(text)
+        buffer = self._carry + self._scanner.tokenizer.normalize(text)
+        self._scan(buffer)
+        self._carry = buffer[self._token_start(buffer, len(buffer) - self._overlap):]
+
+    def result(self) -> ScanResult:
+        """Hits so far, including matches still held in the overlap."""
+        hits = {category: set(found) for category, found in self._hits.items()}
+        if self._carry:
+            tail = self._scanner.scan(self._scanner.tokenizer.tokenize(self._carry, normalized=True))
+            for category, found in tail.hits.items():
+                hits[category] |= found
+        return ScanResult(hits=hits)
+
+    def _token_start(self, buffer: str, position: int) -> int:
+        """Move position back to the start of its token, within limits."""
+        if position <= 0:
+            return 0
+        start = buffer.rfind(' ', 0, position) + 1
+        return start if position - start <= self.MAX_TOKEN_LENGTH else position
+
+    def _scan(self, buffer: str):
+        end = len(buffer)
+        for category, regex in self._scanner._regexes.items():
+            found = self._hits[category]
+            for match in regex.finditer(buffer):
+                if match.end() < end:
+                    found.add(match.group())
+
+        # Only whole tokens: the last one may continue in the next piece
+        complete = buffer[:buffer.rfind(' ') + 1]
+        if complete and self._scanner._words:
+            tokens = set(self._scanner.tokenizer.words(complete))
+            for category, words in self._scanner._words.items():
+                self._hits[category] |= tokens & words
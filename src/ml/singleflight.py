@@ -0,0 +1,73 @@
+"""
+TruthLens - Single-Flight
+=========================
+Coalesces concurrent identical computations into one
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    """One shared computation and the number of callers awaiting it"""
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time.
+
+    The first caller for a key starts ``fn()``. Callers arriving with the
+    same key while it runs await that computation instead of starting
+    their own (counted in ``saved``). Once it finishes the key is
+    forgotten, so results and errors are never reused by later calls;
+    the result cache does that.
+
+    - Errors: every caller of the flight gets the exception.
+    - Cancellation: a cancelled caller leaves without affecting the
+      others. When the last caller leaves, the computation is cancelled
+      and the next call for the key starts a fresh one.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.saved = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Keys with a computation running."""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return fn()'s result, sharing it with concurrent callers of key."""
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.executed += 1
+        else:
+            self.saved += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Nobody wants the result any more
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,286 @@
+"""
+TruthLens - Source Index
+========================
+Suffix-aware source credibility lookups backed by the sources table
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import csv
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Key holding a node's credibility score; never a valid DNS label
+_SCORE = ""
+
+# (domain, credibility score, updated_at)
+SourceRow = Tuple[str, float, Any]
+
+_SQL_COLUMNS = "SELECT domain, credibility_score, updated_at FROM sources"
+
+
+def _labels(domain: str) -> list:
+    # Empty labels ("a..b", "example.com.") would collide with the _SCORE key
+    return [label for label in domain.strip().lower().split('.') if label]
+
+
+def _is_sqlite_file(location: str) -> bool:
+    return location.startswith("sqlite:///") or location.endswith((".db", ".sqlite", ".sqlite3"))
+
+
+def load_source_rows(location: str, since: Any = None) -> Iterator[SourceRow]:
+    """
+    Stream source rows from a database URL, SQLite file or CSV file.
+
+    CSV files need ``domain`` and ``credibility_score`` columns. With
+    ``since`` only rows updated after it are returned.
+    """
+    if location.endswith(".csv"):
+        with open(location, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                updated_at = row.get("updated_at") or None
+                if since is None or (updated_at is not None and updated_at > since):
+                    yield row["domain"], float(row["credibility_score"]), updated_at
+        return
+
+    where = " WHERE updated_at > ?" if since is not None else ""
+    if _is_sqlite_file(location):
+        path = location[len("sqlite:///"):] if location.startswith("sqlite:///") else location
+        conn = sqlite3.connect(path)
+        try:
+            cursor = conn.execute(_SQL_COLUMNS + where, () if since is None else (since,))
+            while True:
+                rows = cursor.fetchmany(10_000)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+        return
+
+    # Anything else is a SQLAlchemy URL (PostgreSQL in production)
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(location)
+    try:
+        with engine.connect() as conn:
+            query = text(_SQL_COLUMNS + where.replace("?", ":since"))
+            result = conn.execution_options(stream_results=True, yield_per=10_000).execute(
+                query, {} if since is None else {"since": since}
+            )
+            for domain, score, updated_at in result:
+                yield domain, float(score), updated_at
+    finally:
+        engine.dispose()
+
+
+class SourceIndex:
+    """
+    Domain -> credibility lookups by longest registered suffix.
+
+    Domains are stored in a trie keyed by reversed labels
+    (``uk -> co -> bbc``), so ``edition.bbc.co.uk`` and ``www.bbc.co.uk``
+    both resolve to ``bbc.co.uk`` in one walk over their labels. Nodes
+    are plain dicts with interned labels, which keeps hundreds of
+    thousands of domains small since TLD and second-level labels are
+    shared.
+
+    The trie is never modified once published. A full load builds a new
+    one; an incremental refresh copies only the nodes on the paths of
+    changed rows. Either way the new root replaces the old one in a
+    single assignment, so lookups never wait on a refresh.
+
+    Args:
+        location: Database URL, SQLite file or CSV file (None = defaults only)
+        defaults: Built-in domain -> score entries, overridden by loaded rows
+        refresh_seconds: Background refresh interval (0 = no refresh)
+        full_reload_every: Refreshes between full reloads, which pick up
+            deleted rows that an incremental refresh cannot see
+    """
+
+    def __init__(self, location: Optional[str] = None,
+                 defaults: Optional[Dict[str, float]] = None,
+                 refresh_seconds: float = 300.0, full_reload_every: int = 12):
+        self.location = location
+        self.defaults = dict(defaults or {})
+        self.refresh_seconds = refresh_seconds
+        self.full_reload_every = max(1, full_reload_every)
+        self._root: dict = {}
+        self._size = 0
+        self._watermark: Any = None
+        self._refreshes = 0
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._publish(*self._build(self.defaults.items()))
+
+    @classmethod
+    def from_env(cls, defaults: Optional[Dict[str, float]] = None) -> "SourceIndex":
+        """Create an index configured from environment variables."""
+        return cls(
+            location=os.getenv("TRUTHLENS_SOURCES_URL") or os.getenv("DATABASE_URL") or None,
+            defaults=defaults,
+            refresh_seconds=float(os.getenv("TRUTHLENS_SOURCES_REFRESH", "300"))
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    def lookup(self, domain: str) -> Optional[Tuple[str, float]]:
+        """Return (registered domain, score) for the longest matching suffix."""
+        labels = _labels(domain)
+        node = self._root
+        match = None
+        for i in range(len(labels) - 1, -1, -1):
+            node = node.get(labels[i])
+            if node is None:
+                break
+            score = node.get(_SCORE)
+            if score is not None:
+                match = (i, score)
+        if match is None:
+            return None
+        return '.'.join(labels[match[0]:]), match[1]
+
+    def load(self):
+        """Fully rebuild the index from the configured location."""
+        if not self.location:
+            return
+        with self._load_lock, self._keep_watermark_on_error():
+            rows = self._track(load_source_rows(self.location))
+            root, size = self._build(self.defaults.items(), rows)
+            self._publish(root, size)
+            logger.info(f"Loaded {size} sources from {self._describe()}")
+
+    def refresh(self) -> int:
+        """Apply rows changed since the last load; returns how many changed."""
+        if not self.location:
+            return 0
+        self._refreshes += 1
+        if self._watermark is None or self._refreshes % self.full_reload_every == 0:
+            self.load()
+            return self._size
+        with self._load_lock, self._keep_watermark_on_error():
+            changed = list(self._track(load_source_rows(self.location, since=self._watermark)))
+            if changed:
+                root, size = self._apply(changed)
+                self._publish(root, size)
+            return len(changed)
+
+    def with_defaults(self, defaults: Dict[str, float]) -> "SourceIndex":
+        """
+        New index over the same location with other built-in entries, loaded.
+
+        This index is left untouched, so the caller can publish the new
+        one together with whatever it belongs to (see ConfigStore.load).
+        """
+        index = SourceIndex(self.location, defaults, self.refresh_seconds, self.full_reload_every)
+        index.load()
+        return index
+
+    def warm_up(self):
+        """Load sources before traffic arrives and start background refresh."""
+        try:
+            self.load()
+        except Exception as e:
+            logger.warning(f"Source index load failed, using built-in sources: {e}")
+        self.start_refresh()
+
+    @property
+    def refreshing(self) -> bool:
+        """Whether the background refresh thread is running."""
+        return self._thread is not None and not self._stop.is_set()
+
+    def start_refresh(self):
+        """Start the background refresh thread (once; no-op without a location)."""
+        if not self.location or self.refresh_seconds <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._refresh_loop, name="source-index", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop background refresh."""
+        self._stop.set()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Source index refresh failed: {e}")
+
+    @contextmanager
+    def _keep_watermark_on_error(self):
+        """A failed load must not skip rows on the next incremental refresh."""
+        watermark = self._watermark
+        try:
+            yield
+        except BaseException:
+            self._watermark = watermark
+            raise
+
+    def _track(self, rows: Iterable[SourceRow]) -> Iterator[Tuple[str, float]]:
+        """Yield (domain, score) pairs, advancing the updated_at watermark."""
+        for domain, score, updated_at in rows:
+            if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+                self._watermark = updated_at
+            yield domain, score
+
+    def _build(self, *sources: Iterable[Tuple[str, float]]) -> Tuple[dict, int]:
+        root: dict = {}
+        size = 0
+        intern = sys.intern
+        for entries in sources:
+            for domain, score in entries:
+                labels = _labels(domain)
+                if not labels:
+                    continue
+                node = root
+                for label in reversed(labels):
+                    node = node.setdefault(intern(label), {})
+                if _SCORE not in node:
+                    size += 1
+                node[_SCORE] = float(score)
+        return root, size
+
+    def _apply(self, rows: Iterable[Tuple[str, float]]) -> Tuple[dict, int]:
+        """Copy-on-write update: only nodes on changed paths are copied, once each."""
+        root = dict(self._root)
+        copied = {id(root)}
+        size = self._size
+        for domain, score in rows:
+            labels = _labels(domain)
+            if not labels:
+                continue
+            node = root
+            for label in reversed(labels):
+                child = node.get(label)
+                if child is None:
+                    child = {}
+                elif id(child) not in copied:
+                    child = dict(child)
+                else:
+                    node = child
+                    continue
+                copied.add(id(child))
+                node[sys.intern(label)] = child
+                node = child
+            if _SCORE not in node:
+                size += 1
+            node[_SCORE] = float(score)
+        return root, size
+
+    def _publish(self, root: dict, size: int):
+        self._root, self._size = root, size
+
+    def _describe(self) -> str:
+        # Don't log credentials from database URLs
+        return self.location.rsplit('@', 1)[-1]
@@ -0,0 +1,203 @@
+"""
+TruthLens - Streaming Analysis
+==============================
+Incremental analysis of long documents with bounded memory
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import codecs
+import re
+import time
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Union
+
+if TYPE_CHECKING:
+    from src.ml.analyzer import AnalysisResult, TruthLensAnalyzer
+
+# Characters of normalized text kept for the trained model
+MODEL_SAMPLE_CHARS = 100_000
+
+# Read size for file-like sources
+READ_SIZE = 64 * 1024
+
+# Normalized characters held back to detect the language before scanning
+LANGUAGE_SAMPLE_CHARS = 2_000
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class WhitespaceNormalizer:
+    """
+    Chunked equivalent of TruthLensAnalyzer._preprocess.
+
+    Joining the output of feed() for every chunk gives exactly
+    ``_preprocess(''.join(chunks))``, even when a whitespace run is split
+    across chunks.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._pending_space = False
+
+    def feed(self, chunk: str) -> str:
+        """Normalize the next chunk."""
+        text = _WHITESPACE.sub(' ', chunk)
+        if not text.strip():
+            self._pending_space = self._pending_space or bool(text)
+            return ""
+
+        if text[0] == ' ':
+            self._pending_space = True
+            text = text[1:]
+        trailing = text[-1] == ' '
+        if trailing:
+            text = text[:-1]
+
+        if self._started and self._pending_space:
+            text = ' ' + text
+        self._started = True
+        self._pending_space = trailing
+        return text
+
+
+class AnalysisStream:
+    """
+    Streaming analysis session for one document.
+
+    Chunks are normalized and scanned as they arrive; only the scanner
+    overlap and a bounded head sample for the trained model are kept, so
+    memory does not grow with the document. Scanning starts once the
+    first LANGUAGE_SAMPLE_CHARS characters have fixed the language and
+    its lexicon pack. snapshot() gives a partial result at any point and
+    finish() the final one.
+
+    Args:
+        analyzer: Analyzer whose lexicons, detectors and scorer are used
+        url: Optional source URL
+        model_chars: Size of the head sample scored by the trained model
+    """
+
+    def __init__(self, analyzer: "TruthLensAnalyzer", url: Optional[str] = None,
+                 model_chars: int = MODEL_SAMPLE_CHARS):
+        self.analyzer = analyzer
+        self.url = url
+        self.model_chars = model_chars
+        self.chunks = 0
+        self.language: Optional[str] = None
+        # Config snapshot for the whole document
+        self.config = analyzer.config
+        self._normalizer = WhitespaceNormalizer()
+        self._scan = None
+        self._head = []
+        self._head_len = 0
+        self._sample_parts = []
+        self._sample_len = 0
+        self._elapsed_ms = 0.0
+
+    @property
+    def chars(self) -> int:
+        """Normalized characters processed so far."""
+        return self._head_len if self._scan is None else self._scan.chars_seen
+
+    @property
+    def sample(self) -> str:
+        """Normalized head of the text (up to model_chars), as scored by the trained model."""
+        return ''.join(self._sample_parts)
+
+    def feed(self, chunk: str):
+        """Process the next chunk of text."""
+        start = time.perf_counter()
+        text = self._normalizer.feed(chunk)
+        if text:
+            if self._scan is not None:
+                self._scan.feed(text)
+            else:
+                self._head.append(text)
+                self._head_len += len(text)
+                if self._head_len >= LANGUAGE_SAMPLE_CHARS:
+                    self._start_scan()
+            if self._sample_len < self.model_chars:
+                piece = text[:self.model_chars - self._sample_len]
+                self._sample_parts.append(piece)
+                self._sample_len += len(piece)
+        self.chunks += 1
+        self._elapsed_ms += (time.perf_counter() - start) * 1000
+
+    def snapshot(self) -> "AnalysisResult":
+        """Result for the text seen so far (doesn't change the final result)."""
+        analyzer = self.analyzer
+        start = time.perf_counter()
+        if self._scan is not None:
+            language, scan = self.language, self._scan.result()
+        else:
+            # Too early to fix the language: judge the head so far without committing to it
+            tokens = analyzer.tokenizer.tokenize(''.join(self._head))
+            language = analyzer.language_detector.detect(tokens)
+            scan = self.config.lexicons.scanner(language).scan(tokens)
+        sample = self.sample
+        signals = analyzer._signals_from_scan(
+            0, sample, scan, self.url, {}, None, start, config=self.config
+        )
+        signals.language = language
+        score = analyzer.scorer.score_batch([sample], [signals.heuristic_score],
+                                            model_weight=self.config.weights.model_weight)[0]
+        signals.elapsed_ms += self._elapsed_ms
+        return analyzer._build_result(signals, score)
+
+    def finish(self) -> "AnalysisResult":
+        """Final result once the whole document has been fed."""
+        if self._scan is None:
+            self._start_scan()
+        return self.snapshot()
+
+    def _start_scan(self):
+        """Detect the language from the held-back head and scan it."""
+        analyzer = self.analyzer
+        head = ''.join(self._head)
+        self.language = analyzer.language_detector.detect(analyzer.tokenizer.tokenize(head))
+        self._scan = self.config.lexicons.scanner(self.language).stream()
+        self._scan.feed(head)
+        self._head = []
+
+
+def iter_text_chunks(source: Union[Iterable, object], read_size: int = READ_SIZE) -> Iterator[str]:
+    """
+    Yield text chunks from an iterable of str/bytes or a file-like object.
+
+    Bytes are decoded as UTF-8 incrementally, so multi-byte characters
+    split across chunks are handled.
+    """
+    if hasattr(source, "read"):
+        reader = source
+        source = iter(lambda: reader.read(read_size), reader.read(0))
+
+    decoder = None
+    for chunk in source:
+        if isinstance(chunk, (bytes, bytearray)):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            chunk = decoder.decode(chunk)
+        if chunk:
+            yield chunk
+    if decoder is not None:
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def iter_stream_results(analyzer: "TruthLensAnalyzer", source: Union[Iterable, object],
+                        url: Optional[str] = None,
+                        partial_every: int = 0) -> Iterator["AnalysisResult"]:
+    """
+    Analyze a streamed document, yielding partial results along the way.
+
+    A partial result is yielded after every ``partial_every`` chunks
+    (never when 0); the last item is always the final result.
+    """
+    stream = analyzer.open_stream(url)
+    for chunk in iter_text_chunks(source):
+        stream.feed(chunk)
+        if partial_every and stream.chunks % partial_every == 0:
+            yield stream.snapshot()
+    yield stream.finish()
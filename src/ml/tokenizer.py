@@ -0,0 +1,134 @@
+"""
+TruthLens - Tokenizer
+=====================
+Unicode normalization and word tokenization shared by all detectors
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import re
+import unicodedata
+from array import array
+from typing import FrozenSet, Iterator, List, Optional, Tuple
+
+# Apostrophe look-alikes folded to ASCII ' so "п’ять", "пʼять" and "don’t"
+# tokenize like "п'ять" and "don't"
+_APOSTROPHES = re.compile('[‘’ʻʼ′´`]')
+
+# Letters and digits, with apostrophes allowed inside a word. Underscore
+# is a \w character but not part of any word we look up.
+WORD_PATTERN = r"[^\W_]+(?:'[^\W_]+)*"
+
+
+class Tokens:
+    """
+    Normalized text of one document and its word tokens.
+
+    ``words`` are in document order. Offsets index into ``text`` (the
+    normalized text) and are computed on first use, since most detectors
+    only need the words or the word set.
+    """
+    __slots__ = ('text', 'words', '_regex', '_set', '_starts', '_ends')
+
+    def __init__(self, text: str, words: List[str], regex: "re.Pattern"):
+        self.text = text
+        self.words = words
+        self._regex = regex
+        self._set: Optional[FrozenSet[str]] = None
+        self._starts: Optional[array] = None
+        self._ends: Optional[array] = None
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.words)
+
+    def __getitem__(self, index: int) -> str:
+        return self.words[index]
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.set
+
+    @property
+    def set(self) -> FrozenSet[str]:
+        """Distinct words."""
+        if self._set is None:
+            self._set = frozenset(self.words)
+        return self._set
+
+    @property
+    def starts(self) -> array:
+        """Start offset of each token in ``text``."""
+        if self._starts is None:
+            self._locate()
+        return self._starts
+
+    @property
+    def ends(self) -> array:
+        """End offset (exclusive) of each token in ``text``."""
+        if self._ends is None:
+            self._locate()
+        return self._ends
+
+    def span(self, index: int) -> Tuple[int, int]:
+        return self.starts[index], self.ends[index]
+
+    def spans(self) -> Iterator[Tuple[str, int, int]]:
+        """(word, start, end) for every token."""
+        return zip(self.words, self.starts, self.ends)
+
+    def _locate(self):
+        starts, ends = array('L'), array('L')
+        for match in self._regex.finditer(self.text):
+            starts.append(match.start())
+            ends.append(match.end())
+        self._starts, self._ends = starts, ends
+
+
+class Tokenizer:
+    """
+    Normalizer and word tokenizer for English and Ukrainian text.
+
+    normalize() applies NFKC (full-width forms, ligatures, composed
+    Cyrillic), folds apostrophe variants and case-folds; pure ASCII
+    input skips straight to lower(), which is equivalent there.
+    tokenize() then extracts words once per document, splitting on
+    punctuation so "good," and "Good!" both give "good".
+
+    Subclass and override ``pattern`` or normalize() to plug in a
+    different scheme; the scanner and detectors only see Tokens.
+    """
+
+    pattern = WORD_PATTERN
+
+    def __init__(self):
+        self._regex = re.compile(self.pattern)
+
+    def normalize(self, text: str) -> str:
+        if text.isascii():
+            return text.lower().replace('`', "'")
+        # Before NFKC, which turns the acute accent into a space + combining mark
+        text = _APOSTROPHES.sub("'", text)
+        if not unicodedata.is_normalized('NFKC', text):
+            text = unicodedata.normalize('NFKC', text)
+        return text.casefold()
+
+    def words(self, normalized: str) -> List[str]:
+        """Words of already normalized text."""
+        return self._regex.findall(normalized)
+
+    def tokenize(self, text: str, normalized: bool = False) -> Tokens:
+        """Normalize (unless already ``normalized``) and tokenize a document."""
+        if not normalized:
+            text = self.normalize(text)
+        return Tokens(text, self._regex.findall(text), self._regex)
+
+
+DEFAULT_TOKENIZER = Tokenizer()
+
+
+def tokenize(text: str) -> Tokens:
+    """Tokenize with the default tokenizer."""
+    return DEFAULT_TOKENIZER.tokenize(text)
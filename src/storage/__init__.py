@@ -0,0 +1 @@
+"""TruthLens Storage Module"""
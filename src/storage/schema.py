@@ -0,0 +1,93 @@
+"""
+TruthLens - Database Schema
+===========================
+SQLAlchemy Core tables mirroring scripts/init-db.sql
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import uuid
+
+from sqlalchemy import (
+    JSON, BigInteger, Boolean, Column, Date, DateTime, Float, ForeignKey,
+    Integer, MetaData, String, Table, Text, UniqueConstraint, Uuid, func,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+metadata = MetaData()
+
+# JSONB on PostgreSQL, plain JSON on SQLite test databases
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+users = Table(
+    "users", metadata,
+    Column("id", Uuid, primary_key=True, default=uuid.uuid4),
+    Column("telegram_id", BigInteger, unique=True),
+    Column("email", String(255), unique=True),
+    Column("username", String(100)),
+    Column("password_hash", String(255)),
+    Column("plan", String(50), server_default="free"),
+    Column("language", String(10), server_default="en"),
+    Column("created_at", DateTime(timezone=True), server_default=func.current_timestamp()),
+    Column("updated_at", DateTime(timezone=True), server_default=func.current_timestamp()),
+)
+
+analyses = Table(
+    "analyses", metadata,
+    Column("id", Uuid, primary_key=True, default=uuid.uuid4),
+    Column("user_id", Uuid, ForeignKey("users.id", ondelete="CASCADE")),
+    Column("text_content", Text, nullable=False),
+    Column("url", String(2048)),
+    Column("credibility_score", Integer, nullable=False),
+    Column("verdict", String(50), nullable=False),
+    Column("sentiment", String(50)),
+    Column("sentiment_score", Float),
+    Column("bias_level", String(50)),
+    Column("bias_score", Float),
+    Column("manipulation_score", Float),
+    Column("source_credibility", Float),
+    Column("source_name", String(255)),
+    Column("key_findings", JSONType, server_default="[]"),
+    Column("recommendations", JSONType, server_default="[]"),
+    Column("manipulative_techniques", JSONType, server_default="[]"),
+    Column("processing_time_ms", Integer),
+    Column("created_at", DateTime(timezone=True), server_default=func.current_timestamp()),
+)
+
+sources = Table(
+    "sources", metadata,
+    Column("id", Uuid, primary_key=True, default=uuid.uuid4),
+    Column("domain", String(255), unique=True, nullable=False),
+    Column("name", String(255)),
+    Column("credibility_score", Float, nullable=False),
+    Column("category", String(100)),
+    Column("country", String(100)),
+    Column("language", String(10)),
+    Column("is_verified", Boolean, server_default="false"),
+    Column("created_at", DateTime(timezone=True), server_default=func.current_timestamp()),
+    Column("updated_at", DateTime(timezone=True), server_default=func.current_timestamp()),
+)
+
+trends = Table(
+    "trends", metadata,
+    Column("id", Uuid, primary_key=True, default=uuid.uuid4),
+    Column("topic", String(255), nullable=False),
+    Column("category", String(100)),
+    Column("count", Integer, server_default="0"),
+    Column("average_credibility", Float),
+    Column("date", Date, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.current_timestamp()),
+    # Upsert target of TrendRollup.flush()
+    UniqueConstraint("date", "category", "topic", name="uq_trends_date_category_topic"),
+)
+
+feedback = Table(
+    "feedback", metadata,
+    Column("id", Uuid, primary_key=True, default=uuid.uuid4),
+    Column("analysis_id", Uuid, ForeignKey("analyses.id", ondelete="CASCADE")),
+    Column("user_id", Uuid, ForeignKey("users.id", ondelete="CASCADE")),
+    Column("is_correct", Boolean),
+    Column("comment", Text),
+    Column("created_at", DateTime(timezone=True), server_default=func.current_timestamp()),
+)
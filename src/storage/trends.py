@@ -0,0 +1,322 @@
+"""
+TruthLens - Trends Rollup
+=========================
+Incremental per-day aggregates of analyses for the trends table
+
+Usage:
+    python -m src.storage.trends --backfill            # rebuild from analyses
+    python -m src.storage.trends --backfill --since 2024-01-01
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import argparse
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from src.ml.analyzer import AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+# trends.category values; trends.topic holds the verdict / source / "all"
+TOTAL = "total"
+VERDICT = "verdict"
+SOURCE = "source"
+
+# (day, category, topic)
+TrendKey = Tuple[date, str, str]
+
+
+class TrendRollup:
+    """
+    Running per-day counters and credibility averages.
+
+    Every recorded analysis bumps three counters for its day: the
+    overall total, its verdict and its source (``category`` total /
+    verdict / source in the ``trends`` table). Each counter keeps a count
+    and a score sum, so averages are exact and updates are O(1).
+
+    Totals stay in memory for the last ``retention_days`` and answer
+    snapshot() without touching the database. Changes since the last
+    flush are kept separately as deltas. flush() upserts them on the
+    unique (date, category, topic) key with ``count = count + delta``,
+    so several processes can roll up into the same table; read() answers
+    from the table plus this process's unflushed deltas, so every
+    process sees the same totals.
+
+    Args:
+        retention_days: Days of totals kept in memory
+    """
+
+    def __init__(self, retention_days: int = 30):
+        self.retention_days = max(1, retention_days)
+        self._lock = threading.Lock()
+        # key -> [count, score sum]
+        self._totals: Dict[TrendKey, List[float]] = {}
+        self._deltas: Dict[TrendKey, List[float]] = {}
+        self._oldest: Optional[date] = None
+
+    def record(self, verdict: str, credibility_score: float, source: Optional[str] = None,
+               day: Optional[date] = None):
+        """Count one analysis."""
+        day = day or datetime.now(timezone.utc).date()
+        keys = [(day, TOTAL, "all"), (day, VERDICT, verdict)]
+        if source:
+            keys.append((day, SOURCE, source))
+        with self._lock:
+            for key in keys:
+                for table in (self._totals, self._deltas):
+                    counter = table.get(key)
+                    if counter is None:
+                        table[key] = [1, credibility_score]
+                    else:
+                        counter[0] += 1
+                        counter[1] += credibility_score
+            if self._oldest is None or day < self._oldest:
+                self._oldest = day
+            self._prune(day)
+
+    def record_result(self, result: "AnalysisResult", created_at: Optional[datetime] = None):
+        """Count an AnalysisResult."""
+        day = (created_at or datetime.now(timezone.utc)).date()
+        self.record(result.verdict, result.credibility_score, result.source_name, day)
+
+    def snapshot(self, days: int = 7, today: Optional[date] = None,
+                 top_sources: int = 10) -> Dict[str, Any]:
+        """Aggregates for the last ``days`` days, computed from this process's in-memory totals."""
+        today = today or datetime.now(timezone.utc).date()
+        first = today - timedelta(days=max(1, days) - 1)
+        with self._lock:
+            items = [(key, list(value)) for key, value in self._totals.items() if key[0] >= first]
+        return self._aggregate(items, today, top_sources)
+
+    def read(self, engine, days: int = 7, today: Optional[date] = None,
+             top_sources: int = 10) -> Dict[str, Any]:
+        """Aggregates for the last ``days`` days from the trends table plus unflushed deltas."""
+        from sqlalchemy import select
+
+        from src.storage.schema import trends
+
+        today = today or datetime.now(timezone.utc).date()
+        first = today - timedelta(days=max(1, days) - 1)
+        with self._lock:
+            pending = {key: list(value) for key, value in self._deltas.items() if first <= key[0] <= today}
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(trends.c.date, trends.c.category, trends.c.topic,
+                       trends.c.count, trends.c.average_credibility)
+                .where(trends.c.date >= first, trends.c.date <= today)
+            ).all()
+        for day, category, topic, count, average in rows:
+            if not count:
+                continue
+            counter = pending.setdefault((_as_date(day), category, topic), [0, 0.0])
+            counter[0] += count
+            counter[1] += (average or 0.0) * count
+        return self._aggregate(list(pending.items()), today, top_sources)
+
+    @staticmethod
+    def _aggregate(items: List[Tuple[TrendKey, List[float]]], today: date,
+                   top_sources: int) -> Dict[str, Any]:
+        per_day: Dict[date, Dict[str, Any]] = {}
+        verdicts: Dict[str, int] = {}
+        sources: Dict[str, List[float]] = {}
+        for (day, category, topic), (count, total) in items:
+            if day > today:
+                continue
+            entry = per_day.setdefault(day, {"date": day.isoformat(), "total": 0,
+                                             "average_credibility": None, "verdicts": {}})
+            if category == TOTAL:
+                entry["total"] = int(count)
+                entry["average_credibility"] = round(total / count, 2)
+            elif category == VERDICT:
+                entry["verdicts"][topic] = int(count)
+                verdicts[topic] = verdicts.get(topic, 0) + int(count)
+            else:
+                counter = sources.setdefault(topic, [0, 0.0])
+                counter[0] += count
+                counter[1] += total
+
+        ranked = sorted(sources.items(), key=lambda item: item[1][0], reverse=True)[:top_sources]
+        return {
+            "days": [per_day[day] for day in sorted(per_day)],
+            "verdicts": verdicts,
+            "top_sources": [
+                {"source": source, "count": int(count), "average_credibility": round(total / count, 2)}
+                for source, (count, total) in ranked
+            ],
+        }
+
+    def flush(self, engine) -> int:
+        """Apply pending deltas to the trends table in one transaction; returns rows touched."""
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+        if not deltas:
+            return 0
+        try:
+            with engine.begin() as conn:
+                self._apply_deltas(conn, deltas)
+        except Exception:
+            self._restore(deltas)
+            raise
+        return len(deltas)
+
+    @staticmethod
+    def _apply_deltas(conn, deltas: Dict[TrendKey, List[float]]):
+        from src.storage.schema import trends
+
+        if conn.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif conn.dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise NotImplementedError(f"Trends upsert is not supported on {conn.dialect.name}")
+
+        # One atomic upsert per key, so concurrent writers never insert the same row twice
+        statement = insert(trends)
+        new = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[trends.c.date, trends.c.category, trends.c.topic],
+            set_={
+                # Weighted merge of the stored average with this delta
+                "average_credibility": (
+                    trends.c.average_credibility * trends.c.count
+                    + new.average_credibility * new.count
+                ) / (trends.c.count + new.count),
+                "count": trends.c.count + new.count,
+            },
+        )
+        conn.execute(statement, [
+            {"date": day, "category": category, "topic": topic,
+             "count": int(count), "average_credibility": total / count}
+            for (day, category, topic), (count, total) in deltas.items()
+        ])
+
+    def load(self, engine, today: Optional[date] = None):
+        """Seed in-memory totals from the trends table."""
+        from sqlalchemy import select
+
+        from src.storage.schema import trends
+
+        today = today or datetime.now(timezone.utc).date()
+        first = today - timedelta(days=self.retention_days - 1)
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(trends.c.date, trends.c.category, trends.c.topic,
+                       trends.c.count, trends.c.average_credibility)
+                .where(trends.c.date >= first)
+            ).all()
+        with self._lock:
+            for day, category, topic, count, average in rows:
+                if not count:
+                    continue
+                counter = self._totals.setdefault((day, category, topic), [0, 0.0])
+                counter[0] += count
+                counter[1] += (average or 0.0) * count
+                if self._oldest is None or day < self._oldest:
+                    self._oldest = day
+
+    def backfill(self, engine, since: Optional[date] = None) -> int:
+        """
+        Rebuild trends rows from the analyses history.
+
+        Existing rows from ``since`` on (everything by default) are
+        replaced in one transaction; the aggregation runs in the
+        database. Returns the number of rows written.
+        """
+        with engine.begin() as conn:
+            return self._backfill(conn, since)
+
+    def _backfill(self, conn, since: Optional[date]) -> int:
+        from sqlalchemy import delete, func, literal, select
+
+        from src.storage.schema import analyses, trends
+
+        day = func.date(analyses.c.created_at)
+        queries = [
+            (TOTAL, literal("all")),
+            (VERDICT, analyses.c.verdict),
+            (SOURCE, analyses.c.source_name),
+        ]
+        cleared = delete(trends)
+        if since is not None:
+            cleared = cleared.where(trends.c.date >= since)
+        conn.execute(cleared)
+
+        written = 0
+        for category, topic in queries:
+            query = (
+                select(day.label("day"), topic.label("topic"),
+                       func.count().label("count"),
+                       func.avg(analyses.c.credibility_score).label("average"))
+                .group_by(day, topic)
+            )
+            if category == SOURCE:
+                query = query.where(analyses.c.source_name.isnot(None))
+            if since is not None:
+                query = query.where(analyses.c.created_at >= datetime.combine(since, datetime.min.time()))
+            rows = [
+                {"date": _as_date(row.day), "category": category, "topic": row.topic,
+                 "count": row.count, "average_credibility": float(row.average)}
+                for row in conn.execute(query)
+            ]
+            if rows:
+                conn.execute(trends.insert(), rows)
+                written += len(rows)
+        return written
+
+    def _restore(self, deltas: Dict[TrendKey, List[float]]):
+        """Put unflushed deltas back after a failed flush."""
+        with self._lock:
+            for key, (count, total) in deltas.items():
+                counter = self._deltas.setdefault(key, [0, 0.0])
+                counter[0] += count
+                counter[1] += total
+
+    def _prune(self, today: date):
+        cutoff = today - timedelta(days=self.retention_days - 1)
+        if self._oldest is None or self._oldest >= cutoff:
+            return
+        for key in [key for key in self._totals if key[0] < cutoff]:
+            del self._totals[key]
+        self._oldest = min((key[0] for key in self._totals), default=None)
+
+
+def _as_date(value: Any) -> date:
+    # SQLite returns date() as text
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="TruthLens trends rollup")
+    parser.add_argument("--backfill", action="store_true", help="rebuild trends from analyses")
+    parser.add_argument("--since", type=date.fromisoformat, help="only rebuild from this date")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    args = parser.parse_args(argv)
+
+    if not args.backfill:
+        parser.print_help()
+        return 0
+    if not args.database_url:
+        parser.error("DATABASE_URL is not set")
+
+    from sqlalchemy import create_engine
+
+    engine = create_engine(args.database_url)
+    written = TrendRollup().backfill(engine, since=args.since)
+    engine.dispose()
+    print(f"Wrote {written} trend rows")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
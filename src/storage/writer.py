@@ -0,0 +1,276 @@
+"""
+TruthLens - Analysis Writer
+===========================
+Batched, non-blocking persistence of analysis results
+
+Author: 102012dl
+Email: 102012dl@gmail.com
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional
+
+from src.storage.trends import TrendRollup
+
+if TYPE_CHECKING:
+    from src.ml.analyzer import AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest")
+
+
+@dataclass
+class WriterStats:
+    """Persistence counters"""
+    queued: int = 0
+    written: int = 0
+    dropped: int = 0
+    failed: int = 0
+    flushes: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+def analysis_row(result: "AnalysisResult", text: str, url: Optional[str] = None,
+                 user_id: Optional[Any] = None,
+                 created_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """Map a result onto an ``analyses`` table row."""
+    return {
+        "user_id": user_id,
+        "text_content": text,
+        "url": url,
+        "credibility_score": result.credibility_score,
+        "verdict": result.verdict,
+        "sentiment": result.sentiment.value,
+        "sentiment_score": result.sentiment_score,
+        "bias_level": result.bias_level,
+        "bias_score": result.bias_score,
+        "manipulation_score": result.manipulation_score,
+        "source_credibility": result.source_credibility,
+        "source_name": result.source_name,
+        "key_findings": list(result.key_findings),
+        "recommendations": list(result.recommendations),
+        "manipulative_techniques": [t.value for t in result.manipulative_techniques],
+        "processing_time_ms": result.processing_time_ms,
+        "created_at": created_at or datetime.now(timezone.utc),
+    }
+
+
+class AnalysisWriter:
+    """
+    Writes analysis results to the ``analyses`` table in the background.
+
+    submit() only appends a row to a bounded in-memory queue, so request
+    latency never depends on the database. A writer task flushes the
+    queue with one multi-row INSERT per batch whenever ``batch_size``
+    rows are waiting or ``flush_interval`` seconds have passed. The
+    blocking insert runs in a thread on a pooled SQLAlchemy engine.
+
+    When the queue is full, ``drop_oldest`` evicts the oldest pending
+    row and ``drop_newest`` rejects the new one; either way the row is
+    counted in ``stats().dropped``. A batch whose insert fails is
+    logged, counted as failed and discarded.
+
+    With a ``rollup`` every submitted result is also counted in the
+    trends rollup (even without a database), whose deltas are written
+    to ``trends`` every ``trends_interval`` seconds.
+
+    Args:
+        url: SQLAlchemy database URL (None disables persistence)
+        max_queue: Maximum rows waiting to be written
+        batch_size: Rows per INSERT and size trigger for a flush
+        flush_interval: Seconds between time-triggered flushes
+        overflow: "drop_oldest" or "drop_newest"
+        create_schema: Create missing tables on start (SQLite/tests)
+        rollup: Trends rollup fed by submit()
+        trends_interval: Seconds between trends flushes
+    """
+
+    def __init__(self, url: Optional[str], max_queue: int = 10_000, batch_size: int = 500,
+                 flush_interval: float = 1.0, overflow: str = "drop_oldest",
+                 create_schema: bool = False, rollup: Optional[TrendRollup] = None,
+                 trends_interval: float = 10.0):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        self.url = url
+        self.max_queue = max(1, max_queue)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.create_schema = create_schema
+        self.rollup = rollup
+        self.trends_interval = trends_interval
+        self._trends_flushed = time.monotonic()
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._stats = WriterStats()
+        self._engine = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_env(cls) -> "AnalysisWriter":
+        """Create a writer configured from environment variables."""
+        enabled = os.getenv("TRUTHLENS_PERSIST", "1") == "1"
+        return cls(
+            url=os.getenv("DATABASE_URL") if enabled else None,
+            max_queue=int(os.getenv("TRUTHLENS_PERSIST_QUEUE", "10000")),
+            batch_size=int(os.getenv("TRUTHLENS_PERSIST_BATCH", "500")),
+            flush_interval=float(os.getenv("TRUTHLENS_PERSIST_INTERVAL", "1.0")),
+            overflow=os.getenv("TRUTHLENS_PERSIST_OVERFLOW", "drop_oldest"),
+            rollup=TrendRollup(),
+            trends_interval=float(os.getenv("TRUTHLENS_TRENDS_INTERVAL", "10")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    def stats(self) -> WriterStats:
+        with self._lock:
+            return WriterStats(**{**asdict(self._stats), "queued": len(self._queue)})
+
+    def trends(self, days: int = 7) -> Dict[str, Any]:
+        """Trends aggregates: the shared table plus local deltas, or local totals without a database."""
+        if self._engine is not None and self.enabled:
+            return self.rollup.read(self._engine, days)
+        return self.rollup.snapshot(days)
+
+    def submit(self, result: "AnalysisResult", text: str, url: Optional[str] = None,
+               user_id: Optional[Any] = None) -> bool:
+        """Queue a result for writing; False if it was dropped or persistence is off."""
+        created_at = datetime.now(timezone.utc)
+        if self.rollup is not None:
+            self.rollup.record_result(result, created_at)
+        if not self.enabled:
+            return False
+        row = analysis_row(result, text, url, user_id, created_at)
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                self._stats.dropped += 1
+                if self.overflow == "drop_newest":
+                    return False
+                self._queue.popleft()
+            self._queue.append(row)
+            full = len(self._queue) >= self.batch_size
+        if full:
+            self._wake_writer()
+        return True
+
+    async def start(self):
+        """Connect and start the background writer task."""
+        if not self.enabled or self._task is not None:
+            return
+        try:
+            await asyncio.to_thread(self._connect)
+        except Exception as e:
+            # Queueing rows nobody will write only wastes memory
+            logger.error(f"Persistence disabled, database unavailable: {e}")
+            self.url = None
+            return
+        if self.rollup is not None:
+            try:
+                await asyncio.to_thread(self.rollup.load, self._engine)
+            except Exception as e:
+                logger.warning(f"Could not load trends: {e}")
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush whatever is queued and stop the writer."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+        await self.flush_trends()
+        await asyncio.to_thread(self._engine.dispose)
+
+    async def flush(self):
+        """Write every queued row now."""
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            await asyncio.to_thread(self._write, batch)
+
+    async def flush_trends(self):
+        """Write pending trends deltas now."""
+        self._trends_flushed = time.monotonic()
+        if self.rollup is None or self._engine is None:
+            return
+        try:
+            await asyncio.to_thread(self.rollup.flush, self._engine)
+        except Exception as e:
+            # Deltas stay pending and are retried on the next flush
+            logger.error(f"Failed to update trends: {e}")
+
+    def _connect(self):
+        from sqlalchemy import create_engine
+
+        from src.storage.schema import metadata
+
+        self._engine = create_engine(self.url, pool_pre_ping=True)
+        if self.create_schema:
+            metadata.create_all(self._engine)
+
+    def _wake_writer(self):
+        if self._wake is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wake.set()
+        else:
+            # Submitted from a worker thread
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+            if time.monotonic() - self._trends_flushed >= self.trends_interval:
+                await self.flush_trends()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            count = min(self.batch_size, len(self._queue))
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        from src.storage.schema import analyses
+
+        try:
+            # executemany of one INSERT; SQLAlchemy batches it into
+            # multi-row VALUES statements on PostgreSQL and SQLite
+            with self._engine.begin() as conn:
+                conn.execute(analyses.insert(), batch)
+        except Exception as e:
+            logger.error(f"Failed to persist {len(batch)} analyses: {e}")
+            with self._lock:
+                self._stats.failed += len(batch)
+            return
+        with self._lock:
+            self._stats.written += len(batch)
+            self._stats.flushes += 1
@@ -6,8 +6,10 @@ import time
 
 # Config
 API_URL = "http://api:8000/api/v1/analyze" # Docker service name
+TRENDS_URL = "http://api:8000/api/v1/trends"
 # Fallback for local run
 # API_URL = "http://localhost:8000/api/v1/analyze"
+# TRENDS_URL = "http://localhost:8000/api/v1/trends"
 
 st.set_page_config(page_title="TruthLens AI", page_icon="🛡️", layout="wide")
 
@@ -57,13 +59,32 @@ with col1:
 
 with col2:
     st.subheader("📊 Жива статистика")
-    # Mock chart
-    df = pd.DataFrame({
-        "Category": ["Fake", "Real", "Biased", "Satire"],
-        "Count": [45, 30, 15, 10]
-    })
-    fig = px.donut(df, values="Count", names="Category", hole=0.4)
+    # Pre-aggregated rollup from the API (constant time, no scan of analyses)
+    trends = None
+    try:
+        res = requests.get(TRENDS_URL, params={"days": 7}, timeout=2)
+        if res.status_code == 200:
+            trends = res.json()
+    except:
+        pass
+    
+    if trends and trends["verdicts"]:
+        df = pd.DataFrame({
+            "Category": list(trends["verdicts"]),
+            "Count": list(trends["verdicts"].values())
+        })
+    else:
+        # Mock chart when the API is unreachable or has no data yet
+        df = pd.DataFrame({
+            "Category": ["Fake", "Real", "Biased", "Satire"],
+            "Count": [45, 30, 15, 10]
+        })
+    fig = px.pie(df, values="Count", names="Category", hole=0.4)
     st.plotly_chart(fig, use_container_width=True)
     
+    if trends and trends["days"]:
+        daily = pd.DataFrame(trends["days"])
+        st.line_chart(daily.set_index("date")[["total", "average_credibility"]])
+    
     st.info("💡 **ML Engine:** DistilBERT Fine-tuned on ISOT Dataset (44k articles).")
 
@@ -124,6 +124,63 @@ class TestTruthLensAnalyzer:
         
         assert result.processing_time_ms >= 0
     
+    @pytest.mark.asyncio
+    async def test_analyze_batch(self, analyzer):
+        """Test batch analysis keeps input order and matches single analysis."""
+        texts = [
+            "Great news! Excellent progress has been made.",
+            "Terrible disaster caused massive problems."
+        ]
+        
+        results = await analyzer.analyze_batch(
+            texts, urls=["https://www.reuters.com/a", None]
+        )
+        
+        assert [r.sentiment for r in results] == [Sentiment.POSITIVE, Sentiment.NEGATIVE]
+        assert results[0].source_credibility > 0.8
+        assert results[1].source_credibility is None
+    
+    @pytest.mark.asyncio
+    async def test_analyze_batch_return_exceptions(self, analyzer):
+        """Test per-item errors are returned in place."""
+        results = await analyzer.analyze_batch(
+            ["Valid text here", None], return_exceptions=True
+        )
+        
+        assert isinstance(results[0], AnalysisResult)
+        assert isinstance(results[1], Exception)
+    
+    def test_stage_timings_disabled_by_default(self, analyzer):
+        """Test results carry no stage timings unless instrumented."""
+        result = analyzer.analyze_sync("Plain sentence about the local weather today.")
+        
+        assert result.stage_timings_ms is None
+    
+    def test_stage_timings_when_instrumented(self):
+        """Test every pipeline stage is timed when instrumentation is on."""
+        analyzer = create_analyzer(instrument=True)
+        result = analyzer.analyze_sync(
+            "SHOCKING news revealed today!!!", url="https://www.reuters.com/a"
+        )
+        
+        assert set(result.stage_timings_ms) == {
+            'preprocess', 'tokenize', 'language', 'scan', 'sentiment', 'bias', 'manipulation',
+            'source', 'heuristic', 'scoring', 'report'
+        }
+        assert all(ms >= 0 for ms in result.stage_timings_ms.values())
+    
+    def test_stage_timings_on_cache_hit(self):
+        """Test cache hits report their own timings without touching the cached result."""
+        from src.ml.cache import ResultCache
+        
+        analyzer = create_analyzer(cache=ResultCache(), instrument=True)
+        first = analyzer.analyze_sync("Some repeated sentence for the cache test.")
+        second = analyzer.analyze_sync("Some repeated sentence for the cache test.")
+        
+        assert 'scan' in first.stage_timings_ms
+        assert set(second.stage_timings_ms) == {'preprocess', 'cache'}
+        assert second.credibility_score == first.credibility_score
+    
     def test_preprocess_text(self, analyzer):
         """Test text preprocessing."""
         text = "  Multiple   spaces    and\n\nnewlines  "
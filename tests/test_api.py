@@ -1,5 +1,10 @@
+import asyncio
+import json
+import time
 from fastapi.testclient import TestClient
-from src.api.main import app
+import src.api.main as api_main
+from src.api.executor import ExecutorBusyError
+from src.api.main import app, MAX_BATCH_SIZE
 
 client = TestClient(app)
 
@@ -9,9 +14,19 @@ def test_health_check():
     assert response.json()["status"] == "active"
 
 def test_health_endpoint():
-    response = client.get("/health")
+    # Entering the client runs startup, which warms models up in the background
+    with TestClient(app) as started:
+        deadline = time.monotonic() + 10
+        response = started.get("/health")
+        while response.status_code == 503 and time.monotonic() < deadline:
+            assert response.json()["status"] == "starting"
+            time.sleep(0.05)
+            response = started.get("/health")
     assert response.status_code == 200
-    assert response.json() == {"status": "ok"}
+    data = response.json()
+    assert data["status"] == "ok"
+    assert data["ready"] is True
+    assert "baseline" in data["models"]
 
 def test_analyze_valid():
     payload = {"text": "Breaking news about aliens landing in New York City today."}
@@ -27,3 +42,134 @@ def test_analyze_valid():
 def test_analyze_empty():
     response = client.post("/api/v1/analyze", json={})
     assert response.status_code == 422
+
+def test_analyze_batch():
+    payload = {"items": [
+        {"text": "Breaking news about aliens landing in New York City today."},
+        {"text": "short"},
+        {"text": "SHOCKING!!! You won't believe this miracle cure!", "url": "https://infowars.com/x"}
+    ]}
+    response = client.post("/api/v1/analyze/batch", json=payload)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert [r["status"] for r in results] == ["ok", "error", "ok"]
+    assert results[2]["result"]["label"] in ["FAKE", "REAL"]
+
+def test_analyze_batch_stream():
+    payload = {"stream": True, "items": [
+        {"text": "Breaking news about aliens landing in New York City today."},
+        {"text": "Scientists published a peer-reviewed study in Nature."}
+    ]}
+    response = client.post("/api/v1/analyze/batch", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == [0, 1]
+    assert all(line["status"] == "ok" for line in lines)
+
+def test_analyze_batch_too_large():
+    payload = {"items": [{"text": "Some text long enough"}] * (MAX_BATCH_SIZE + 1)}
+    response = client.post("/api/v1/analyze/batch", json=payload)
+    assert response.status_code == 422
+
+def test_analyze_busy_returns_429(monkeypatch):
+    async def busy(*args, **kwargs):
+        raise ExecutorBusyError("full")
+    monkeypatch.setattr(api_main.executor, "run", busy)
+    payload = {"text": "Breaking news about aliens landing in New York City today."}
+    response = client.post("/api/v1/analyze", json=payload)
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+def test_cache_stats():
+    response = client.get("/api/v1/cache/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert {"hits", "misses", "evictions", "size", "hit_rate"} <= set(data)
+
+def test_analyze_stream(monkeypatch):
+    submitted = []
+    monkeypatch.setattr(api_main.persistence, "submit",
+                        lambda result, text, url=None: submitted.append((text, url)))
+    def body():
+        yield b"SHOCKING!!! You won't believe "
+        yield b"this miracle cure! Scientists EXPOSED!"
+    response = client.post("/api/v1/analyze/stream?url=https://example.org/a", content=body())
+    assert response.status_code == 200
+    data = response.json()
+    assert data["chars"] > 0
+    assert data["label"] in ["FAKE", "REAL"]
+    # Persisted like /api/v1/analyze, with the stream's head sample as the text
+    assert submitted == [("SHOCKING!!! You won't believe this miracle cure! Scientists EXPOSED!",
+                          "https://example.org/a")]
+
+def test_analyze_stream_partial():
+    def body():
+        for _ in range(4):
+            yield "Calm opening sentence about the weather. ".encode()
+    response = client.post("/api/v1/analyze/stream?partial_every=1", content=body())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    # One partial line per received body chunk, then the final result
+    assert [line["final"] for line in lines] == [False] * (len(lines) - 1) + [True]
+    assert "result" in lines[-1]
+
+async def test_analyze_stream_partials_sent_while_reading():
+    """A partial line reaches the client before the rest of the body is sent."""
+    chunks = ["Calm opening sentence about the weather. ".encode()] * 3
+    line_sent = asyncio.Event()
+    sent = []
+
+    async def receive():
+        if len(chunks) < 3:
+            # Only send more body once a partial result has arrived
+            await line_sent.wait()
+        if chunks:
+            chunk = chunks.pop()
+            return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+        if message["type"] == "http.response.body" and message.get("body"):
+            line_sent.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/api/v1/analyze/stream", "raw_path": b"/api/v1/analyze/stream",
+        "query_string": b"partial_every=1", "root_path": "", "headers": [(b"host", b"test")],
+        "client": ("test", 1), "server": ("test", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), timeout=10)
+
+    assert sent[0]["status"] == 200
+    lines = [json.loads(line) for m in sent if m["type"] == "http.response.body"
+             for line in m.get("body", b"").decode().splitlines()]
+    assert [line["final"] for line in lines] == [False, False, False, True]
+
+def test_analyze_stream_too_short():
+    response = client.post("/api/v1/analyze/stream", content=b"short")
+    assert response.status_code == 422
+
+def test_metrics_endpoint():
+    client.post("/api/v1/analyze", json={"text": "Some ordinary text to count in metrics."})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE truthlens_http_request_duration_seconds histogram" in body
+    assert 'truthlens_http_requests_total{method="POST",path="/api/v1/analyze",status="200"}' in body
+    assert "truthlens_http_requests_in_flight" in body
+    assert "truthlens_cache_hits_total" in body
+    assert "truthlens_documents_analyzed_total" in body
+
+def test_trends_endpoint():
+    client.post("/api/v1/analyze", json={"text": "Some ordinary text to count in trends."})
+    response = client.get("/api/v1/trends?days=7")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["days"][-1]["total"] >= 1
+    assert sum(data["verdicts"].values()) >= 1
+    assert client.get("/api/v1/trends?days=0").status_code == 422
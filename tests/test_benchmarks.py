@@ -0,0 +1,45 @@
+"""
+TruthLens - Benchmark Suite Tests
+=================================
+Author: 102012dl
+"""
+
+from benchmarks.factindex import bench_fact_index
+from benchmarks.run import compare, percentile, run_suite
+
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([], 50) == 0.0
+
+
+def test_compare_flags_regressions():
+    baseline = {"a": {"p50_ms": 1.0, "docs_per_sec": 100.0},
+                "tiny": {"p50_ms": 0.001, "docs_per_sec": 1e6}}
+    current = {"a": {"p50_ms": 1.5, "docs_per_sec": 60.0},
+               "tiny": {"p50_ms": 0.005, "docs_per_sec": 2e5}}
+
+    regressions = compare(current, baseline, tolerance=0.25)
+
+    assert len(regressions) == 2
+    assert all(line.startswith("a:") for line in regressions)
+    assert compare(current, baseline, tolerance=1.0) == []
+
+
+def test_quick_suite_reports_all_stages():
+    report = run_suite(quick=True, include_api=False)
+
+    for name in ("stage.preprocess", "stage.tokenize", "stage.scan", "stage.sentiment", "stage.bias",
+                 "stage.manipulation", "stage.source", "analyze.100kb", "batch.1kb"):
+        assert name in report
+    assert {"p50_ms", "p95_ms", "p99_ms", "docs_per_sec", "peak_rss_mb"} <= set(report["analyze.1kb"])
+
+
+def test_fact_index_benchmark_small():
+    report = bench_fact_index(2_000, queries=50, nprobes=[4])
+
+    assert report["build"]["claims"] == 2_000
+    assert {"p50_ms", "p99_ms", "recall_at_1"} <= set(report["query.nprobe4"])
+    assert report["query.nprobe4"]["recall_at_1"] > 0.5
@@ -0,0 +1,233 @@
+"""
+TruthLens - Telegram Bot Tests
+==============================
+Author: 102012dl
+"""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from aiogram.types import Message
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.bot import main as bot_main
+from src.bot.sender import OutboundQueue
+
+TOKEN = "123456:TEST-token"
+
+
+class RetryAfter(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Too Many Requests")
+        self.retry_after = retry_after
+
+
+class FakeTelegram:
+    """Minimal Bot API server recording every call"""
+
+    def __init__(self):
+        self.calls = []
+        self._message_id = 100
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(f"/bot{TOKEN}/{{method}}", self.handle)
+        return app
+
+    async def handle(self, request):
+        method = request.match_info["method"]
+        payload = dict(await request.post())
+        self.calls.append((method, payload))
+        if method in ("sendMessage", "editMessageText"):
+            if method == "sendMessage":
+                self._message_id += 1
+            result = {
+                "message_id": int(payload.get("message_id", self._message_id)),
+                "date": int(time.time()),
+                "chat": {"id": int(payload["chat_id"]), "type": "private"},
+                "text": payload["text"],
+            }
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    def methods(self):
+        return [method for method, _ in self.calls]
+
+
+def text_update(update_id: int, chat_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Test"},
+            "text": text,
+        },
+    }
+
+
+async def wait_for(condition, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+class TestOutboundQueue:
+    """Test suite for rate-limited outbound sends"""
+
+    async def test_results_and_order(self):
+        """Test calls to one chat go out in order and resolve their futures."""
+        queue = OutboundQueue(per_second=1000, per_chat_per_second=1000)
+        sent = []
+
+        async def call(n):
+            sent.append(n)
+            return n
+
+        futures = [queue.send(1, lambda n=n: call(n)) for n in range(5)]
+        assert await asyncio.gather(*futures) == list(range(5))
+        assert sent == list(range(5))
+        await queue.stop()
+
+    async def test_per_chat_pacing(self):
+        """Test a chat past its burst waits while other chats don't."""
+        queue = OutboundQueue(per_second=1000, per_chat_per_second=5, chat_burst=1)
+        done = {}
+
+        async def call(key):
+            done[key] = time.monotonic()
+
+        start = time.monotonic()
+        busy = [queue.send("busy", lambda n=n: call(("busy", n))) for n in range(3)]
+        other = queue.send("other", lambda: call(("other", 0)))
+        await asyncio.gather(*busy, other)
+        # 3 sends at 5/s with no burst: the last one waits about 0.4s
+        assert done[("busy", 2)] - start >= 0.35
+        assert done[("other", 0)] - start < 0.2
+        await queue.stop()
+
+    async def test_retry_after(self):
+        """Test a 429 pauses sends and retries the call."""
+        queue = OutboundQueue(per_second=1000, per_chat_per_second=1000)
+        attempts = []
+
+        async def flaky():
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise RetryAfter(0.2)
+            return "ok"
+
+        assert await queue.send(1, flaky) == "ok"
+        assert attempts[1] - attempts[0] >= 0.15
+        await queue.stop()
+
+    async def test_failure_propagates(self):
+        """Test other errors fail the future without stopping the queue."""
+        queue = OutboundQueue(per_second=1000, per_chat_per_second=1000)
+
+        async def broken():
+            raise ValueError("bad request")
+
+        async def fine():
+            return 1
+
+        with pytest.raises(ValueError):
+            await queue.send(1, broken)
+        assert await queue.send(1, fine) == 1
+        await queue.stop()
+
+    async def test_queue_bounded(self):
+        """Test send() rejects calls past max_pending."""
+        queue = OutboundQueue(per_second=1, per_chat_per_second=1, chat_burst=1, max_pending=1)
+        blocker = asyncio.Event()
+
+        async def slow():
+            await blocker.wait()
+
+        queue.send(1, slow)
+        await asyncio.sleep(0)  # scheduler hands the first call off
+        queue.send(1, slow)
+        with pytest.raises(asyncio.QueueFull):
+            queue.send(1, slow)
+        blocker.set()
+        await queue.stop()
+
+
+class TestTextHandler:
+    """Test the text handler when replies can't be queued"""
+
+    @pytest.mark.parametrize("text, outcome", [
+        ("SHOCKING!!! Scientists HATE this one weird trick, share before it's deleted!", "error"),
+        ("too short", "too_short"),
+    ])
+    async def test_full_outbound_queue(self, monkeypatch, text, outcome):
+        """Test a full queue is logged and counted instead of crashing the handler."""
+        monkeypatch.setattr(bot_main, "sender", OutboundQueue(max_pending=0))
+        message = Message.model_validate(text_update(3, 43, text)["message"])
+        before = bot_main.messages_handled.value(outcome=outcome)
+
+        await bot_main.handle_text(message)
+
+        assert bot_main.messages_handled.value(outcome=outcome) == before + 1
+
+
+class TestWebhookBot:
+    """Test the bot end to end against a fake Telegram server"""
+
+    @pytest.fixture
+    async def telegram(self, monkeypatch):
+        fake = FakeTelegram()
+        server = TestServer(fake.app())
+        await server.start_server()
+        bot = bot_main.create_bot(TOKEN, str(server.make_url("")).rstrip("/"))
+        sender = OutboundQueue(per_second=1000, per_chat_per_second=1000)
+        monkeypatch.setattr(bot_main, "sender", sender)
+        yield fake, bot
+        await sender.stop()
+        await bot.session.close()
+        await server.close()
+
+    async def test_placeholder_edited_in_place(self, telegram, monkeypatch):
+        """Test a webhook update yields one sendMessage and one edit, no delete."""
+        fake, bot = telegram
+        monkeypatch.setattr(bot_main, "WEBHOOK_SECRET", "s3cret")
+        client = TestClient(TestServer(bot_main.create_webhook_app(bot)))
+        await client.start_server()
+        try:
+            text = "SHOCKING!!! Scientists HATE this one weird trick, share before it's deleted!"
+            response = await client.post(
+                bot_main.WEBHOOK_PATH, json=text_update(1, 42, text),
+                headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"}
+            )
+            assert response.status == 200
+            await wait_for(lambda: "editMessageText" in fake.methods())
+        finally:
+            await client.close()
+
+        assert fake.methods() == ["sendMessage", "editMessageText"]
+        placeholder, result = fake.calls[0][1], fake.calls[1][1]
+        assert "Аналізую" in placeholder["text"]
+        assert result["chat_id"] == "42"
+        assert result["message_id"] == "101"
+        assert "Результат аналізу" in result["text"]
+
+    async def test_webhook_secret_checked(self, telegram, monkeypatch):
+        """Test updates without the secret token are rejected."""
+        fake, bot = telegram
+        monkeypatch.setattr(bot_main, "WEBHOOK_SECRET", "s3cret")
+        client = TestClient(TestServer(bot_main.create_webhook_app(bot)))
+        await client.start_server()
+        try:
+            response = await client.post(bot_main.WEBHOOK_PATH, json=text_update(2, 42, "x" * 30))
+            assert response.status == 401
+        finally:
+            await client.close()
+        assert fake.calls == []
@@ -0,0 +1,127 @@
+"""
+TruthLens - Bot Analysis Service Tests
+======================================
+Author: 102012dl
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.api.executor import BoundedExecutor, ExecutorBusyError
+from src.bot.service import (
+    BotAnalysisService, RateLimitedError, TokenBucket, UserRateLimiter,
+)
+from src.ml.analyzer import create_analyzer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiting:
+    """Test suite for the per-user token buckets"""
+
+    def test_token_bucket_refills(self):
+        """Test burst, exhaustion and refill."""
+        bucket = TokenBucket(rate=1.0, capacity=2, now=0.0)
+        assert bucket.consume(0.0) == 0
+        assert bucket.consume(0.0) == 0
+        assert bucket.consume(0.0) == pytest.approx(1.0)
+        assert bucket.consume(1.0) == 0
+
+    def test_users_are_independent(self):
+        """Test one user's flood does not throttle another."""
+        clock = FakeClock()
+        limiter = UserRateLimiter(per_minute=60, burst=2, clock=clock)
+        assert [limiter.check("spammer") for _ in range(3)][:2] == [0, 0]
+        assert limiter.check("spammer") > 0
+        assert limiter.check("someone") == 0
+        clock.now = 1.0
+        assert limiter.check("spammer") == 0
+
+    def test_bucket_memory_bounded(self):
+        """Test least recently seen users are evicted."""
+        limiter = UserRateLimiter(max_users=2, clock=FakeClock())
+        for user in ("a", "b", "c"):
+            limiter.check(user)
+        assert list(limiter._buckets) == ["b", "c"]
+
+    def test_admit_raises(self):
+        """Test the service reports the retry delay."""
+        service = BotAnalysisService(
+            create_analyzer(), BoundedExecutor(1, 0),
+            UserRateLimiter(per_minute=6, burst=1, clock=FakeClock())
+        )
+        service.admit(1)
+        with pytest.raises(RateLimitedError) as excinfo:
+            service.admit(1)
+        assert excinfo.value.retry_after == pytest.approx(10.0)
+
+
+class TestCoalescing:
+    """Test suite for shared in-flight analyses"""
+
+    @pytest.fixture
+    def gated(self):
+        """Service whose analyses block until released, counting runs."""
+        analyzer = create_analyzer()
+        release = threading.Event()
+        runs = []
+        original = analyzer.analyze_sync
+
+        def slow_analyze(text, url=None):
+            runs.append(text)
+            release.wait(5)
+            return original(text, url)
+
+        analyzer.analyze_sync = slow_analyze
+        service = BotAnalysisService(analyzer, BoundedExecutor(max_workers=2, max_pending=0))
+        yield service, release, runs
+        release.set()
+
+    async def test_identical_texts_share_one_analysis(self, gated):
+        """Test N forwards of one post trigger a single analysis."""
+        service, release, runs = gated
+        text = "Viral post forwarded by many users at once!!!"
+        tasks = [asyncio.create_task(service.analyze(text)) for _ in range(5)]
+        # Whitespace differences still coalesce
+        tasks.append(asyncio.create_task(service.analyze(text.replace(" ", "  "))))
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert len(runs) == 1
+        assert service.coalesced == 5
+        assert len({id(r) for r in results}) == 1
+        assert service.flights.in_flight == 0
+
+    async def test_distinct_texts_bounded(self, gated):
+        """Test the pool rejects work beyond its capacity."""
+        service, release, runs = gated
+        tasks = [asyncio.create_task(service.analyze(f"Distinct message number {i}"))
+                 for i in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert sum(isinstance(r, ExecutorBusyError) for r in results) == 1
+        assert len(runs) == 2
+
+    async def test_cancelled_waiter_does_not_cancel_others(self, gated):
+        """Test one caller giving up leaves the shared analysis running."""
+        service, release, runs = gated
+        text = "Shared text that one impatient caller abandons."
+        first = asyncio.create_task(service.analyze(text))
+        second = asyncio.create_task(service.analyze(text))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        release.set()
+        result = await second
+        assert result.credibility_score >= 0
+        assert len(runs) == 1
@@ -0,0 +1,138 @@
+"""
+TruthLens - Bulk Scoring Tests
+==============================
+Author: 102012dl
+"""
+
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from benchmarks.corpus import make_corpus, make_urls
+from src.ml.analyzer import create_analyzer
+from src.ml.bulk import Checkpoint, iter_records, main, run_bulk
+from src.ml.pool import AnalyzerPool
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = AnalyzerPool(workers=0, local=create_analyzer())
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """A gzipped JSONL corpus of 50 documents."""
+    path = tmp_path / "corpus.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for i, (text, url) in enumerate(zip(make_corpus(50, 300), make_urls(50))):
+            f.write(json.dumps({"id": f"doc-{i}", "text": text, "url": url}) + "\n")
+    return path
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestReaders:
+    """Test suite for corpus readers"""
+
+    def test_gzip_jsonl(self, corpus):
+        """Test gzipped JSONL records come with offsets, ids and urls."""
+        records = list(iter_records(str(corpus)))
+        assert len(records) == 50
+        assert records[3][:2] == (3, "doc-3")
+        assert records[3][3] is not None
+
+    def test_csv_custom_fields(self, tmp_path):
+        """Test CSV input with renamed columns and no id column."""
+        path = tmp_path / "corpus.csv"
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["body", "link"])
+            writer.writerow(["Перша новина, з комою", "https://bbc.com/a"])
+            writer.writerow(["Second story", ""])
+        records = list(iter_records(str(path), text_field="body", url_field="link"))
+        assert records == [(0, 0, "Перша новина, з комою", "https://bbc.com/a"),
+                           (1, 1, "Second story", None)]
+
+    def test_unknown_extension(self, tmp_path):
+        """Test an unrecognised extension asks for an explicit format."""
+        with pytest.raises(ValueError):
+            list(iter_records(str(tmp_path / "corpus.txt")))
+
+
+class TestRunBulk:
+    """Test suite for bulk scoring runs"""
+
+    def test_scores_every_record(self, corpus, tmp_path, pool):
+        """Test one output row per input record, in input order."""
+        output = tmp_path / "scores.jsonl"
+        progress = io.StringIO()
+        stats = run_bulk(str(corpus), str(output), pool, batch_size=8, progress=progress)
+        rows = read_jsonl(output)
+        assert stats.documents == 50
+        assert stats.errors == 0
+        assert [row["id"] for row in rows] == [f"doc-{i}" for i in range(50)]
+        assert all(0 <= row["credibility_score"] <= 100 for row in rows)
+        assert "docs/s" in progress.getvalue()
+        assert Checkpoint.load(f"{output}.checkpoint.json").offset == 50
+
+    def test_resume_matches_full_run(self, corpus, tmp_path, pool):
+        """Test an interrupted then resumed run writes the same rows as one full run."""
+        full = tmp_path / "full.jsonl"
+        run_bulk(str(corpus), str(full), pool, batch_size=8)
+
+        output = tmp_path / "resumed.jsonl"
+        run_bulk(str(corpus), str(output), pool, batch_size=8, checkpoint_every=8, limit=24)
+        # Rows written after the last checkpoint are discarded on resume
+        with open(output, "a", encoding="utf-8") as f:
+            f.write('{"offset": 999, "partial": ')
+        stats = run_bulk(str(corpus), str(output), pool, batch_size=8, resume=True)
+        assert stats.skipped == 24
+        assert stats.documents == 26
+        assert read_jsonl(output) == read_jsonl(full)
+
+    def test_gzip_output(self, corpus, tmp_path, pool):
+        """Test gzip output stays readable across checkpoints."""
+        output = tmp_path / "scores.jsonl.gz"
+        run_bulk(str(corpus), str(output), pool, batch_size=8, checkpoint_every=16)
+        with gzip.open(output, "rt", encoding="utf-8") as f:
+            assert len(f.readlines()) == 50
+
+    def test_parquet_output(self, corpus, tmp_path, pool):
+        """Test Parquet output is written as part files."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        output = tmp_path / "scores.parquet"
+        run_bulk(str(corpus), str(output), pool, batch_size=8, checkpoint_every=16)
+        assert pq.read_table(str(output)).num_rows == 50
+
+    def test_cli(self, corpus, tmp_path, capsys):
+        """Test the command line in-process run with a limit."""
+        output = tmp_path / "scores.jsonl"
+        assert main([str(corpus), str(output), "--workers", "0", "--limit", "10", "--quiet"]) == 0
+        assert json.loads(capsys.readouterr().out)["documents"] == 10
+        assert len(read_jsonl(output)) == 10
+
+
+class TestPoolIterBatches:
+    """Test suite for streaming batches through the analyzer pool"""
+
+    def test_process_pool_keeps_order(self):
+        """Test batches come back in submission order from worker processes."""
+        pool = AnalyzerPool(workers=2, chunk_size=4)
+        try:
+            texts = make_corpus(12, 200)
+            batches = [(texts[i:i + 4], [None] * 4) for i in range(0, 12, 4)]
+            results = list(pool.iter_batches(iter(batches), window=2))
+        finally:
+            pool.shutdown()
+        local = create_analyzer()
+        assert [len(batch) for batch in results] == [4, 4, 4]
+        assert [r.credibility_score for batch in results for r in batch] == \
+            [local.analyze_sync(t).credibility_score for t in texts]
@@ -0,0 +1,93 @@
+"""
+TruthLens - Result Cache Tests
+==============================
+Author: 102012dl
+"""
+
+import pytest
+
+from src.ml.analyzer import AnalysisResult, Sentiment, create_analyzer
+from src.ml.cache import CacheBackend, ResultCache, SQLiteCacheBackend, make_cache_key
+
+
+def make_result(score: int = 50) -> AnalysisResult:
+    return AnalysisResult(
+        credibility_score=score,
+        verdict="uncertain",
+        sentiment=Sentiment.NEUTRAL,
+        sentiment_score=0.0,
+        bias_level="none",
+        bias_score=0.0
+    )
+
+
+class TestResultCache:
+    """Test suite for ResultCache"""
+
+    def test_key_depends_on_all_parts(self):
+        """Text, domain and model version all change the key."""
+        base = make_cache_key("text", "bbc.com", "1.0.0")
+        assert base == make_cache_key("text", "bbc.com", "1.0.0")
+        assert base != make_cache_key("text2", "bbc.com", "1.0.0")
+        assert base != make_cache_key("text", None, "1.0.0")
+        assert base != make_cache_key("text", "bbc.com", "1.0.1")
+
+    def test_lru_eviction(self):
+        """Least recently used entries are evicted first."""
+        cache = ResultCache(max_size=2)
+        cache.set("a", make_result(1))
+        cache.set("b", make_result(2))
+        cache.get("a")
+        cache.set("c", make_result(3))
+
+        assert cache.get("b") is None
+        assert cache.get("a").credibility_score == 1
+        stats = cache.stats()
+        assert stats.evictions == 1
+        assert stats.size == 2
+
+    def test_ttl_expiry(self):
+        """Expired entries count as misses."""
+        cache = ResultCache(ttl_seconds=-1)
+        cache.set("a", make_result())
+
+        assert cache.get("a") is None
+        stats = cache.stats()
+        assert stats.expirations == 1
+        assert stats.misses == 1
+
+    def test_shared_tier(self, tmp_path):
+        """A second cache sees entries stored by the first through SQLite."""
+        path = str(tmp_path / "cache.sqlite3")
+        first = ResultCache(shared=SQLiteCacheBackend(path))
+        second = ResultCache(shared=SQLiteCacheBackend(path))
+        first.set("k", make_result(77))
+
+        result = second.get("k")
+
+        assert result.credibility_score == 77
+        assert result.sentiment == Sentiment.NEUTRAL
+        assert second.stats().shared_hits == 1
+
+    def test_incomplete_backend_rejected(self):
+        """A backend missing a method fails when created, not mid-request."""
+        class GetOnly(CacheBackend):
+            def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            GetOnly()
+
+    @pytest.mark.asyncio
+    async def test_analyzer_uses_cache(self):
+        """Repeated text with different whitespace is served from cache."""
+        analyzer = create_analyzer(cache=ResultCache())
+
+        first = await analyzer.analyze("Great   news about progress", url="https://www.bbc.com/a")
+        second = await analyzer.analyze("Great news about progress ", url="https://bbc.com/b")
+
+        # Stored compacted, so a hit is an equal copy rather than the same object
+        assert second == first
+        stats = analyzer.cache.stats()
+        assert stats.hits == 1
+        assert stats.misses == 1
@@ -0,0 +1,105 @@
+"""
+TruthLens - Compact Result Tests
+================================
+Author: 102012dl
+"""
+
+import json
+import tracemalloc
+
+import pytest
+
+from benchmarks.corpus import make_corpus, make_urls
+from benchmarks.run import serialize_result
+from src.ml.analyzer import AnalysisResult, create_analyzer
+from src.ml.cache import ResultCache
+from src.ml.compact import CompactResult, ResultEncoder
+from src.ml.neardup import NearDuplicateIndex
+
+
+@pytest.fixture(scope="module")
+def results():
+    analyzer = create_analyzer()
+    corpus = make_corpus(40, 1_000)
+    return analyzer.analyze_batch_sync(corpus, make_urls(40))
+
+
+class TestCompactResult:
+    """Test suite for the slotted result type"""
+
+    def test_round_trip(self, results):
+        """Test compacting and expanding gives back an equal result."""
+        for result in results:
+            assert result.compact().to_result() == result
+
+    def test_reads_like_analysis_result(self, results):
+        """Test public attributes decode to the dataclass values."""
+        result = results[0]
+        compacted = result.compact()
+        for name in ("verdict", "sentiment", "bias_level", "bias_types",
+                     "manipulative_techniques", "key_findings", "recommendations",
+                     "credibility_score", "source_name", "scoring_backend"):
+            assert getattr(compacted, name) == getattr(result, name)
+        assert not hasattr(compacted, "__dict__")
+
+    def test_findings_shared(self, results):
+        """Test results with the same findings share one ID tuple."""
+        same = [r.compact() for r in results if r.key_findings == results[0].key_findings]
+        assert len(same) > 1
+        assert all(c._findings is same[0]._findings for c in same)
+
+    def test_smaller_than_dataclass(self, results):
+        """Test many compact results take less memory than the dataclasses."""
+        dicts = [r.to_dict() for r in results] * 25
+
+        def allocated(build):
+            tracemalloc.start()
+            kept = build()
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del kept
+            return size
+
+        full = allocated(lambda: [AnalysisResult.from_dict(d) for d in dicts])
+        compacted = allocated(lambda: [AnalysisResult.from_dict(d).compact() for d in dicts])
+        assert compacted < full * 0.75
+
+    def test_stored_compact(self):
+        """Test the cache and near-duplicate index keep CompactResults and hits expand them."""
+        text = ("Officials confirmed on Tuesday that the regional water supply meets every "
+                "safety standard after independent laboratories tested samples from forty sites.")
+        analyzer = create_analyzer(cache=ResultCache(), near_duplicates=NearDuplicateIndex(threshold=0.7))
+        first = analyzer.analyze_sync(text)
+        key = analyzer.request_key(text)
+        stored = analyzer.cache.get(key)
+        assert type(stored) is CompactResult
+        assert analyzer.near_duplicates.query(analyzer.near_duplicates.signature(text)).result is stored
+
+        again = analyzer.analyze_sync(text)
+        repost = analyzer.analyze_sync("BREAKING: " + text)
+        assert type(again) is AnalysisResult and again == first
+        assert type(repost) is AnalysisResult
+        assert repost.near_duplicate_of == key
+        assert repost.credibility_score == first.credibility_score
+
+
+class TestResultEncoder:
+    """Test suite for the precompiled API encoder"""
+
+    def test_matches_reference_shape(self, results):
+        """Test encoding matches the API's dict shape for both result types."""
+        encoder = ResultEncoder()
+        for result in results:
+            expected = serialize_result(result)
+            assert json.loads(encoder.encode(result)) == expected
+            assert json.loads(encoder.encode(result.compact())) == expected
+
+    def test_score_boundaries(self, results):
+        """Test label and score fragments at the edges of the range."""
+        encoder = ResultEncoder()
+        for score in (0, 49, 50, 100):
+            result = results[0].compact()
+            result.credibility_score = score
+            decoded = json.loads(encoder.encode(result))
+            assert decoded["score"] == round(score / 100, 2)
+            assert decoded["label"] == ("FAKE" if score < 50 else "REAL")
@@ -0,0 +1,201 @@
+"""
+TruthLens - Analyzer Config Tests
+=================================
+Author: 102012dl
+"""
+
+import itertools
+import json
+import os
+import time
+
+import pytest
+
+from src.ml.analyzer import create_analyzer
+from src.ml.cache import ResultCache
+from src.ml.config import ConfigError, ConfigStore
+from src.ml.sources import SourceIndex
+
+SHOUTING = "Sensational BOMBSHELL story, a bombshell for everyone"
+_writes = itertools.count(1)
+
+
+def write_config(path, version, **sections):
+    path.write_text(json.dumps({"version": version, **sections}), encoding="utf-8")
+    # Make every write visible to the mtime/size check, however fast the test runs
+    stamp = time.time() + next(_writes)
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "analyzer.json"
+    write_config(path, "v1")
+    return path
+
+
+class TestConfigStore:
+    """Test suite for loading and swapping config versions"""
+
+    def test_builtin_without_file(self):
+        """Test no config file keeps the plain model version."""
+        store = ConfigStore(model_version="1.0.0")
+
+        assert store.current.version is None
+        assert store.current.model_version == "1.0.0"
+
+    def test_version_in_model_version_and_cache_key(self, config_path):
+        """Test the config version reaches results and cache keys."""
+        plain = create_analyzer()
+        configured = create_analyzer(config=ConfigStore(str(config_path), model_version="1.0.0"))
+
+        result = configured.analyze_sync(SHOUTING)
+
+        assert result.model_version == "1.0.0+v1"
+        assert configured.request_key(SHOUTING) != plain.request_key(SHOUTING)
+
+    def test_swap_keeps_snapshot_and_precompiles(self, config_path):
+        """Test a new version is compiled before it is published; old snapshots are untouched."""
+        store = ConfigStore(str(config_path))
+        old = store.current
+        old.lexicons.scanner("en")
+
+        write_config(config_path, "v2", lexicons={"en": {"terms": {"emotional": ["bombshell"]}}})
+        assert store.refresh() is True
+
+        new = store.current
+        assert new.version == "v2" and old.version == "v1"
+        assert new.lexicons.loaded == ["en"]
+        assert new.lexicons.scanner("en").scan(SHOUTING).hits["emotional"] == {"bombshell"}
+        assert old.lexicons.scanner("en").scan(SHOUTING).hits["emotional"] == set()
+        assert store.refresh() is False
+
+    def test_same_version_ignored(self, config_path):
+        """Test a changed file without a version bump is not swapped in."""
+        store = ConfigStore(str(config_path))
+
+        write_config(config_path, "v1", weights={"base": 10})
+
+        assert store.refresh() is False
+        assert store.current.weights.base == 70
+
+    @pytest.mark.parametrize("sections", [
+        {"lexicons": {"en": {"patterns": {"clickbait": ["(unclosed"]}}}},
+        {"weights": {"unknown_weight": 1}},
+    ])
+    def test_invalid_config_keeps_running_version(self, config_path, sections):
+        """Test a broken config raises and the running version stays."""
+        store = ConfigStore(str(config_path))
+
+        write_config(config_path, "v2", **sections)
+
+        with pytest.raises(Exception):
+            store.refresh()
+        assert store.current.version == "v1"
+
+    def test_sources_swap_with_config(self, config_path, tmp_path):
+        """Test source scores are part of the snapshot: old snapshots keep theirs, refresh moves over."""
+        csv_path = tmp_path / "sources.csv"
+        csv_path.write_text("domain,credibility_score\nreuters.com,0.95\n")
+        index = SourceIndex(str(csv_path), defaults={"example-news.com": 0.6}, refresh_seconds=60)
+        store = ConfigStore(str(config_path), sources=index)
+        index.start_refresh()
+        old = store.current
+
+        write_config(config_path, "v2", sources={"example-news.com": 0.2})
+        store.refresh()
+        new = store.current
+
+        assert old.source_index is index and new.source_index is not index
+        assert old.source_index.lookup("example-news.com") == ("example-news.com", 0.6)
+        assert new.source_index.lookup("example-news.com") == ("example-news.com", 0.2)
+        assert new.source_index.lookup("reuters.com") == ("reuters.com", 0.95)
+        assert store.sources is new.source_index
+        assert not index.refreshing and new.source_index.refreshing
+        new.source_index.close()
+
+    def test_failed_source_index_keeps_running_version(self, config_path, tmp_path):
+        """Test a version whose source index can't load is not activated, and is retried."""
+        csv_path = tmp_path / "sources.csv"
+        csv_path.write_text("domain,credibility_score\nreuters.com,0.95\n")
+        index = SourceIndex(str(csv_path), defaults={"example-news.com": 0.6})
+        store = ConfigStore(str(config_path), sources=index)
+        csv_path.write_text("domain\nbroken.com\n")
+
+        write_config(config_path, "v2", sources={"example-news.com": 0.2})
+
+        assert store.refresh() is False
+        assert store.current.version == "v1" and store.sources is index
+        assert store.swaps == 1
+        csv_path.write_text("domain,credibility_score\nreuters.com,0.95\n")
+        assert store.refresh() is True
+        assert store.current.version == "v2"
+        assert store.sources.lookup("example-news.com") == ("example-news.com", 0.2)
+
+    def test_invalid_config_keeps_sources(self, config_path):
+        """Test a config that fails validation leaves the source scores alone."""
+        index = SourceIndex(defaults={"example-news.com": 0.6})
+        store = ConfigStore(str(config_path), sources=index)
+
+        write_config(config_path, "v2", sources={"example-news.com": 0.2}, weights={"unknown_weight": 1})
+
+        with pytest.raises(ConfigError):
+            store.refresh()
+        assert store.sources is index
+        assert index.lookup("example-news.com") == ("example-news.com", 0.6)
+
+    def test_missing_version(self, tmp_path):
+        """Test a config without a version is rejected."""
+        path = tmp_path / "analyzer.json"
+        path.write_text("{}")
+        store = ConfigStore()
+        store.path = str(path)
+
+        with pytest.raises(ConfigError):
+            store.load()
+
+    def test_background_reload(self, config_path):
+        """Test the refresh thread swaps in a new version."""
+        store = ConfigStore(str(config_path), refresh_seconds=0.02)
+        store.start_refresh()
+        try:
+            write_config(config_path, "v2")
+            deadline = time.monotonic() + 5
+            while store.current.version != "v2" and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            store.close()
+        assert store.current.version == "v2"
+        assert store.swaps == 2
+
+
+class TestConfiguredAnalyzer:
+    """Test suite for analysis under a hot-reloaded config"""
+
+    def test_reload_changes_results_and_cache(self, config_path):
+        """Test lexicons and weights apply after a swap without reusing cached results."""
+        analyzer = create_analyzer(cache=ResultCache(), config=ConfigStore(str(config_path)))
+        before = analyzer.analyze_sync(SHOUTING)
+
+        write_config(config_path, "v2",
+                     lexicons={"en": {"terms": {"emotional": ["bombshell", "sensational"]}}},
+                     weights={"base": 60})
+        analyzer.config_store.refresh()
+        after = analyzer.analyze_sync(SHOUTING)
+
+        assert before.manipulative_techniques == []
+        assert [t.value for t in after.manipulative_techniques] == ["emotional_appeal"]
+        assert after.model_version.endswith("+v2")
+        assert after.credibility_score < before.credibility_score
+
+    def test_sources_from_config(self, config_path):
+        """Test source scores in the config extend the built-in ones."""
+        write_config(config_path, "v2", sources={"example-news.com": 0.2})
+        analyzer = create_analyzer()
+        analyzer.config_store.path = str(config_path)
+        analyzer.config_store.load()
+
+        result = analyzer.analyze_sync("Plain text", url="https://www.example-news.com/a")
+
+        assert result.source_credibility == 0.2
+        assert analyzer.sources.lookup("reuters.com") == ("reuters.com", 0.95)
@@ -0,0 +1,83 @@
+"""
+TruthLens - Bounded Executor Tests
+==================================
+Author: 102012dl
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.api.executor import BoundedExecutor, ExecutorBusyError
+
+
+class TestBoundedExecutor:
+    """Test suite for BoundedExecutor"""
+
+    @pytest.mark.asyncio
+    async def test_run_returns_result(self):
+        """Work runs in the pool and returns its value."""
+        executor = BoundedExecutor(max_workers=2, max_pending=0)
+        try:
+            assert await executor.run(sum, [1, 2, 3]) == 6
+            assert executor.in_flight == 0
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_full(self):
+        """Submissions beyond workers + pending raise ExecutorBusyError."""
+        executor = BoundedExecutor(max_workers=1, max_pending=1)
+        release = threading.Event()
+        try:
+            first = asyncio.ensure_future(executor.run(release.wait))
+            second = asyncio.ensure_future(executor.run(release.wait))
+            await asyncio.sleep(0)
+
+            with pytest.raises(ExecutorBusyError):
+                await executor.run(release.wait)
+
+            release.set()
+            await asyncio.gather(first, second)
+            assert executor.in_flight == 0
+        finally:
+            release.set()
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_keeps_slot(self):
+        """A cancelled caller's slot stays taken until fn actually returns."""
+        executor = BoundedExecutor(max_workers=1, max_pending=0)
+        started, release = threading.Event(), threading.Event()
+
+        def work():
+            started.set()
+            release.wait(5)
+
+        try:
+            task = asyncio.create_task(executor.run(work))
+            await asyncio.to_thread(started.wait, 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            assert executor.in_flight == 1
+            with pytest.raises(ExecutorBusyError):
+                await executor.run(sum, [1])
+
+            release.set()
+            for _ in range(100):
+                if executor.in_flight == 0:
+                    break
+                await asyncio.sleep(0.01)
+            assert executor.in_flight == 0
+            assert await executor.run(sum, [1, 2]) == 3
+        finally:
+            release.set()
+            executor.shutdown()
+
+    def test_invalid_worker_count(self):
+        """At least one worker is required."""
+        with pytest.raises(ValueError):
+            BoundedExecutor(max_workers=0)
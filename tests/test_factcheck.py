@@ -0,0 +1,250 @@
+"""
+TruthLens - Fact Checking Tests
+===============================
+Author: 102012dl
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks.run import serialize_result
+from src.ml.analyzer import create_analyzer
+from src.ml.cache import ResultCache
+from src.ml.claims import ClaimExtractor
+from src.ml.compact import ResultEncoder
+from src.ml.embeddings import HashingEmbedder
+from src.ml.factcheck import FactChecker
+from src.ml.factindex import FactIndex, build_index
+
+VERIFIED = [
+    {"claim": "The COVID-19 vaccine contains microchips that track people through 5G networks.",
+     "verdict": "false", "confidence": 0.9, "sources": ["https://www.who.int/vaccines"],
+     "explanation": "Vaccines contain no electronics."},
+    {"claim": "The Eiffel Tower was completed in Paris in 1889 for the World's Fair.",
+     "verdict": "true", "sources": ["https://www.toureiffel.paris/en"]},
+    {"claim": "Drinking bleach cures the flu according to a study by Harvard doctors.",
+     "verdict": "false", "sources": ["https://www.cdc.gov/flu"]},
+]
+FILLER = [
+    {"claim": f"Local council number {i} approved a budget of {i * 7} million for road repairs in district {i}.",
+     "verdict": "unverified"}
+    for i in range(200)
+]
+ARTICLE = (
+    "Shocking news for everyone. The COVID-19 vaccine contains microchips that track "
+    "people through 5G networks, insiders say. I think you should share this now."
+)
+NEUTRAL = "The weather was pleasant today and people walked in the park with their dogs."
+
+
+@pytest.fixture(scope="module")
+def index_dir(tmp_path_factory):
+    root = tmp_path_factory.mktemp("facts")
+    source = root / "claims.jsonl"
+    source.write_text("\n".join(json.dumps(r) for r in VERIFIED + FILLER), encoding="utf-8")
+    directory = str(root / "index")
+    build_index(str(source), directory, nlist=8)
+    return directory
+
+
+@pytest.fixture(scope="module")
+def checker(index_dir):
+    checker = FactChecker.open(index_dir)
+    yield checker
+    checker.close()
+
+
+class TestClaimExtractor:
+    """Test suite for checkable-sentence extraction"""
+
+    def test_keeps_factual_sentences(self):
+        """Test sentences with numbers and names are kept, filler and opinions are not."""
+        claims = ClaimExtractor().extract(ARTICLE)
+        assert claims == [
+            "The COVID-19 vaccine contains microchips that track people through 5G networks, insiders say."
+        ]
+
+    def test_skips_questions(self):
+        """Test questions are never claims."""
+        assert ClaimExtractor().extract("Did the WHO confirm 300 cases in Kyiv last week?") == []
+
+    def test_ukrainian(self):
+        """Test Ukrainian sentences split and score like English ones."""
+        text = "Це жахливо. МОЗ підтвердило 300 випадків у Києві минулого тижня. Що далі?"
+        assert ClaimExtractor().extract(text) == ["МОЗ підтвердило 300 випадків у Києві минулого тижня."]
+
+    def test_max_claims_keeps_document_order(self):
+        """Test the best claims are kept, in the order they appear."""
+        text = " ".join(f"In 20{i:02d} the Ministry reported {i} new cases in Lviv." for i in range(10))
+        claims = ClaimExtractor(max_claims=3).extract(text)
+        assert len(claims) == 3
+        assert claims == sorted(claims)
+
+
+class TestHashingEmbedder:
+    """Test suite for the feature-hashing embeddings"""
+
+    def test_unit_vectors_and_zero_rows(self):
+        """Test rows are unit length, and empty texts embed to zeros."""
+        vectors = HashingEmbedder().embed(["Vaccines contain microchips", ""])
+        assert vectors.shape == (2, 256)
+        assert vectors.dtype == np.float32
+        assert np.linalg.norm(vectors[0]) == pytest.approx(1.0, abs=1e-5)
+        assert not vectors[1].any()
+
+    def test_batch_matches_single(self):
+        """Test embedding in a batch gives the same vectors as one by one."""
+        embedder = HashingEmbedder()
+        texts = [r["claim"] for r in VERIFIED]
+        batch = embedder.embed(texts)
+        for row, text in zip(batch, texts):
+            np.testing.assert_allclose(row, embedder.embed([text])[0], atol=1e-6)
+
+    def test_rewording_stays_close(self):
+        """Test a reworded claim is closer than an unrelated one."""
+        a, b, c = HashingEmbedder().embed([
+            VERIFIED[0]["claim"],
+            "Covid vaccines contain microchips tracking people over 5G networks",
+            NEUTRAL,
+        ])
+        assert a @ b > 2 * (a @ c)
+
+
+class TestFactIndex:
+    """Test suite for the memory-mapped IVF index"""
+
+    def test_exact_claims_found(self, index_dir):
+        """Test every stored claim is its own nearest neighbour."""
+        index = FactIndex(index_dir)
+        claims = [r["claim"] for r in VERIFIED + FILLER]
+        hits = index.search(index.embedder().embed(claims), k=1, nprobe=2)
+        assert [h[0][0] for h in hits] == list(range(len(claims)))
+        assert all(h[0][1] > 0.99 for h in hits)
+        assert len(index) == len(claims)
+        index.close()
+
+    def test_records_and_manifest(self, index_dir):
+        """Test records decode with defaults filled in."""
+        index = FactIndex(index_dir)
+        assert index.record(1) == {"claim": VERIFIED[1]["claim"], "verdict": "true", "confidence": 1.0,
+                                   "sources": VERIFIED[1]["sources"], "explanation": ""}
+        assert index.nlist == 8
+        assert index.embedder().params() == HashingEmbedder().params()
+        index.close()
+
+    def test_top_k_ordered(self, index_dir):
+        """Test results are best first and k bounds the count."""
+        index = FactIndex(index_dir)
+        hits = index.search(index.embedder().embed([FILLER[3]["claim"]]), k=5, nprobe=8)[0]
+        assert len(hits) == 5
+        assert hits[0][0] == len(VERIFIED) + 3
+        assert [s for _, s in hits] == sorted((s for _, s in hits), reverse=True)
+        index.close()
+
+    def test_csv_input(self, tmp_path):
+        """Test CSV sources are pipe-separated and verdicts normalized."""
+        source = tmp_path / "claims.csv"
+        source.write_text(
+            "claim,verdict,sources\n"
+            "\"The moon landing in 1969 was staged by NASA.\",False,https://a.org|https://b.org\n",
+            encoding="utf-8")
+        build_index(str(source), str(tmp_path / "index"))
+        index = FactIndex(str(tmp_path / "index"))
+        assert index.record(0)["verdict"] == "false"
+        assert index.record(0)["sources"] == ["https://a.org", "https://b.org"]
+        index.close()
+
+    def test_invalid_verdict(self, tmp_path):
+        """Test bad records fail the build with their line and leave no index."""
+        source = tmp_path / "claims.jsonl"
+        source.write_text(json.dumps({"claim": "Water is wet.", "verdict": "maybe"}) + "\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="claims.jsonl:1"):
+            build_index(str(source), str(tmp_path / "index"))
+        assert not os.path.exists(tmp_path / "index")
+
+    def test_rebuild_swaps_in_place(self, tmp_path):
+        """Test a rebuild replaces the index and changes its version, while an open one keeps working."""
+        source = tmp_path / "claims.jsonl"
+        source.write_text(json.dumps(VERIFIED[0]) + "\n", encoding="utf-8")
+        directory = str(tmp_path / "index")
+        build_index(str(source), directory)
+        old = FactIndex(directory)
+        source.write_text("\n".join(json.dumps(r) for r in VERIFIED), encoding="utf-8")
+        build_index(str(source), directory)
+        new = FactIndex(directory)
+        assert new.version != old.version
+        assert len(new) == 3
+        assert old.record(0)["claim"] == VERIFIED[0]["claim"]
+        old.close()
+        new.close()
+
+
+class TestFactChecker:
+    """Test suite for the fact-check stage"""
+
+    def test_check_batch(self, checker):
+        """Test matches carry the verified claim's verdict and sources, misses are dropped."""
+        results = checker.check_batch([
+            ["The COVID-19 vaccine contains microchips that track people through 5G networks."],
+            [NEUTRAL],
+            [],
+        ])
+        assert results[1] == [] and results[2] == []
+        (check,) = results[0]
+        assert check.verdict == "false"
+        assert check.sources == ["https://www.who.int/vaccines"]
+        assert check.confidence == pytest.approx(0.9, abs=0.01)
+        assert "Vaccines contain no electronics." in check.explanation
+
+    def test_from_env(self, index_dir, monkeypatch):
+        """Test the checker is off without an index and when it cannot load."""
+        monkeypatch.delenv("TRUTHLENS_FACTCHECK_INDEX", raising=False)
+        assert FactChecker.from_env() is None
+        monkeypatch.setenv("TRUTHLENS_FACTCHECK_INDEX", index_dir + "-missing")
+        assert FactChecker.from_env() is None
+        monkeypatch.setenv("TRUTHLENS_FACTCHECK_INDEX", index_dir)
+        monkeypatch.setenv("TRUTHLENS_FACTCHECK_THRESHOLD", "0.9")
+        checker = FactChecker.from_env()
+        assert checker.threshold == 0.9
+        checker.close()
+
+
+class TestAnalyzerFactChecks:
+    """Test suite for fact checks in the analysis pipeline"""
+
+    def test_results_carry_fact_checks(self, checker):
+        """Test matched claims become fact checks, findings and recommendations."""
+        analyzer = create_analyzer(fact_checker=checker)
+        flagged, clean = analyzer.analyze_batch_sync([ARTICLE, NEUTRAL])
+        assert [c.verdict for c in flagged.fact_checks] == ["false"]
+        assert any("fact-checked false" in f for f in flagged.key_findings)
+        assert "Read the fact-check sources listed for the matched claims" in flagged.recommendations
+        assert clean.fact_checks == []
+
+    def test_off_by_default(self):
+        """Test no fact checks without a checker."""
+        assert create_analyzer().analyze_sync(ARTICLE).fact_checks == []
+
+    def test_cache_key_follows_index(self, checker):
+        """Test cached results are not shared between analyzers with and without an index."""
+        cache = ResultCache()
+        create_analyzer(cache=cache).analyze_sync(ARTICLE)
+        result = create_analyzer(cache=cache, fact_checker=checker).analyze_sync(ARTICLE)
+        assert result.fact_checks
+
+    def test_stage_timings(self, checker):
+        """Test claim extraction and lookup are timed when instrumented."""
+        result = create_analyzer(fact_checker=checker, instrument=True).analyze_sync(ARTICLE)
+        assert {"claims", "fact_check"} <= set(result.stage_timings_ms)
+
+    def test_serialized(self, checker):
+        """Test the API shape and the precompiled encoder agree on fact checks."""
+        result = create_analyzer(fact_checker=checker).analyze_sync(ARTICLE)
+        expected = serialize_result(result)
+        assert expected["fact_checks"][0]["verdict"] == "false"
+        encoder = ResultEncoder()
+        assert json.loads(encoder.encode(result)) == expected
+        assert json.loads(encoder.encode(result.compact())) == expected
@@ -0,0 +1,101 @@
+"""
+TruthLens - Language Pack Tests
+===============================
+Author: 102012dl
+"""
+
+import json
+
+import pytest
+
+from src.ml.analyzer import ManipulativeTechnique, Sentiment, create_analyzer
+from src.ml.language import LanguageDetector, LexiconPacks
+
+ENGLISH = ("The ministry said on Tuesday that regional hospitals will receive more "
+           "funding after a report found that waiting times grew last year.")
+UKRAINIAN = ("Міністерство у вівторок заявило, що регіональні лікарні отримають більше "
+             "фінансування після того, як звіт показав зростання черг.")
+UKRAINIAN_FAKE = ("ШОК!!! Ви не повірите, що приховують лікарі! Ця таємниця заборонено, "
+                  "сенсація і скандал. Небезпека та загроза всюди, страшна криза.")
+
+
+class TestLanguageDetector:
+    """Test suite for character n-gram language identification"""
+
+    @pytest.mark.parametrize("text, language", [
+        (ENGLISH, "en"), (UKRAINIAN, "uk"), (UKRAINIAN_FAKE, "uk"),
+        ("Breaking: prices rise again", "en"), ("Ціни знову зростають у столиці", "uk"),
+    ])
+    def test_detects_language(self, text, language):
+        """Test English and Ukrainian texts, long and short."""
+        assert LanguageDetector().detect(text) == language
+
+    def test_too_little_text_is_default(self):
+        """Test texts without enough letters fall back to the default."""
+        assert LanguageDetector(default="uk").detect("42 !!!") == "uk"
+
+    def test_profiles_loaded_on_first_use(self):
+        """Test creating a detector reads nothing from disk."""
+        detector = LanguageDetector(directory="/nonexistent")
+
+        assert detector._profiles is None
+
+
+class TestLexiconPacks:
+    """Test suite for lazily compiled lexicon packs"""
+
+    def test_compiled_on_demand(self):
+        """Test only requested packs are compiled, once."""
+        packs = LexiconPacks()
+
+        assert packs.loaded == []
+        scanner = packs.scanner("uk")
+        assert packs.loaded == ["uk"]
+        assert packs.scanner("uk") is scanner
+        assert set(packs.available()) >= {"en", "uk"}
+
+    def test_missing_pack_uses_default(self, tmp_path):
+        """Test a language without a pack scans with the default pack."""
+        (tmp_path / "en.json").write_text(json.dumps({"token_sets": {"positive": ["good"]}}))
+        packs = LexiconPacks(directory=str(tmp_path))
+
+        assert packs.scanner("pl") is packs.scanner("en")
+        assert packs.scanner("pl").scan("Good!").matched("positive")
+
+    def test_missing_default_pack(self, tmp_path):
+        """Test a missing default pack is an error, not an empty scanner."""
+        with pytest.raises(FileNotFoundError):
+            LexiconPacks(directory=str(tmp_path)).scanner("en")
+
+
+class TestAnalyzerLanguages:
+    """Test suite for language-aware analysis"""
+
+    def test_ukrainian_lexicons(self):
+        """Test Ukrainian text is labelled and scanned with the Ukrainian pack."""
+        result = create_analyzer().analyze_sync(UKRAINIAN_FAKE)
+
+        assert result.language == "uk"
+        assert result.sentiment == Sentiment.NEGATIVE
+        assert ManipulativeTechnique.CLICKBAIT in result.manipulative_techniques
+        assert ManipulativeTechnique.EMOTIONAL_APPEAL in result.manipulative_techniques
+        assert ManipulativeTechnique.APPEAL_TO_FEAR in result.manipulative_techniques
+
+    def test_english_only_loads_english(self):
+        """Test analyzing English text never compiles other packs."""
+        analyzer = create_analyzer()
+        result = analyzer.analyze_sync(ENGLISH)
+
+        assert result.language == "en"
+        assert analyzer.lexicons.loaded == ["en"]
+
+    def test_streaming_matches_whole_document(self):
+        """Test streamed Ukrainian text gets the same language and techniques."""
+        analyzer = create_analyzer()
+        expected = analyzer.analyze_sync(UKRAINIAN_FAKE)
+
+        result = analyzer.analyze_stream_sync([UKRAINIAN_FAKE[i:i + 9]
+                                               for i in range(0, len(UKRAINIAN_FAKE), 9)])
+
+        assert result.language == "uk"
+        assert result.manipulative_techniques == expected.manipulative_techniques
@@ -0,0 +1,66 @@
+"""
+TruthLens - Metrics Tests
+=========================
+Author: 102012dl
+"""
+
+from src.metrics import MetricsRegistry, cache_collectors
+from src.ml.cache import ResultCache
+
+
+class TestMetricsRegistry:
+    """Test suite for the Prometheus text exposition"""
+
+    def test_counter_with_labels(self):
+        """Test counters render one sample per label set."""
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requests", ("path",))
+        requests.inc(path="/a")
+        requests.inc(2, path="/b")
+
+        body = registry.render()
+        assert "# TYPE requests_total counter" in body
+        assert 'requests_total{path="/a"} 1' in body
+        assert 'requests_total{path="/b"} 2' in body
+
+    def test_gauge_up_and_down(self):
+        """Test gauges can be incremented, decremented and set."""
+        registry = MetricsRegistry()
+        in_flight = registry.gauge("in_flight", "In flight")
+        in_flight.inc()
+        in_flight.inc()
+        in_flight.dec()
+        assert in_flight.value() == 1
+        in_flight.set(5)
+        assert "in_flight 5" in registry.render()
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count."""
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value)
+
+        body = registry.render()
+        assert 'latency_seconds_bucket{le="0.1"} 1' in body
+        assert 'latency_seconds_bucket{le="1"} 2' in body
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in body
+        assert "latency_seconds_sum 5.55" in body
+        assert "latency_seconds_count 3" in body
+
+    def test_label_values_escaped(self):
+        """Test quotes and newlines in label values are escaped."""
+        registry = MetricsRegistry()
+        registry.counter("errors_total", "Errors", ("message",)).inc(message='bad "x"\n')
+        assert 'errors_total{message="bad \\"x\\"\\n"} 1' in registry.render()
+
+    def test_cache_collectors(self):
+        """Test cache stats are read at scrape time."""
+        registry = MetricsRegistry()
+        cache = ResultCache()
+        cache_collectors(registry, cache.stats, "app")
+        cache.get("missing")
+
+        body = registry.render()
+        assert "app_cache_misses_total 1" in body
+        assert "app_cache_size 0" in body
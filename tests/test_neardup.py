@@ -0,0 +1,155 @@
+"""
+TruthLens - Near-Duplicate Index Tests
+======================================
+Author: 102012dl
+"""
+
+import tracemalloc
+import zlib
+
+import numpy as np
+import pytest
+
+from src.ml.analyzer import create_analyzer
+from src.ml.cache import ResultCache
+from src.ml.neardup import NearDuplicateIndex, shingles
+
+ARTICLE = (
+    "Officials confirmed on Tuesday that the regional water supply meets every "
+    "safety standard after independent laboratories tested samples from forty "
+    "sites across the province over the past three months, according to the report."
+)
+REPOST = (
+    "🚨🚨 BREAKING: " + ARTICLE.replace("Tuesday", "tuesday") +
+    " Read more https://example.org/story?utm_source=telegram&utm_medium=share"
+)
+UNRELATED = (
+    "The football club announced a new coach on Friday after a disappointing "
+    "season, with supporters gathering outside the stadium to celebrate the decision."
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestNearDuplicateIndex:
+    """Test suite for the MinHash/LSH index"""
+
+    def test_shingles_ignore_noise(self):
+        """Test case, emojis and URL query strings don't change shingles."""
+        assert shingles("🔥 Big NEWS today!! https://a.com/x?utm=1") == \
+            shingles("big news today https://a.com/x")
+
+    def test_finds_edited_repost(self):
+        """Test a repost with a new headline and tracking link matches."""
+        index = NearDuplicateIndex(threshold=0.7)
+        index.add("original", index.signature(ARTICLE), result="verdict")
+        match = index.query(index.signature(REPOST))
+        assert match is not None
+        assert match.key == "original"
+        assert match.result == "verdict"
+        assert match.similarity >= 0.7
+        assert index.query(index.signature(UNRELATED)) is None
+
+    def test_signature_memory_bounded(self):
+        """Test a multi-MB page is signed in blocks, without a shingles x permutations matrix."""
+        index = NearDuplicateIndex()
+        text = " ".join(f"w{i}" for i in range(400_000))
+        assert len(text) > 3_000_000
+
+        tracemalloc.start()
+        signature = index.signature(text)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        # One full matrix alone would be 400k x 128 x 8 bytes = 400 MB
+        assert peak < 150 * 2 ** 20
+        assert signature.shape == (index.num_perm,) and signature.dtype == np.uint32
+
+    def test_blocked_signature_matches_full_matrix(self):
+        """Test signing in blocks gives the same MinHash as one matrix over all shingles."""
+        index = NearDuplicateIndex()
+        text = " ".join(f"w{i}" for i in range(10_000))
+        hashes = np.array([zlib.crc32(g.encode("utf-8")) for g in shingles(text)], dtype=np.uint64)
+        prime = np.uint64((1 << 31) - 1)
+        expected = ((np.outer(hashes % prime, index._a) + index._b) % prime).min(axis=0)
+        assert np.array_equal(index.signature(text), expected.astype(np.uint32))
+
+    def test_bounded_size(self):
+        """Test the oldest entries are evicted past max_entries."""
+        index = NearDuplicateIndex(max_entries=2)
+        for key, text in (("a", ARTICLE), ("b", UNRELATED), ("c", "A completely different third text")):
+            index.add(key, index.signature(text), result=key)
+        assert len(index) == 2
+        assert index.query(index.signature(ARTICLE)) is None
+        assert all("a" not in bucket for bucket in index._buckets.values())
+
+    def test_age_eviction(self):
+        """Test entries past max_age are no longer returned."""
+        clock = FakeClock()
+        index = NearDuplicateIndex(max_age_seconds=60, clock=clock)
+        index.add("a", index.signature(ARTICLE), result="a")
+        clock.now += 61
+        assert index.query(index.signature(ARTICLE)) is None
+        assert len(index) == 0
+        assert not index._buckets
+
+    def test_snapshot_restore(self, tmp_path):
+        """Test a restored index answers like the original."""
+        analyzer = create_analyzer(near_duplicates=NearDuplicateIndex(threshold=0.7))
+        analyzer.analyze_sync(ARTICLE)
+        path = str(tmp_path / "neardup.json")
+        analyzer.near_duplicates.save(path)
+
+        restored = NearDuplicateIndex(threshold=0.7)
+        assert restored.restore(path) == 1
+        match = restored.query(restored.signature(REPOST))
+        assert match is not None
+        assert match.result.verdict == analyzer.analyze_sync(ARTICLE).verdict
+
+    def test_restore_rejects_other_parameters(self, tmp_path):
+        """Test snapshots built with different permutations are refused."""
+        index = NearDuplicateIndex()
+        path = str(tmp_path / "neardup.json")
+        index.save(path)
+        with pytest.raises(ValueError):
+            NearDuplicateIndex(num_perm=64, bands=16).restore(path)
+
+
+class TestAnalyzerNearDuplicates:
+    """Test near-duplicate reuse in the analyzer"""
+
+    def test_repost_reuses_verdict(self):
+        """Test an edited repost reuses the original verdict and reports the hit."""
+        analyzer = create_analyzer(
+            cache=ResultCache(), near_duplicates=NearDuplicateIndex(threshold=0.7)
+        )
+        original = analyzer.analyze_sync(ARTICLE)
+        assert original.near_duplicate_of is None
+
+        repost = analyzer.analyze_sync(REPOST)
+        assert repost.near_duplicate_of == analyzer.request_key(ARTICLE)
+        assert repost.near_duplicate_similarity >= 0.7
+        assert repost.credibility_score == original.credibility_score
+        assert repost.verdict == original.verdict
+
+    def test_other_source_is_analyzed(self):
+        """Test a match from another source is reported but analyzed in full."""
+        analyzer = create_analyzer(near_duplicates=NearDuplicateIndex(threshold=0.7))
+        original = analyzer.analyze_sync(ARTICLE, "https://reuters.com/a")
+        copy = analyzer.analyze_sync(REPOST, "https://infowars.com/b")
+        assert copy.near_duplicate_of == analyzer.request_key(ARTICLE, "https://reuters.com/a")
+        assert copy.source_name == "infowars.com"
+        assert copy.credibility_score < original.credibility_score
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Test from_env() only builds an index when enabled."""
+        monkeypatch.delenv("TRUTHLENS_NEARDUP", raising=False)
+        assert NearDuplicateIndex.from_env() is None
+        monkeypatch.setenv("TRUTHLENS_NEARDUP", "1")
+        assert isinstance(NearDuplicateIndex.from_env(), NearDuplicateIndex)
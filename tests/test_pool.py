@@ -0,0 +1,113 @@
+"""
+TruthLens - Process Pool Engine Tests
+=====================================
+Author: 102012dl
+"""
+
+import os
+
+import pytest
+
+from src.ml.analyzer import AnalysisResult, Sentiment, create_analyzer
+from src.ml import pool as pool_module
+from src.ml.cache import ResultCache
+from src.ml.neardup import NearDuplicateIndex
+from src.ml.pool import AnalyzerPool
+from src.ml.sources import SourceIndex
+
+
+class TestAnalyzerPool:
+    """Test suite for AnalyzerPool"""
+
+    def test_in_process_fallback(self):
+        """workers=0 runs on the local analyzer without child processes."""
+        local = create_analyzer()
+        pool = AnalyzerPool(workers=0, local=local)
+
+        result = pool.analyze_sync("Great news! Excellent progress has been made.")
+
+        assert pool.in_process
+        assert pool.warm_up() == [os.getpid()]
+        assert result.sentiment == Sentiment.POSITIVE
+
+    def test_worker_processes(self):
+        """Batches are split across workers and returned in order."""
+        pool = AnalyzerPool(workers=2, max_tasks_per_child=2, chunk_size=2)
+        texts = [
+            "Great news! Excellent progress has been made.",
+            "Terrible disaster caused massive problems.",
+        ] * 3
+        try:
+            pids = pool.warm_up()
+            results = pool.analyze_batch_sync(texts)
+        finally:
+            pool.shutdown()
+
+        assert os.getpid() not in pids
+        assert all(isinstance(r, AnalysisResult) for r in results)
+        assert [r.sentiment for r in results] == [Sentiment.POSITIVE, Sentiment.NEGATIVE] * 3
+
+    def test_worker_errors(self):
+        """Per-item errors travel back from workers."""
+        pool = AnalyzerPool(workers=1)
+        try:
+            results = pool.analyze_batch_sync(["Valid text here", None], return_exceptions=True)
+            with pytest.raises(Exception):
+                pool.analyze_sync(None)
+        finally:
+            pool.shutdown()
+
+        assert isinstance(results[0], AnalysisResult)
+        assert isinstance(results[1], Exception)
+
+    def test_recycling_keyword_only_on_311(self, monkeypatch):
+        """max_tasks_per_child is not passed where ProcessPoolExecutor lacks it."""
+        created = []
+        monkeypatch.setattr(pool_module, "ProcessPoolExecutor", lambda **kwargs: created.append(kwargs))
+        for version, expected in (((3, 10, 14), False), ((3, 11, 0), True)):
+            monkeypatch.setattr(pool_module.sys, "version_info", version)
+            AnalyzerPool(workers=1, max_tasks_per_child=5).start()
+            assert ("max_tasks_per_child" in created[-1]) is expected
+        AnalyzerPool(workers=1, max_tasks_per_child=None).start()
+        assert "max_tasks_per_child" not in created[-1]
+
+    def test_parent_cache_in_front_of_workers(self, tmp_path):
+        """With workers, the parent loads its sources and its cache serves repeats."""
+        path = tmp_path / "sources.csv"
+        path.write_text("domain,credibility_score\nexample-news.org,0.9\n")
+        local = create_analyzer(cache=ResultCache(), sources=SourceIndex(str(path), refresh_seconds=0))
+        pool = AnalyzerPool(workers=1, local=local)
+        text = "Great news! Excellent progress has been made."
+        try:
+            pool.warm_up()
+            first = pool.analyze_sync(text)
+            second = pool.analyze_batch_sync([text, "Terrible disaster caused massive problems."])
+        finally:
+            pool.shutdown()
+
+        assert local.sources.lookup("example-news.org") == ("example-news.org", 0.9)
+        stats = local.cache.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 2, 2)
+        assert second[0] == local.cache.get(local.request_key(text)).to_result()
+        assert second[0].credibility_score == first.credibility_score
+
+    def test_parent_near_duplicate_index(self, tmp_path):
+        """With workers, near-duplicates are indexed in the parent, whose snapshot survives a restart."""
+        path = str(tmp_path / "neardup.json")
+        local = create_analyzer(near_duplicates=NearDuplicateIndex(threshold=0.7, path=path))
+        pool = AnalyzerPool(workers=1, local=local)
+        article = ("Officials confirmed on Tuesday that the regional water supply meets every "
+                   "safety standard after independent laboratories tested samples from forty sites.")
+        try:
+            pool.warm_up()
+            original = pool.analyze_sync(article)
+            repost = pool.analyze_sync("BREAKING: " + article)
+        finally:
+            pool.shutdown()
+        local.near_duplicates.save()
+
+        assert len(local.near_duplicates) == 1
+        assert repost.near_duplicate_of is not None
+        assert repost.credibility_score == original.credibility_score
+        restored = NearDuplicateIndex(threshold=0.7, path=path)
+        assert restored.restore(path) == 1
@@ -0,0 +1,87 @@
+"""
+TruthLens - Lexicon Scanner Tests
+=================================
+Author: 102012dl
+"""
+
+from src.ml.scanner import LexiconScanner
+
+
+class TestLexiconScanner:
+    """Test suite for LexiconScanner"""
+
+    def test_terms_patterns_and_tokens_in_one_scan(self):
+        """All categories are filled from a single scan."""
+        scanner = LexiconScanner(
+            terms={'emotional': {'shocking', 'secret'}},
+            patterns={'clickbait': [r"you won't believe", r"\d+ reasons why"]},
+            token_sets={'positive': {'great'}}
+        )
+
+        scan = scanner.scan("SHOCKING secret! You won't believe 7 reasons why it is great")
+
+        assert scan.hits['emotional'] == {'shocking', 'secret'}
+        assert scan.count('clickbait') == 2
+        assert scan.hits['positive'] == {'great'}
+        assert 'great' in scan.tokens
+
+    def test_terms_match_whole_words(self):
+        """Terms match whole tokens, not substrings of longer words."""
+        scanner = LexiconScanner(terms={'emotional': {'breaking'}, 'fear': {'alert'}})
+
+        assert not scanner.scan("A heartbreaking story").matched('emotional')
+        assert scanner.scan("BREAKING: red alert!").hits == {
+            'emotional': {'breaking'}, 'fear': {'alert'}
+        }
+
+    def test_punctuation_and_case(self):
+        """Tokens are split from punctuation and case-folded."""
+        scanner = LexiconScanner(token_sets={'positive': {'good', 'добре'}})
+
+        scan = scanner.scan("Good! It was good, really. «Добре»")
+
+        assert scan.hits['positive'] == {'good', 'добре'}
+
+    def test_accepts_tokens(self):
+        """A document tokenized once can be scanned without re-tokenizing."""
+        scanner = LexiconScanner(token_sets={'positive': {'great'}})
+        tokens = scanner.tokenizer.tokenize("Great progress")
+
+        scan = scanner.scan(tokens)
+
+        assert scan.tokens is tokens
+        assert scan.matched('positive')
+
+    def test_terms_are_escaped(self):
+        """Literal terms are not interpreted as regex."""
+        scanner = LexiconScanner(terms={'odd': {'a.b'}})
+
+        assert not scanner.scan("axb").matched('odd')
+        assert scanner.scan("see a.b").matched('odd')
+
+    def test_anchored_pattern(self):
+        """Anchored patterns still work inside the combined regex."""
+        scanner = LexiconScanner(patterns={'clickbait': [r"\?\!+$"]})
+
+        assert scanner.scan("Really?!!").matched('clickbait')
+        assert not scanner.scan("Really?! No").matched('clickbait')
+
+    def test_empty_scanner(self):
+        """A scanner without lexicons returns empty hits."""
+        scan = LexiconScanner().scan("anything at all")
+
+        assert scan.hits == {}
+        assert scan.count('emotional') == 0
+
+    def test_overlapping_categories(self):
+        """Test a phrase overlapping a match from another category is still found."""
+        scanner = LexiconScanner(
+            terms={'emotional': {'shocking truth'}},
+            patterns={'clickbait': [r"the shocking"], 'authority': [r"truth about vaccines"]}
+        )
+
+        scan = scanner.scan("Read the shocking truth about vaccines")
+
+        assert scan.hits['emotional'] == {'shocking truth'}
+        assert scan.hits['clickbait'] == {'the shocking'}
+        assert scan.hits['authority'] == {'truth about vaccines'}
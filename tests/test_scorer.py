@@ -0,0 +1,76 @@
+"""
+TruthLens - Credibility Scorer Tests
+====================================
+Author: 102012dl
+"""
+
+import numpy as np
+import pytest
+
+joblib = pytest.importorskip("joblib")
+pytest.importorskip("sklearn")
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from src.ml.analyzer import create_analyzer
+from src.ml.registry import ModelRegistry
+from src.ml.scorer import CredibilityScorer
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """Registry with a tiny baseline model (label 1 = fake)."""
+    texts = ["shocking miracle cure banned"] * 5 + ["ministry published quarterly report"] * 5
+    labels = [1] * 5 + [0] * 5
+    vectorizer = TfidfVectorizer()
+    model = LogisticRegression().fit(vectorizer.fit_transform(texts), labels)
+    joblib.dump(model, tmp_path / "baseline_model.pkl")
+    joblib.dump(vectorizer, tmp_path / "vectorizer.pkl")
+    return ModelRegistry(model_dir=str(tmp_path))
+
+
+class TestCredibilityScorer:
+    """Test suite for CredibilityScorer"""
+
+    def test_heuristic_fallback(self, tmp_path):
+        """Without a model the heuristic score is kept."""
+        scorer = CredibilityScorer(ModelRegistry(model_dir=str(tmp_path)))
+
+        scores = scorer.score_batch(["some text"], [64])
+
+        assert scores[0].score == 64
+        assert scores[0].backend == "heuristic"
+        assert scores[0].model_probability is None
+
+    def test_matches_predict_proba(self, registry):
+        """The sparse matvec path agrees with the sklearn pipeline."""
+        scorer = CredibilityScorer(registry, model_weight=1.0)
+        texts = ["shocking miracle cure", "ministry report published", "unrelated words"]
+
+        scores = scorer.score_batch(texts, [0, 0, 0])
+
+        loaded = registry.get("baseline")
+        expected = loaded.model.predict_proba(loaded.vectorizer.transform(texts))[:, 0]
+        assert np.allclose([s.model_probability for s in scores], expected, atol=1e-4)
+        assert [s.score for s in scores] == [int(round(p * 100)) for p in expected]
+        assert all(s.backend == "baseline+heuristic" for s in scores)
+
+    def test_blending(self, registry):
+        """model_weight splits the score between model and heuristics."""
+        scorer = CredibilityScorer(registry, model_weight=0.5)
+
+        score = scorer.score_batch(["ministry published quarterly report"], [40])[0]
+
+        assert score.score == int(round(0.5 * 40 + 50 * score.model_probability))
+
+    @pytest.mark.asyncio
+    async def test_analyzer_reports_backend(self, registry):
+        """Batch analysis runs the model and reports it as the backend."""
+        analyzer = create_analyzer(registry=registry)
+        texts = ["Shocking miracle cure banned by everyone!"] * 3 + ["The ministry published its report."] * 3
+
+        results = await analyzer.analyze_batch(texts)
+
+        assert all(r.scoring_backend == "baseline+heuristic" for r in results)
+        assert results[0].credibility_score < results[-1].credibility_score
@@ -0,0 +1,116 @@
+"""
+TruthLens - Single-Flight Tests
+===============================
+Author: 102012dl
+"""
+
+import asyncio
+
+from src.ml.analyzer import create_analyzer
+from src.ml.singleflight import SingleFlight
+
+
+class Gate:
+    """Computation that blocks until released and counts its runs"""
+
+    def __init__(self, result="done", error=None):
+        self.result = result
+        self.error = error
+        self.runs = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.runs += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class TestSingleFlight:
+    """Test suite for in-flight request coalescing"""
+
+    async def test_concurrent_callers_share_one_run(self):
+        """Test N concurrent calls for one key run the computation once."""
+        flights, gate = SingleFlight(), Gate()
+        tasks = [asyncio.create_task(flights.do("k", gate)) for _ in range(10)]
+        await asyncio.sleep(0)
+        gate.release.set()
+        assert await asyncio.gather(*tasks) == ["done"] * 10
+        assert gate.runs == 1
+        assert flights.executed == 1
+        assert flights.saved == 9
+        assert flights.in_flight == 0
+
+    async def test_distinct_keys_run_separately(self):
+        """Test different keys never share a computation."""
+        flights, gate = SingleFlight(), Gate()
+        tasks = [asyncio.create_task(flights.do(key, gate)) for key in ("a", "b")]
+        await asyncio.sleep(0)
+        gate.release.set()
+        await asyncio.gather(*tasks)
+        assert gate.runs == 2
+        assert flights.saved == 0
+
+    async def test_error_reaches_every_caller(self):
+        """Test a failure is raised to all waiters and not remembered."""
+        flights, gate = SingleFlight(), Gate(error=ValueError("boom"))
+        tasks = [asyncio.create_task(flights.do("k", gate)) for _ in range(3)]
+        await asyncio.sleep(0)
+        gate.release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+
+        # The next call starts over
+        gate.error = None
+        assert await flights.do("k", gate) == "done"
+        assert gate.runs == 2
+
+    async def test_one_cancelled_caller_does_not_cancel_others(self):
+        """Test cancelling a waiter leaves the shared computation running."""
+        flights, gate = SingleFlight(), Gate()
+        first = asyncio.create_task(flights.do("k", gate))
+        second = asyncio.create_task(flights.do("k", gate))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        gate.release.set()
+        assert await second == "done"
+        assert first.cancelled()
+        assert gate.cancelled == 0
+
+    async def test_last_caller_leaving_cancels_computation(self):
+        """Test the computation is cancelled once nobody awaits it."""
+        flights, gate = SingleFlight(), Gate()
+        tasks = [asyncio.create_task(flights.do("k", gate)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert gate.cancelled == 1
+        assert flights.in_flight == 0
+
+        # A new caller gets a fresh run rather than the cancelled one
+        follow_up = asyncio.create_task(flights.do("k", gate))
+        await asyncio.sleep(0)
+        gate.release.set()
+        assert await follow_up == "done"
+        assert gate.runs == 2
+
+
+class TestRequestKey:
+    """Test the analyzer's request key used for coalescing"""
+
+    def test_key_normalizes_text_and_url(self):
+        """Test whitespace and www. variants map to one key."""
+        analyzer = create_analyzer()
+        key = analyzer.request_key("Breaking  news\ntoday", "https://www.bbc.com/a")
+        assert key == analyzer.request_key("Breaking news today", "https://bbc.com/b")
+        assert key != analyzer.request_key("Breaking news today")
+        assert key != analyzer.request_key("Breaking news today", "https://example.org/a")
@@ -0,0 +1,120 @@
+"""
+TruthLens - Source Index Tests
+==============================
+Author: 102012dl
+"""
+
+import sqlite3
+
+import pytest
+
+from src.ml.analyzer import create_analyzer
+from src.ml.sources import SourceIndex, load_source_rows
+
+
+@pytest.fixture
+def sources_db(tmp_path):
+    """SQLite stand-in for the sources table."""
+    path = str(tmp_path / "sources.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE sources (domain TEXT UNIQUE, name TEXT, "
+        "credibility_score REAL, updated_at TEXT)"
+    )
+    conn.executemany("INSERT INTO sources VALUES (?, ?, ?, ?)", [
+        ("bbc.co.uk", "BBC", 0.9, "2024-01-01T00:00:00"),
+        ("reuters.com", "Reuters", 0.95, "2024-01-01T00:00:00"),
+        ("blog.example.com", "Example blog", 0.2, "2024-01-02T00:00:00"),
+    ])
+    conn.commit()
+    conn.close()
+    return path
+
+
+class TestSourceIndex:
+    """Test suite for SourceIndex"""
+
+    def test_longest_suffix_match(self):
+        """Test subdomains resolve to the longest registered suffix."""
+        index = SourceIndex(defaults={"bbc.co.uk": 0.9, "example.com": 0.5,
+                                      "blog.example.com": 0.2})
+        assert index.lookup("edition.bbc.co.uk") == ("bbc.co.uk", 0.9)
+        assert index.lookup("m.blog.example.com") == ("blog.example.com", 0.2)
+        assert index.lookup("shop.example.com") == ("example.com", 0.5)
+        assert index.lookup("EXAMPLE.COM.") == ("example.com", 0.5)
+
+    def test_unregistered_domains(self):
+        """Test unknown domains and bare suffixes don't match."""
+        index = SourceIndex(defaults={"bbc.co.uk": 0.9})
+        assert index.lookup("co.uk") is None
+        assert index.lookup("notbbc.co.uk") is None
+        assert index.lookup("") is None
+
+    def test_empty_labels(self):
+        """Test hosts with empty labels neither crash lookups nor register as sources."""
+        index = SourceIndex(defaults={"bbc.co.uk": 0.9, "example..com": 0.4, ".": 0.1})
+        assert len(index) == 2
+        assert index.lookup("news..bbc.co.uk") == ("bbc.co.uk", 0.9)
+        assert index.lookup("example.com") == ("example.com", 0.4)
+        assert index.lookup("a..b") is None
+        assert index.lookup("..") is None
+
+        index._publish(*index._apply([("x..bbc.co.uk.", 0.3), ("", 0.2)]))
+        assert len(index) == 3
+        assert index.lookup("x.bbc.co.uk") == ("x.bbc.co.uk", 0.3)
+
+    def test_load_from_sqlite(self, sources_db):
+        """Test loaded rows override built-in defaults."""
+        index = SourceIndex(sources_db, defaults={"reuters.com": 0.5, "who.int": 0.95})
+        index.load()
+        assert len(index) == 4
+        assert index.lookup("m.reuters.com") == ("reuters.com", 0.95)
+        assert index.lookup("who.int") == ("who.int", 0.95)
+
+    def test_load_from_csv(self, tmp_path):
+        """Test the CSV stand-in."""
+        path = tmp_path / "sources.csv"
+        path.write_text("domain,name,credibility_score\napnews.com,AP,0.95\n")
+        index = SourceIndex(str(path))
+        index.load()
+        assert index.lookup("www.apnews.com") == ("apnews.com", 0.95)
+
+    def test_incremental_refresh(self, sources_db):
+        """Test a refresh applies only changed rows and leaves old snapshots intact."""
+        index = SourceIndex(sources_db)
+        index.load()
+        before = index._root
+
+        conn = sqlite3.connect(sources_db)
+        conn.execute("UPDATE sources SET credibility_score = 0.1, updated_at = ? "
+                     "WHERE domain = 'reuters.com'", ("2024-02-01T00:00:00",))
+        conn.execute("INSERT INTO sources VALUES ('bbc.com', 'BBC', 0.9, '2024-02-01T00:00:00')")
+        conn.commit()
+        conn.close()
+
+        assert index.refresh() == 2
+        assert index.lookup("reuters.com") == ("reuters.com", 0.1)
+        assert index.lookup("news.bbc.com") == ("bbc.com", 0.9)
+        assert len(index) == 4
+        # Unchanged subtrees are shared; the published trie was not mutated
+        assert index._root["uk"] is before["uk"]
+        assert before["com"]["reuters"][""] == 0.95
+        assert index.refresh() == 0
+
+    def test_failed_load_keeps_current_index(self, tmp_path):
+        """Test a broken location leaves the built-in defaults in place."""
+        index = SourceIndex(str(tmp_path / "missing.csv"), defaults={"who.int": 0.95})
+        index.warm_up()
+        assert index.lookup("who.int") == ("who.int", 0.95)
+
+    def test_rows_since(self, sources_db):
+        """Test incremental reads filter on updated_at."""
+        rows = list(load_source_rows(sources_db, since="2024-01-01T00:00:00"))
+        assert [row[0] for row in rows] == ["blog.example.com"]
+
+    def test_analyzer_uses_index(self):
+        """Test the analyzer resolves subdomains through the index."""
+        analyzer = create_analyzer()
+        assert analyzer._analyze_source("https://edition.bbc.co.uk/news") == (0.90, "bbc.co.uk")
+        assert analyzer._analyze_source("https://m.reuters.com:443/a") == (0.95, "reuters.com")
+        assert analyzer._analyze_source("https://unknown.example/a") == (0.5, "unknown.example")
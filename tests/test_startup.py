@@ -0,0 +1,55 @@
+"""
+TruthLens - Startup Benchmark Tests
+===================================
+Author: 102012dl
+"""
+
+from benchmarks.startup import HEAVY_MODULES, audit_imports, first_response, parse_importtime
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2057 |      89933 |     numpy
+import time:      5638 |      95571 |   src.ml.neardup
+Traceback line that is not importtime output
+"""
+
+
+class TestStartup:
+    """Test suite for the import-time audit and cold-start benchmark"""
+
+    def test_parse_importtime(self):
+        """Test records keep self/cumulative time and nesting depth."""
+        records = parse_importtime(IMPORTTIME)
+
+        assert [(r.name, r.self_us, r.cumulative_us, r.depth) for r in records] == [
+            ("_io", 120, 120, 1), ("numpy", 2057, 89933, 2), ("src.ml.neardup", 5638, 95571, 1)
+        ]
+        assert records[2].package == "src"
+
+    def test_api_import_skips_heavy_libraries(self):
+        """Test importing the API loads none of the heavy ML libraries."""
+        audit = audit_imports("src.api.main")
+
+        assert "error" not in audit
+        assert audit["heavy"] == []
+        assert "fastapi" in audit["packages_ms"]
+
+    def test_training_import_defers_libraries(self):
+        """Test the training CLI imports pandas/sklearn only when it trains."""
+        audit = audit_imports("src.models.train")
+
+        assert audit["heavy"] == []
+
+    def test_audit_reports_heavy_imports(self):
+        """Test a module pulling in a heavy library is flagged."""
+        audit = audit_imports("src.nlp.data_loader, numpy")
+
+        assert "numpy" in audit["heavy"] and "numpy" in HEAVY_MODULES
+
+    def test_first_response_phases(self):
+        """Test a cold API process reports its startup phases in order."""
+        report = first_response()
+
+        phases = ["interpreter_ms", "imported_ms", "first_response_ms", "ready_ms", "first_analysis_ms"]
+        assert list(report) == phases
+        assert all(report[a] <= report[b] for a, b in zip(phases, phases[1:]))
@@ -0,0 +1,117 @@
+"""
+TruthLens - Storage Tests
+=========================
+Author: 102012dl
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from src.ml.analyzer import create_analyzer
+from src.storage.schema import analyses
+from src.storage.trends import TrendRollup
+from src.storage.writer import AnalysisWriter
+
+
+@pytest.fixture
+def result():
+    return create_analyzer().analyze_sync("SHOCKING news revealed!!! Danger and threat everywhere.")
+
+
+def count_rows(url: str) -> int:
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        count = conn.execute(select(func.count()).select_from(analyses)).scalar()
+    engine.dispose()
+    return count
+
+
+class TestAnalysisWriter:
+    """Test suite for AnalysisWriter"""
+
+    def test_disabled_without_url(self, result):
+        """Test submit is a no-op when no database is configured."""
+        writer = AnalysisWriter(None)
+        assert writer.submit(result, "text") is False
+        assert writer.stats().queued == 0
+
+    def test_drop_oldest(self, result):
+        """Test a full queue evicts the oldest row."""
+        writer = AnalysisWriter("sqlite://", max_queue=2)
+        for text in ("a", "b", "c"):
+            assert writer.submit(result, text) is True
+        assert [row["text_content"] for row in writer._queue] == ["b", "c"]
+        assert writer.stats().dropped == 1
+
+    def test_drop_newest(self, result):
+        """Test a full queue rejects new rows."""
+        writer = AnalysisWriter("sqlite://", max_queue=2, overflow="drop_newest")
+        assert [writer.submit(result, t) for t in ("a", "b", "c")] == [True, True, False]
+        assert [row["text_content"] for row in writer._queue] == ["a", "b"]
+
+    def test_invalid_overflow_policy(self):
+        """Test unknown overflow policies are rejected."""
+        with pytest.raises(ValueError):
+            AnalysisWriter("sqlite://", overflow="block")
+
+    async def test_size_triggered_flush(self, result, tmp_path):
+        """Test a full batch is written without waiting for the interval."""
+        url = f"sqlite:///{tmp_path / 'truthlens.db'}"
+        writer = AnalysisWriter(url, batch_size=3, flush_interval=60, create_schema=True)
+        await writer.start()
+        for i in range(3):
+            writer.submit(result, f"text {i}", url="https://reuters.com/a")
+        for _ in range(100):
+            if writer.stats().written == 3:
+                break
+            await asyncio.sleep(0.01)
+        assert writer.stats().written == 3
+        assert writer.stats().flushes == 1
+        await writer.stop()
+        assert count_rows(url) == 3
+
+    async def test_stop_flushes_remaining(self, result, tmp_path):
+        """Test rows below the batch size are written on shutdown."""
+        url = f"sqlite:///{tmp_path / 'truthlens.db'}"
+        writer = AnalysisWriter(url, batch_size=100, flush_interval=60, create_schema=True)
+        await writer.start()
+        writer.submit(result, "pending text")
+        await writer.stop()
+
+        engine = create_engine(url)
+        with engine.connect() as conn:
+            row = conn.execute(select(analyses)).one()
+        engine.dispose()
+        assert row.text_content == "pending text"
+        assert row.verdict == result.verdict
+        assert row.manipulative_techniques == [t.value for t in result.manipulative_techniques]
+
+    async def test_failed_batch_counted(self, result, tmp_path):
+        """Test insert failures are counted instead of raised."""
+        url = f"sqlite:///{tmp_path / 'truthlens.db'}"
+        writer = AnalysisWriter(url, flush_interval=60)  # no schema: inserts fail
+        await writer.start()
+        writer.submit(result, "text")
+        await writer.stop()
+        assert writer.stats().failed == 1
+        assert writer.stats().written == 0
+
+    async def test_trends_shared_between_writers(self, result, tmp_path):
+        """Test two processes' writers report the same trends from the shared table."""
+        url = f"sqlite:///{tmp_path / 'truthlens.db'}"
+        first = AnalysisWriter(url, create_schema=True, rollup=TrendRollup())
+        second = AnalysisWriter(url, create_schema=True, rollup=TrendRollup())
+        await first.start()
+        await second.start()
+        first.submit(result, "first text")
+        second.submit(result, "second text")
+        await first.flush_trends()
+        await second.flush_trends()
+        second.submit(result, "not flushed yet")
+
+        assert first.trends()["days"][0]["total"] == 2
+        assert second.trends()["days"][0]["total"] == 3
+        await first.stop()
+        await second.stop()
@@ -0,0 +1,111 @@
+"""
+TruthLens - Streaming Analysis Tests
+====================================
+Author: 102012dl
+"""
+
+import io
+import random
+from dataclasses import replace
+
+import pytest
+
+from src.ml.analyzer import create_analyzer
+from src.ml.streaming import WhitespaceNormalizer, iter_stream_results, iter_text_chunks
+
+SUSPICIOUS = (
+    "SHOCKING!!! You won't believe what doctors don't want you to know!\n"
+    "This miracle cure has been BANNED by the government!   \n\n"
+    "Scientists EXPOSED for hiding the truth!!! Danger and threat everywhere, "
+    "a terrible disaster. Great progress? "
+)
+
+
+def split_randomly(text: str, seed: int):
+    rng = random.Random(seed)
+    chunks, i = [], 0
+    while i < len(text):
+        step = rng.randint(1, 12)
+        chunks.append(text[i:i + step])
+        i += step
+    return chunks
+
+
+@pytest.fixture
+def analyzer():
+    return create_analyzer()
+
+
+class TestStreaming:
+    """Test suite for streaming analysis"""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_normalizer_matches_preprocess(self, analyzer, seed):
+        """Chunked normalization equals whole-text preprocessing."""
+        text = "  lead\tspace " + SUSPICIOUS + " \n trailing  "
+        normalizer = WhitespaceNormalizer()
+
+        joined = ''.join(normalizer.feed(c) for c in split_randomly(text, seed))
+
+        assert joined == analyzer._preprocess(text)
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_whole_document(self, analyzer, seed):
+        """Matches crossing chunk boundaries are found."""
+        expected = analyzer.analyze_sync(SUSPICIOUS)
+
+        result = analyzer.analyze_stream_sync(split_randomly(SUSPICIOUS, seed))
+
+        assert result.credibility_score == expected.credibility_score
+        assert result.sentiment == expected.sentiment
+        assert result.bias_types == expected.bias_types
+        assert result.manipulative_techniques == expected.manipulative_techniques
+
+    def test_bounded_memory(self, analyzer):
+        """Only the overlap is carried between chunks."""
+        stream = analyzer.open_stream()
+        for _ in range(2000):
+            stream.feed("Ordinary sentence about local weather and traffic today. ")
+
+        assert len(stream._scan._carry) < 512
+        assert stream.chars > 100_000
+        assert len(''.join(stream._sample_parts)) == stream.model_chars
+
+    def test_file_like_bytes_source(self, analyzer):
+        """Bytes from a file are decoded incrementally, even mid-character."""
+        data = ("Новина: " + SUSPICIOUS).encode("utf-8")
+
+        chunks = list(iter_text_chunks(io.BytesIO(data), read_size=7))
+
+        assert ''.join(chunks) == data.decode("utf-8")
+        result = analyzer.analyze_stream_sync(io.BytesIO(data))
+        assert result.manipulative_techniques
+
+    def test_partial_results(self, analyzer):
+        """Partial results are emitted every N chunks, then the final one."""
+        chunks = ["Calm opening sentence. "] * 4 + ["SHOCKING miracle BANNED EXPOSED secret! "]
+
+        results = list(iter_stream_results(analyzer, chunks, partial_every=2))
+
+        assert len(results) == 3
+        assert not results[0].bias_types
+        assert results[-1].bias_types
+
+    def test_early_snapshot_does_not_fix_language(self, analyzer):
+        """A partial result before the language sample is full leaves the final result unchanged."""
+        chunks = ["Breaking news today. "] + ["Це жахлива новина про уряд і вибори в країні. "] * 60
+
+        plain = analyzer.open_stream()
+        for chunk in chunks:
+            plain.feed(chunk)
+        expected = plain.finish()
+
+        stream = analyzer.open_stream()
+        stream.feed(chunks[0])
+        assert stream.snapshot().language == "en"
+        for chunk in chunks[1:]:
+            stream.feed(chunk)
+        result = stream.finish()
+
+        assert expected.language == "uk"
+        assert result == replace(expected, processing_time_ms=result.processing_time_ms)
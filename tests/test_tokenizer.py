@@ -0,0 +1,56 @@
+"""
+TruthLens - Tokenizer Tests
+===========================
+Author: 102012dl
+"""
+
+from src.ml.tokenizer import Tokenizer, tokenize
+
+
+class TestTokenizer:
+    """Test suite for normalization and tokenization"""
+
+    def test_punctuation_and_case(self):
+        """Test punctuation is split off and case folded."""
+        assert tokenize("Good, GOOD! good... (good)").words == ["good"] * 4
+
+    def test_apostrophes(self):
+        """Test apostrophe variants stay inside English and Ukrainian words."""
+        tokens = tokenize("You won’t believe: п’ять, пʼять, п'ять ’quoted’")
+
+        assert tokens.words == ["you", "won't", "believe", "п'ять", "п'ять", "п'ять", "quoted"]
+
+    def test_nfkc_and_casefold(self):
+        """Test compatibility forms and case folding."""
+        tokens = tokenize("ＳＨＯＣＫＩＮＧ ﬁnd Straße ЇЖАК")
+
+        assert tokens.words == ["shocking", "find", "strasse", "їжак"]
+
+    def test_underscore_and_digits(self):
+        """Test digits are words and underscores separate words."""
+        assert tokenize("top_10 reasons 2024").words == ["top", "10", "reasons", "2024"]
+
+    def test_offsets(self):
+        """Test offsets point at each token in the normalized text."""
+        tokens = tokenize("Breaking: heart-breaking news!")
+
+        assert [(w, tokens.text[s:e]) for w, s, e in tokens.spans()] == [
+            ("breaking", "breaking"), ("heart", "heart"),
+            ("breaking", "breaking"), ("news", "news")
+        ]
+        assert tokens.span(1) == (10, 15)
+
+    def test_word_set(self):
+        """Test the word set is shared and membership works."""
+        tokens = tokenize("a b a")
+
+        assert tokens.set == {"a", "b"}
+        assert tokens.set is tokens.set
+        assert "b" in tokens and "c" not in tokens
+
+    def test_pluggable_pattern(self):
+        """Test a subclass can change the word pattern."""
+        class HyphenTokenizer(Tokenizer):
+            pattern = r"[^\W_]+(?:[-'][^\W_]+)*"
+
+        assert HyphenTokenizer().tokenize("Well-known fact").words == ["well-known", "fact"]
@@ -0,0 +1,95 @@
+"""
+TruthLens - Training Pipeline Tests
+===================================
+Author: 102012dl
+"""
+
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("pandas")
+
+import numpy as np
+import pandas as pd
+
+from src.ml.registry import ModelRegistry
+from src.ml.scorer import CredibilityScorer
+from src.models.train import main, train_streaming
+from src.nlp.data_loader import iter_chunks, iter_isot_chunks
+
+FAKE = "SHOCKING secret cure they don't want you to know, share before it's banned"
+REAL = "The ministry published quarterly statistics on regional employment figures"
+
+
+@pytest.fixture
+def isot_dir(tmp_path):
+    """A small corpus laid out like ISOT (Fake.csv / True.csv)."""
+    for name, text in (("Fake.csv", FAKE), ("True.csv", REAL)):
+        pd.DataFrame({
+            "title": [f"Story {i}" for i in range(60)],
+            "text": [f"{text} number {i}" for i in range(60)],
+            "subject": "news",
+            "date": "2017-01-01",
+        }).to_csv(tmp_path / name, index=False)
+    return tmp_path
+
+
+class TestDataLoader:
+    """Test suite for chunked corpus readers"""
+
+    def test_iter_chunks_labels(self, tmp_path):
+        """Test a labelled CSV is streamed in chunks with title and text joined."""
+        path = tmp_path / "corpus.csv"
+        pd.DataFrame({"title": ["A", "B", "C"], "text": ["x", "y", "z"],
+                      "label": [1, 0, 1]}).to_csv(path, index=False)
+        chunks = list(iter_chunks(str(path), chunksize=2))
+        assert [len(texts) for texts, _ in chunks] == [2, 1]
+        assert chunks[0][0] == ["A. x", "B. y"]
+        assert chunks[0][1].tolist() == [1, 0]
+
+    def test_isot_chunks_mix_classes(self, isot_dir):
+        """Test every ISOT chunk carries both classes."""
+        chunks = list(iter_isot_chunks(str(isot_dir), chunksize=20))
+        assert sum(len(labels) for _, labels in chunks) == 120
+        for texts, labels in chunks:
+            assert set(labels.tolist()) == {0, 1}
+            assert len(texts) == len(labels)
+
+
+class TestStreamingTraining:
+    """Test suite for out-of-core training"""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_trains_scorer_compatible_model(self, isot_dir, tmp_path, workers):
+        """Test the trained artifacts load in the registry and score new texts."""
+        model_dir = tmp_path / "models"
+        report = train_streaming(
+            lambda: iter_isot_chunks(str(isot_dir), chunksize=20),
+            model_dir=str(model_dir), epochs=2, workers=workers, n_features=2 ** 12
+        )
+        assert report.documents == 240
+        assert report.epochs == 2
+        assert report.docs_per_second > 0
+        assert report.accuracy > 0.9
+
+        scorer = CredibilityScorer(ModelRegistry(model_dir=str(model_dir)), model_weight=1.0)
+        fake, real = scorer.score_batch([FAKE, REAL], [50, 50])
+        assert fake.backend == "baseline+heuristic"
+        assert fake.model_probability < 0.5 < real.model_probability
+
+    def test_cli(self, isot_dir, tmp_path):
+        """Test the CLI trains from an ISOT directory without MLflow."""
+        model_dir = tmp_path / "models"
+        assert main(["--isot", str(isot_dir), "--model-dir", str(model_dir),
+                     "--chunksize", "50", "--workers", "1", "--no-mlflow"]) == 0
+        assert (model_dir / "baseline_model.pkl").exists()
+        assert (model_dir / "vectorizer.pkl").exists()
+
+    def test_demo_model_honours_model_dir(self, tmp_path, monkeypatch):
+        """Test the demo model without a corpus is written to --model-dir, not ./models."""
+        monkeypatch.chdir(tmp_path)
+        model_dir = tmp_path / "custom"
+        assert main(["--model-dir", str(model_dir)]) == 0
+        assert (model_dir / "baseline_model.pkl").exists()
+        assert (model_dir / "vectorizer.pkl").exists()
+        assert not (tmp_path / "models").exists()
@@ -0,0 +1,151 @@
+"""
+TruthLens - Trends Rollup Tests
+===============================
+Author: 102012dl
+"""
+
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import IntegrityError
+
+from src.storage.schema import analyses, metadata, trends
+from src.storage.trends import TrendRollup
+
+DAY = date(2024, 5, 1)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'truthlens.db'}")
+    metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def trend_rows(engine):
+    with engine.connect() as conn:
+        rows = conn.execute(select(trends.c.category, trends.c.topic, trends.c.count,
+                                   trends.c.average_credibility)).all()
+    return {(category, topic): (count, average) for category, topic, count, average in rows}
+
+
+class TestTrendRollup:
+    """Test suite for TrendRollup"""
+
+    def test_snapshot_aggregates(self):
+        """Test per-day, per-verdict and per-source counters and averages."""
+        rollup = TrendRollup()
+        rollup.record("credible", 90, "reuters.com", DAY)
+        rollup.record("likely_false", 30, "infowars.com", DAY)
+        rollup.record("credible", 80, "reuters.com", DAY)
+
+        snapshot = rollup.snapshot(days=7, today=DAY)
+        assert snapshot["days"] == [{
+            "date": "2024-05-01", "total": 3, "average_credibility": 66.67,
+            "verdicts": {"credible": 2, "likely_false": 1},
+        }]
+        assert snapshot["verdicts"] == {"credible": 2, "likely_false": 1}
+        assert snapshot["top_sources"][0] == {
+            "source": "reuters.com", "count": 2, "average_credibility": 85.0
+        }
+
+    def test_snapshot_window(self):
+        """Test days outside the window are left out."""
+        rollup = TrendRollup()
+        rollup.record("credible", 90, day=date(2024, 4, 1))
+        rollup.record("credible", 70, day=DAY)
+        snapshot = rollup.snapshot(days=7, today=DAY)
+        assert [d["date"] for d in snapshot["days"]] == ["2024-05-01"]
+
+    def test_retention(self):
+        """Test old days are pruned from memory."""
+        rollup = TrendRollup(retention_days=2)
+        rollup.record("credible", 90, day=date(2024, 4, 1))
+        rollup.record("credible", 70, day=DAY)
+        assert all(key[0] == DAY for key in rollup._totals)
+
+    def test_flush_merges_deltas(self, engine):
+        """Test repeated flushes add to stored counts and averages."""
+        rollup = TrendRollup()
+        rollup.record("credible", 90, day=DAY)
+        assert rollup.flush(engine) == 2
+        rollup.record("credible", 70, day=DAY)
+        rollup.flush(engine)
+        assert rollup.flush(engine) == 0
+
+        rows = trend_rows(engine)
+        assert rows[("total", "all")] == (2, 80.0)
+        assert rows[("verdict", "credible")] == (2, 80.0)
+
+    def test_concurrent_writers_share_rows(self, engine):
+        """Test several processes flushing the same keys upsert one row per key."""
+        writers = [TrendRollup() for _ in range(3)]
+        for score, rollup in zip((90, 60, 30), writers):
+            rollup.record("credible", score, day=DAY)
+        for rollup in writers:
+            rollup.flush(engine)
+
+        with engine.connect() as conn:
+            assert len(conn.execute(select(trends)).all()) == 2
+        assert trend_rows(engine)[("total", "all")] == (3, 60.0)
+        with pytest.raises(IntegrityError), engine.begin() as conn:
+            conn.execute(trends.insert().values(date=DAY, category="total", topic="all", count=1))
+
+    def test_read_combines_table_and_local_deltas(self, engine):
+        """Test every process reads the same totals: flushed rows plus its own pending deltas."""
+        other = TrendRollup()
+        other.record("credible", 90, "reuters.com", DAY)
+        other.flush(engine)
+        rollup = TrendRollup()
+        rollup.record("likely_false", 30, "reuters.com", DAY)
+
+        snapshot = rollup.read(engine, days=7, today=DAY)
+        assert snapshot["days"][0]["total"] == 2
+        assert snapshot["days"][0]["average_credibility"] == 60.0
+        assert snapshot["verdicts"] == {"credible": 1, "likely_false": 1}
+        assert snapshot["top_sources"][0] == {"source": "reuters.com", "count": 2, "average_credibility": 60.0}
+        rollup.flush(engine)
+        assert rollup.read(engine, days=7, today=DAY) == snapshot
+
+    def test_flush_failure_keeps_deltas(self, tmp_path):
+        """Test deltas survive a failed flush."""
+        broken = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")  # no tables
+        rollup = TrendRollup()
+        rollup.record("credible", 90, day=DAY)
+        with pytest.raises(Exception):
+            rollup.flush(broken)
+        assert len(rollup._deltas) == 2
+        broken.dispose()
+
+    def test_load_seeds_totals(self, engine):
+        """Test a new process starts from stored aggregates."""
+        first = TrendRollup()
+        first.record("false", 10, "infowars.com", DAY)
+        first.flush(engine)
+
+        second = TrendRollup()
+        second.load(engine, today=DAY)
+        snapshot = second.snapshot(today=DAY)
+        assert snapshot["verdicts"] == {"false": 1}
+        assert not second._deltas
+
+    def test_backfill_from_analyses(self, engine):
+        """Test trends are rebuilt from the analyses history."""
+        created = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+        with engine.begin() as conn:
+            conn.execute(analyses.insert(), [
+                {"text_content": "a", "credibility_score": 90, "verdict": "credible",
+                 "source_name": "reuters.com", "created_at": created},
+                {"text_content": "b", "credibility_score": 30, "verdict": "likely_false",
+                 "source_name": None, "created_at": created},
+            ])
+            conn.execute(trends.insert().values(topic="stale", category="verdict",
+                                                count=99, date=DAY))
+
+        assert TrendRollup().backfill(engine) == 4
+        rows = trend_rows(engine)
+        assert ("verdict", "stale") not in rows
+        assert rows[("total", "all")] == (2, 60.0)
+        assert rows[("source", "reuters.com")] == (1, 90.0)